@@ -1,16 +1,20 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
+from django.db.models import Count
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from .models import (
     NewsArticle, Service, CSRProject, InquiryCategory, ContactSubmission, 
     ContactResponse, JobCategory, JobPosting, JobApplication, 
-    SubscriptionCategory, Subscriber, Newsletter, PageContent, 
+    SubscriptionCategory, Subscriber, Newsletter, NewsletterDelivery, PageContent, 
     ServiceDescription, CompanyInfo, Project, ProjectImage, ClientTestimonial,
-    AchievementCategory, Achievement, ProjectPortfolio, CompanyMilestone
+    AchievementCategory, Achievement, ProjectPortfolio, CompanyMilestone, Task
 )
+from .page_cache import invalidate_pages_for_model
+from .stats import invalidate_stats_for_model
+from .task_queue import requeue_dead_tasks
 
 # ================================
 # CONTACT ADMIN
@@ -26,6 +30,7 @@ class InquiryCategoryAdmin(admin.ModelAdmin):
 @admin.register(ContactSubmission)
 class ContactSubmissionAdmin(admin.ModelAdmin):
     list_display = ['name', 'email', 'company', 'inquiry_type', 'date', 'read_status', 'view_response']
+    list_select_related = ['inquiry_type']
     list_filter = ['read', 'inquiry_type', 'date']
     search_fields = ['name', 'email', 'company', 'message']
     readonly_fields = ['date']
@@ -52,8 +57,12 @@ class ContactSubmissionAdmin(admin.ModelAdmin):
             )
     read_status.short_description = 'Status'
     
+    def get_queryset(self, request):
+        # Response counts for the list in the same query, not one per row
+        return super().get_queryset(request).annotate(response_count=Count('contactresponse'))
+    
     def view_response(self, obj):
-        response_count = obj.contactresponse_set.count()
+        response_count = obj.response_count
         if response_count > 0:
             return format_html(
                 '<a href="{}?contact_submission__id__exact={}" style="color: blue;">View {} Response(s)</a>',
@@ -79,17 +88,23 @@ class ContactSubmissionAdmin(admin.ModelAdmin):
     
     def mark_as_read(self, request, queryset):
         updated = queryset.update(read=True)
+        invalidate_stats_for_model(queryset.model)
         self.message_user(request, f'{updated} submissions marked as read.')
     mark_as_read.short_description = 'Mark selected submissions as read'
     
     def mark_as_unread(self, request, queryset):
         updated = queryset.update(read=False)
+        invalidate_stats_for_model(queryset.model)
         self.message_user(request, f'{updated} submissions marked as unread.')
     mark_as_unread.short_description = 'Mark selected submissions as unread'
 
 @admin.register(ContactResponse)
 class ContactResponseAdmin(admin.ModelAdmin):
     list_display = ['contact_submission', 'staff_member', 'response_date', 'short_response']
+    # ContactSubmission.__str__ shows the inquiry type
+    list_select_related = ['contact_submission__inquiry_type', 'staff_member']
+    # A lookup popup instead of a <select> labelling every submission
+    raw_id_fields = ['contact_submission']
     list_filter = ['response_date', 'staff_member']
     search_fields = ['contact_submission__name', 'contact_submission__email', 'response_text']
     readonly_fields = ['response_date']
@@ -169,6 +184,7 @@ class JobPostingAdmin(admin.ModelAdmin):
 @admin.register(JobApplication)
 class JobApplicationAdmin(admin.ModelAdmin):
     list_display = ['full_name', 'job_posting', 'email', 'status', 'application_date']
+    list_select_related = ['job_posting']
     list_filter = ['status', 'application_date', 'job_posting']
     search_fields = ['first_name', 'last_name', 'email', 'job_posting__title']
     readonly_fields = ['application_date']
@@ -218,6 +234,13 @@ class NewsletterAdmin(admin.ModelAdmin):
     search_fields = ['title', 'content']
     ordering = ['-created_date']
 
+@admin.register(NewsletterDelivery)
+class NewsletterDeliveryAdmin(admin.ModelAdmin):
+    list_display = ['newsletter', 'subscriber', 'status', 'attempts', 'sent_at']
+    list_filter = ['status', 'newsletter']
+    search_fields = ['subscriber__email', 'error']
+    raw_id_fields = ['newsletter', 'subscriber']
+
 # ================================
 # CONTENT ADMIN
 # ================================
@@ -334,21 +357,29 @@ class AchievementAdmin(admin.ModelAdmin):
     
     def mark_as_featured(self, request, queryset):
         updated = queryset.update(featured=True)
+        invalidate_pages_for_model(queryset.model)
+        invalidate_stats_for_model(queryset.model)
         self.message_user(request, f'{updated} achievements marked as featured.')
     mark_as_featured.short_description = 'Mark selected achievements as featured'
     
     def mark_as_not_featured(self, request, queryset):
         updated = queryset.update(featured=False)
+        invalidate_pages_for_model(queryset.model)
+        invalidate_stats_for_model(queryset.model)
         self.message_user(request, f'{updated} achievements unmarked as featured.')
     mark_as_not_featured.short_description = 'Unmark selected achievements as featured'
     
     def mark_as_active(self, request, queryset):
         updated = queryset.update(status='ACTIVE')
+        invalidate_pages_for_model(queryset.model)
+        invalidate_stats_for_model(queryset.model)
         self.message_user(request, f'{updated} achievements marked as active.')
     mark_as_active.short_description = 'Mark selected achievements as active'
     
     def mark_as_archived(self, request, queryset):
         updated = queryset.update(status='ARCHIVED')
+        invalidate_pages_for_model(queryset.model)
+        invalidate_stats_for_model(queryset.model)
         self.message_user(request, f'{updated} achievements archived.')
     mark_as_archived.short_description = 'Archive selected achievements'
 
@@ -390,21 +421,29 @@ class ProjectPortfolioAdmin(admin.ModelAdmin):
     
     def mark_as_featured(self, request, queryset):
         updated = queryset.update(status='FEATURED', featured_on_homepage=True)
+        invalidate_pages_for_model(queryset.model)
+        invalidate_stats_for_model(queryset.model)
         self.message_user(request, f'{updated} projects marked as featured.')
     mark_as_featured.short_description = 'Mark selected projects as featured'
     
     def mark_as_not_featured(self, request, queryset):
         updated = queryset.update(featured_on_homepage=False)
+        invalidate_pages_for_model(queryset.model)
+        invalidate_stats_for_model(queryset.model)
         self.message_user(request, f'{updated} projects unmarked from homepage.')
     mark_as_not_featured.short_description = 'Remove from homepage'
     
     def mark_as_archived(self, request, queryset):
         updated = queryset.update(status='ARCHIVED')
+        invalidate_pages_for_model(queryset.model)
+        invalidate_stats_for_model(queryset.model)
         self.message_user(request, f'{updated} projects archived.')
     mark_as_archived.short_description = 'Archive selected projects'
     
     def mark_as_standard(self, request, queryset):
         updated = queryset.update(status='STANDARD')
+        invalidate_pages_for_model(queryset.model)
+        invalidate_stats_for_model(queryset.model)
         self.message_user(request, f'{updated} projects marked as standard.')
     mark_as_standard.short_description = 'Mark as standard projects'
 
@@ -428,11 +467,13 @@ class CompanyMilestoneAdmin(admin.ModelAdmin):
     
     def mark_as_featured(self, request, queryset):
         updated = queryset.update(featured=True)
+        invalidate_pages_for_model(queryset.model)
         self.message_user(request, f'{updated} milestones marked as featured.')
     mark_as_featured.short_description = 'Mark selected milestones as featured'
     
     def mark_as_not_featured(self, request, queryset):
         updated = queryset.update(featured=False)
+        invalidate_pages_for_model(queryset.model)
         self.message_user(request, f'{updated} milestones unmarked as featured.')
     mark_as_not_featured.short_description = 'Unmark selected milestones as featured'
 
@@ -524,4 +565,23 @@ admin.site.register(User, CustomUserAdmin)
 # Admin site customization
 admin.site.site_header = "Axflo Oil & Gas Administration"
 admin.site.site_title = "Axflo Admin"
-admin.site.index_title = "Welcome to Axflo Administration Portal"
\ No newline at end of file
+admin.site.index_title = "Welcome to Axflo Administration Portal"
+
+
+# ================================
+# BACKGROUND TASKS ADMIN
+# ================================
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'max_attempts', 'run_at', 'finished_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'last_error']
+    readonly_fields = ['created_at', 'finished_at', 'locked_at', 'last_error']
+    ordering = ['-created_at']
+    actions = ['requeue_dead']
+    
+    def requeue_dead(self, request, queryset):
+        count = requeue_dead_tasks(queryset)
+        self.message_user(request, f'{count} dead tasks requeued.')
+    requeue_dead.short_description = 'Requeue selected dead tasks'
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class AxfloAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'axflo_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
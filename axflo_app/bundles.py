@@ -0,0 +1,403 @@
+"""
+Per-page CSS/JS bundles for the public templates.
+
+Each public page loads base.css, cookie_consent.css and its own stylesheet,
+plus two or three scripts. BUNDLES lists them per page; during collectstatic
+(see storage.py) build_bundles() concatenates and minifies each list into
+one file under axflo_app/bundles/, which manifest hashing then names by
+content. For pages marked critical it also extracts the rules needed to
+render the header and first section (the part above the fold) into
+``<page>.critical.css``.
+
+Templates use {% bundle_css %} and {% bundle_js %} (templatetags/
+axflo_assets.py), which inline the critical CSS and load the full bundle
+without blocking rendering, or fall back to the individual files when
+bundles are off (ASSET_BUNDLES_ENABLED, off with DEBUG).
+"""
+import posixpath
+import re
+from html.parser import HTMLParser
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+BUNDLE_DIR = 'axflo_app/bundles'
+BASE_CSS = ['axflo_app/css/base.css', 'axflo_app/css/cookie_consent.css']
+
+
+def _page(css, js, critical=False, template=None):
+    return {
+        'css': BASE_CSS + [f'axflo_app/css/{name}.css' for name in css],
+        'js': [f'axflo_app/js/{name}.js' for name in js],
+        'critical': critical,
+        'template': template,
+    }
+
+
+# Page -> its stylesheets and scripts, in the order the page loaded them
+BUNDLES = {
+    'index': _page(['styles'], ['main', 'index', 'observe'], critical=True),
+    'about': _page(['about'], ['main', 'about']),
+    'achievements': _page(['achievements'], ['achievements', 'main']),
+    'blog_detail': _page(['media'], ['media', 'main']),
+    # careers.html loaded base.css a second time after its own stylesheet
+    'careers': _page(['careers', 'base'], ['careers', 'main'], critical=True),
+    'contact': _page(['contact'], ['contact', 'main']),
+    'csr': _page(['csr'], ['csr', 'main']),
+    'media': _page(['media'], ['media', 'main'], critical=True),
+    'qshe': _page(['qshe'], ['main', 'qshe']),
+    'services': _page(['services'], ['main', 'services'], critical=True),
+    'testing': _page(['testing'], ['testing', 'main']),
+}
+
+SERVICE_PAGES = [
+    'construction-services', 'engineering-consultancy', 'environmental-services',
+    'environmental-technologies', 'equipment-hire-services', 'incident-management',
+    'installation-services', 'marine-support-services', 'offshore-accommodation-services',
+    'offshore-marine-services', 'oil-spill-response', 'plant-operation-facility-management',
+    'preparedness-planning', 'procurement-logistics', 'project-management',
+    'renewable-energy', 'testing-commissioning', 'training-programs', 'waste-recycling',
+    'water-wastewater-treatment',
+]
+for _name in SERVICE_PAGES:
+    BUNDLES[_name] = _page([_name], ['main', _name], critical=True)
+
+
+def bundle_path(name, kind):
+    """Static path of a bundle; kind is 'css', 'js' or 'critical'"""
+    if kind == 'critical':
+        return f'{BUNDLE_DIR}/{name}.critical.css'
+    return f'{BUNDLE_DIR}/{name}.{kind}'
+
+
+# ================================
+# MINIFICATION
+# ================================
+
+# Characters after which a '/' starts a regular expression rather than a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw'}
+
+
+def _string_end(source, start):
+    """Index just past the string literal (', " or `) starting at ``start``"""
+    quote = source[start]
+    i = start + 1
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+            continue
+        if source[i] == quote:
+            return i + 1
+        if quote == '`' and source.startswith('${', i):
+            i = _substitution_end(source, i + 2)
+            continue
+        if source[i] == '\n' and quote != '`':
+            return i
+        i += 1
+    return len(source)
+
+
+def _substitution_end(source, i):
+    """Index just past the ``}`` closing a template literal's ``${...}``"""
+    depth = 1
+    while i < len(source):
+        c = source[i]
+        if c in '"\'`':
+            i = _string_end(source, i)
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if not depth:
+                return i + 1
+        i += 1
+    return len(source)
+
+
+def _regex_end(source, start):
+    """Index just past the regex literal at ``start``, or None if it isn't one"""
+    i = start + 1
+    in_class = False
+    while i < len(source):
+        c = source[i]
+        if c == '\n':
+            return None
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            i += 1
+            while i < len(source) and source[i].isalpha():
+                i += 1
+            return i
+        i += 1
+    return None
+
+
+def _split_code(source, js):
+    """
+    Split source into [(is_literal, text)], dropping comments. Strings (and
+    for JS, regex literals) are literals and must be kept byte for byte.
+    """
+    parts = []
+    code = []
+    last = ''
+    i = 0
+    while i < len(source):
+        c = source[i]
+        if c in '"\'' or (js and c == '`'):
+            end = _string_end(source, i)
+            parts.append((False, ''.join(code)))
+            parts.append((True, source[i:end]))
+            code = []
+            last = source[end - 1]
+            i = end
+            continue
+        if c == '/' and source[i + 1:i + 2] == '*':
+            end = source.find('*/', i + 2)
+            i = len(source) if end == -1 else end + 2
+            code.append(' ')
+            continue
+        if js and c == '/' and source[i + 1:i + 2] == '/':
+            end = source.find('\n', i)
+            i = len(source) if end == -1 else end
+            continue
+        if js and c == '/':
+            word = re.search(r'[\w$]+$', ''.join(code))
+            if not last or last in REGEX_PRECEDERS or (word and word.group() in REGEX_KEYWORDS):
+                end = _regex_end(source, i)
+                if end is not None:
+                    parts.append((False, ''.join(code)))
+                    parts.append((True, source[i:end]))
+                    code = []
+                    last = '/'
+                    i = end
+                    continue
+        code.append(c)
+        if not c.isspace():
+            last = c
+        i += 1
+    parts.append((False, ''.join(code)))
+    return parts
+
+
+def minify_js(source):
+    """Drop comments, indentation and blank lines; newlines are kept so ASI still applies"""
+    output = []
+    for is_literal, text in _split_code(source, js=True):
+        if not is_literal:
+            text = re.sub(r'[ \t]*\n\s*', '\n', text)
+            text = re.sub(r'[ \t]+', ' ', text)
+        output.append(text)
+    return ''.join(output).strip()
+
+
+def minify_css(source):
+    output = []
+    for is_literal, text in _split_code(source, js=False):
+        if not is_literal:
+            text = re.sub(r'\s+', ' ', text)
+            text = re.sub(r' ?([{};,>]) ?', r'\1', text)
+            text = re.sub(r': ', ':', text)
+            text = text.replace(';}', '}')
+        output.append(text)
+    return ''.join(output).strip()
+
+
+# Quoted URLs are matched whole so url()s inside data: URIs are left alone
+URL_RE = re.compile(r'url\(\s*(?:"([^"]*)"|\'([^\']*)\'|([^\'"\s)]+))\s*\)')
+
+
+def absolutize_css_urls(css, source_name):
+    """Point relative url()s at STATIC_URL so the CSS works from any location"""
+    base = posixpath.dirname(source_name)
+
+    def convert(match):
+        double, single, bare = match.groups()
+        url = double if double is not None else single if single is not None else bare
+        quote = '"' if double is not None else "'" if single is not None else ''
+        if url.startswith(('/', 'data:', 'http:', 'https:', '#')):
+            return match.group(0)
+        path = posixpath.normpath(posixpath.join(base, url))
+        return f'url({quote}{settings.STATIC_URL}{path}{quote})'
+
+    return URL_RE.sub(convert, css)
+
+
+# ================================
+# CRITICAL CSS
+# ================================
+
+class AboveTheFoldParser(HTMLParser):
+    """Collect the tags, classes and ids from <body> up to the end of its first <section>"""
+
+    MAX_ELEMENTS = 400
+    VOID_ELEMENTS = {
+        'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+        'meta', 'source', 'track', 'wbr',
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.tags = {'html', 'body'}
+        self.classes = set()
+        self.ids = set()
+        self.in_body = False
+        self.done = False
+        self.elements = 0
+        self.section_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'body':
+            self.in_body = True
+            return
+        if not self.in_body or self.done:
+            return
+        attrs = dict(attrs)
+        self.tags.add(tag)
+        self.classes.update((attrs.get('class') or '').split())
+        if attrs.get('id'):
+            self.ids.add(attrs['id'])
+        self.elements += 1
+        if self.elements >= self.MAX_ELEMENTS:
+            self.done = True
+        if tag == 'section':
+            self.section_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag == 'section' and self.section_depth:
+            self.section_depth -= 1
+            if not self.section_depth:
+                self.done = True
+
+
+def _split_blocks(css):
+    """Top-level [(prelude, body)] of minified CSS; body is None for ``@import ...;``"""
+    blocks = []
+    i = 0
+    start = 0
+    while i < len(css):
+        c = css[i]
+        if c in '"\'':
+            i = _string_end(css, i)
+            continue
+        if c == ';':
+            statement = css[start:i].strip()
+            if statement:
+                blocks.append((statement, None))
+            start = i + 1
+        elif c == '{':
+            depth = 1
+            j = i + 1
+            while j < len(css) and depth:
+                if css[j] in '"\'':
+                    j = _string_end(css, j)
+                    continue
+                depth += {'{': 1, '}': -1}.get(css[j], 0)
+                j += 1
+            blocks.append((css[start:i].strip(), css[i + 1:j - 1]))
+            start = i = j
+            continue
+        i += 1
+    return blocks
+
+
+def _split_selectors(prelude):
+    selectors, depth, current = [], 0, []
+    for c in prelude:
+        if c == ',' and not depth:
+            selectors.append(''.join(current))
+            current = []
+            continue
+        depth += {'(': 1, ')': -1}.get(c, 0)
+        current.append(c)
+    selectors.append(''.join(current))
+    return [selector.strip() for selector in selectors if selector.strip()]
+
+
+def _selector_matches(selector, seen):
+    """Whether every class, id and tag the selector names appears above the fold"""
+    simple = re.sub(r'::?[\w-]+(\((?:[^()]|\([^()]*\))*\))?', ' ', selector)
+    simple = re.sub(r'\[[^\]]*\]', ' ', simple)
+    for token in re.findall(r'[.#]?-?[A-Za-z_][\w-]*', simple):
+        if token[0] == '.':
+            if token[1:] not in seen.classes:
+                return False
+        elif token[0] == '#':
+            if token[1:] not in seen.ids:
+                return False
+        elif token.lower() not in seen.tags:
+            return False
+    return True
+
+
+def _critical_blocks(css, seen, animations):
+    kept = []
+    for prelude, body in _split_blocks(css):
+        if body is None:
+            if prelude.startswith('@import'):
+                kept.append(f'{prelude};')
+        elif prelude.startswith(('@media', '@supports')):
+            inner = _critical_blocks(body, seen, animations)
+            if inner:
+                kept.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@font-face'):
+            kept.append(f'{prelude}{{{body}}}')
+        elif prelude.startswith('@'):
+            continue
+        else:
+            selectors = [selector for selector in _split_selectors(prelude) if _selector_matches(selector, seen)]
+            if selectors:
+                kept.append(f'{",".join(selectors)}{{{body}}}')
+                for declaration in re.findall(r'animation(?:-name)?:([^;]+)', body):
+                    animations.update(re.findall(r'[\w-]+', declaration))
+    return ''.join(kept)
+
+
+def extract_critical_css(css, html):
+    """The rules of ``css`` (minified) that apply to the above-the-fold part of ``html``"""
+    seen = AboveTheFoldParser()
+    seen.feed(html)
+    animations = set()
+    critical = _critical_blocks(css, seen, animations)
+    # Keyframes used by the kept rules (e.g. the hero's entrance animation)
+    for prelude, body in _split_blocks(css):
+        if body is not None and re.match(r'@(-webkit-)?keyframes', prelude):
+            if prelude.split()[-1] in animations:
+                critical += f'{prelude}{{{body}}}'
+    return critical
+
+
+# ================================
+# BUILD
+# ================================
+
+def render_page(name):
+    """The page's HTML without request data, enough to see its static markup"""
+    template = BUNDLES[name]['template'] or f'axflo_app/{name}.html'
+    return render_to_string(template, {'csrf_token': 'NOTPROVIDED'})
+
+
+def build_bundles(read):
+    """
+    Build every bundle; ``read(static_path)`` returns a source file's text.
+
+    Returns {static path: content} for the CSS and JS bundles and the
+    critical CSS files.
+    """
+    output = {}
+    for name, spec in BUNDLES.items():
+        css = '\n'.join(
+            minify_css(absolutize_css_urls(read(path), path)) for path in spec['css']
+        )
+        output[bundle_path(name, 'css')] = css
+        output[bundle_path(name, 'js')] = ';\n'.join(minify_js(read(path)) for path in spec['js'])
+        if spec['critical']:
+            output[bundle_path(name, 'critical')] = extract_critical_css(css, render_page(name))
+    return output
@@ -0,0 +1,29 @@
+"""
+Websocket consumers for the axflo_app (routed in routing.py)
+"""
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .realtime import DASHBOARD_GROUP
+
+
+class StaffDashboardConsumer(AsyncJsonWebsocketConsumer):
+    """Pushes realtime.broadcast() events to open staff dashboard pages"""
+
+    async def connect(self):
+        # Same rule as the admin views' manual authentication check
+        user = self.scope.get('user')
+        if not user or not (user.is_staff or user.is_superuser):
+            await self.close()
+            return
+        await self.channel_layer.group_add(DASHBOARD_GROUP, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        await self.channel_layer.group_discard(DASHBOARD_GROUP, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # The socket is push-only
+        pass
+
+    async def dashboard_event(self, event):
+        await self.send_json(event['payload'])
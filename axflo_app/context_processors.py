@@ -1,6 +1,8 @@
 """
 Context processors for the axflo_app
 """
+from django.conf import settings
+
 
 def admin_context(request):
     """
@@ -27,4 +29,9 @@ def admin_context(request):
     return {
         'current_page': current_page,
         'current_path': current_path,
-    }
\ No newline at end of file
+    }
+
+
+def live_updates(request):
+    """Whether staff pages should open the live-update websocket (only served in ASGI_MODE)"""
+    return {'live_updates_enabled': settings.ASGI_MODE}
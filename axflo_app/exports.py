@@ -0,0 +1,169 @@
+"""
+Streaming exports for the staff dashboard.
+
+export_response() streams a queryset as CSV or NDJSON. Rows are read with
+.iterator(chunk_size=EXPORT_CHUNK_SIZE), which is a server-side cursor on
+PostgreSQL, and each line is written out as soon as its row arrives, so
+memory stays flat however many rows match. Columns are field lookups read
+with values_list(), so no model instances are built; many-to-many columns
+(subscriber interests) cost one extra query per chunk. Under ASGI the
+response gets an async iterator that fetches one block at a time, because
+Django reads a sync iterator into a list before sending any of it.
+"""
+import csv
+import json
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.constants import LOOKUP_SEP
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 2000
+# Lines are sent in blocks of about this many characters rather than one
+# write per row
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+# Spreadsheet apps evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Echo:
+    """A file-like object that hands back what csv.writer writes to it"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, (list, tuple)):
+        value = ', '.join(str(item) for item in value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_lines(rows, headers):
+    writer = csv.writer(Echo())
+    # Excel only detects UTF-8 with a byte order mark
+    yield '\ufeff' + writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def _ndjson_lines(rows, headers):
+    for row in rows:
+        yield json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def _buffered(lines, size=EXPORT_BUFFER_SIZE):
+    buffer, length = [], 0
+    for line in lines:
+        buffer.append(line)
+        length += len(line)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+async def _async_blocks(blocks):
+    """Hand a sync block iterator to an ASGI server one block at a time"""
+    # thread_sensitive, so the queries run on the request's database thread
+    next_block = sync_to_async(next)
+    try:
+        while True:
+            block = await next_block(blocks, None)
+            if block is None:
+                return
+            yield block
+    finally:
+        await sync_to_async(blocks.close)()
+
+
+def _is_multivalued(model, lookup):
+    """Whether a field lookup crosses a many-to-many or reverse foreign key"""
+    for name in lookup.split(LOOKUP_SEP):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        if field.many_to_many or field.one_to_many:
+            return True
+        if not field.is_relation:
+            return False
+        model = field.related_model
+    return False
+
+
+def iter_export_rows(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield one list of values per row, reading ``chunk_size`` rows at a time
+    with values_list(). Lookups through many-to-many relations become lists,
+    filled by one extra query per chunk.
+    """
+    lookups = [lookup for _, lookup in columns]
+    multivalued = [lookup for lookup in lookups if _is_multivalued(queryset.model, lookup)]
+    single = [lookup for lookup in lookups if lookup not in multivalued and lookup != 'pk']
+    positions = {lookup: i for i, lookup in enumerate(['pk', *single])}
+
+    rows = queryset.values_list('pk', *single).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        related = {}
+        for lookup in multivalued:
+            values = related[lookup] = defaultdict(list)
+            pairs = (
+                queryset.model._default_manager
+                .filter(pk__in=[row[0] for row in chunk])
+                .exclude(**{f'{lookup}__isnull': True})
+                .values_list('pk', lookup)
+            )
+            for pk, value in pairs:
+                values[pk].append(value)
+        for row in chunk:
+            yield [
+                related[lookup].get(row[0], []) if lookup in related else row[positions[lookup]]
+                for lookup in lookups
+            ]
+
+
+def export_response(queryset, columns, name, export_format='csv', asynchronous=False):
+    """
+    Stream ``queryset`` as a CSV or NDJSON attachment.
+
+    ``columns`` is a list of (header, field lookup) pairs, e.g.
+    ``('inquiry_type', 'inquiry_type__name')``. Pass ``asynchronous=True``
+    when serving an ASGI request. Raises ValueError for an unknown format.
+    """
+    if export_format not in EXPORT_CONTENT_TYPES:
+        raise ValueError(f'Unknown export format: {export_format}')
+    headers = [header for header, _ in columns]
+    rows = iter_export_rows(queryset, columns)
+    lines = _csv_lines(rows, headers) if export_format == 'csv' else _ndjson_lines(rows, headers)
+
+    blocks = _buffered(lines)
+    if asynchronous:
+        blocks = _async_blocks(blocks)
+    response = StreamingHttpResponse(blocks, content_type=EXPORT_CONTENT_TYPES[export_format])
+    filename = f'{name}-{timezone.localtime():%Y%m%d-%H%M}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'no-store'
+    return response
+
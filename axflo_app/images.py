@@ -0,0 +1,241 @@
+"""
+Responsive image renditions for uploaded media.
+
+Every image uploaded through IMAGE_FIELDS is resized to IMAGE_RENDITION_WIDTHS in
+WebP and JPEG by generate_renditions(), which runs in the task worker after
+a save (see signals.py) and can backfill old uploads with the
+generate_image_renditions command. Generation is idempotent: renditions that
+already exist are left alone. Templates use the {% responsive_image %} tag
+and JSON payloads use image_sources(); both fall back to the original file
+until its renditions exist. Renditions of an image that is replaced or
+deleted are removed again by delete_renditions().
+"""
+import hashlib
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import (
+    NewsArticle, Achievement, ProjectPortfolio, CompanyMilestone, ProjectImage,
+    ImageRendition
+)
+
+logger = logging.getLogger(__name__)
+
+RENDITION_CACHE_PREFIX = 'renditions'
+RENDITION_DIR = 'renditions'
+
+# Model -> image fields that get renditions
+IMAGE_FIELDS = {
+    NewsArticle: ['image'],
+    Achievement: ['featured_image'],
+    ProjectPortfolio: ['featured_image', 'before_image', 'after_image'],
+    CompanyMilestone: ['image'],
+    ProjectImage: ['image'],
+}
+
+# Pillow save options per rendition format
+FORMAT_OPTIONS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+
+def get_rendition_widths():
+    return getattr(settings, 'IMAGE_RENDITION_WIDTHS', [320, 640, 1024, 1600])
+
+
+def _cache_key(source_name):
+    return f'{RENDITION_CACHE_PREFIX}:{hashlib.md5(source_name.encode("utf-8")).hexdigest()}'
+
+
+def _rendition_name(source_name, width, fmt):
+    stem = os.path.splitext(source_name)[0]
+    extension = 'jpg' if fmt == 'jpeg' else fmt
+    return f'{RENDITION_DIR}/{stem}-{width}w.{extension}'
+
+
+def _prepare(image, fmt):
+    """Apply EXIF rotation and convert to a mode the target format can store"""
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    if fmt == 'jpeg':
+        if has_alpha:
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            return background
+        return image.convert('RGB')
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+def generate_renditions(source_name):
+    """
+    Create any missing renditions of a stored image.
+
+    Returns the number of renditions written (0 when everything already
+    existed, the original is missing or no longer used, or it cannot be
+    decoded). Undecodable images are logged rather than raised, since
+    retrying the task would fail the same way.
+    """
+    if not source_name or not default_storage.exists(source_name) or not is_image_in_use(source_name):
+        return 0
+
+    existing = {
+        (rendition.format, rendition.target_width)
+        for rendition in ImageRendition.objects.filter(source_name=source_name)
+        if default_storage.exists(rendition.file)
+    }
+
+    try:
+        with default_storage.open(source_name, 'rb') as source:
+            original = Image.open(source)
+            original.load()
+    except (Image.DecompressionBombError, UnidentifiedImageError, OSError, ValueError) as exc:
+        logger.warning('Skipping renditions of %s: %s', source_name, exc)
+        return 0
+
+    original_width = original.width
+    targets = sorted({min(width, original_width) for width in get_rendition_widths()})
+    written = 0
+    for fmt, options in FORMAT_OPTIONS.items():
+        image = None
+        for target_width in targets:
+            if (fmt, target_width) in existing:
+                continue
+            if image is None:
+                image = _prepare(original, fmt)
+            resized = image
+            if target_width < image.width:
+                height = round(image.height * target_width / image.width)
+                resized = image.resize((target_width, height), Image.LANCZOS)
+
+            buffer = BytesIO()
+            resized.save(buffer, **options)
+            name = _rendition_name(source_name, target_width, fmt)
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            name = default_storage.save(name, ContentFile(buffer.getvalue()))
+
+            ImageRendition.objects.update_or_create(
+                source_name=source_name, format=fmt, target_width=target_width,
+                defaults={'file': name, 'width': resized.width, 'height': resized.height},
+            )
+            written += 1
+
+    cache.delete(_cache_key(source_name))
+    return written
+
+
+def get_renditions(source_name):
+    """Return [{'format', 'width', 'height', 'url'}] for an image, cached"""
+    if not source_name:
+        return []
+    key = _cache_key(source_name)
+    renditions = cache.get(key)
+    if renditions is None:
+        renditions = [
+            {
+                'format': rendition.format,
+                'width': rendition.width,
+                'height': rendition.height,
+                'url': default_storage.url(rendition.file),
+            }
+            for rendition in ImageRendition.objects.filter(source_name=source_name).order_by('width')
+        ]
+        cache.set(key, renditions, None)
+    return renditions
+
+
+def build_srcset(renditions, fmt):
+    return ', '.join(f'{r["url"]} {r["width"]}w' for r in renditions if r['format'] == fmt)
+
+
+def image_sources(field_file):
+    """
+    JSON-ready description of an image field: the original URL plus
+    srcset strings per format and the intrinsic size of the largest
+    rendition. Returns None for an empty field.
+    """
+    if not field_file:
+        return None
+    renditions = get_renditions(field_file.name)
+    sources = {'src': field_file.url, 'srcset': {}, 'width': None, 'height': None}
+    if renditions:
+        largest = ([r for r in renditions if r['format'] == 'jpeg'] or renditions)[-1]
+        sources['src'] = largest['url']
+        sources['width'] = largest['width']
+        sources['height'] = largest['height']
+        sources['srcset'] = {fmt: build_srcset(renditions, fmt) for fmt in FORMAT_OPTIONS}
+    return sources
+
+
+def render_picture(field_file, alt='', sizes='100vw', css_class='', loading='lazy'):
+    """<picture> markup for an image field, or a plain <img> without renditions"""
+    sources = image_sources(field_file)
+    if sources is None:
+        return ''
+    # Intrinsic size is left to CSS; fixed width/height attributes would
+    # distort images whose stylesheet only sets a width
+    if not sources['srcset'].get('webp') or not sources['srcset'].get('jpeg'):
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}">',
+            sources['src'], alt, css_class, loading
+        )
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="{}">'
+        '</picture>',
+        sources['srcset']['webp'], sizes,
+        sources['src'], sources['srcset']['jpeg'], sizes,
+        alt, css_class, loading
+    )
+
+
+def get_image_names(instance):
+    """Storage names of the images on an instance that get renditions"""
+    names = []
+    for field_name in IMAGE_FIELDS.get(type(instance), []):
+        field_file = getattr(instance, field_name)
+        if field_file:
+            names.append(field_file.name)
+    return names
+
+
+def has_renditions(source_name):
+    return ImageRendition.objects.filter(source_name=source_name).exists()
+
+
+def is_image_in_use(source_name):
+    """True if any row still points at this upload"""
+    return any(
+        model.objects.filter(**{field_name: source_name}).exists()
+        for model, field_names in IMAGE_FIELDS.items()
+        for field_name in field_names
+    )
+
+
+def delete_renditions(source_names):
+    """
+    Remove the renditions of images no row uses any more.
+
+    Names still used by another row are left alone. Returns the number
+    of renditions deleted.
+    """
+    names = [name for name in set(source_names) if name and not is_image_in_use(name)]
+    if not names:
+        return 0
+    renditions = ImageRendition.objects.filter(source_name__in=names)
+    for file_name in renditions.values_list('file', flat=True):
+        default_storage.delete(file_name)
+    deleted, _ = renditions.delete()
+    cache.delete_many([_cache_key(name) for name in names])
+    return deleted
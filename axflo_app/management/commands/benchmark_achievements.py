@@ -0,0 +1,118 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.template.defaultfilters import filesizeformat
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import NoReverseMatch, reverse
+
+from axflo_app.models import Achievement, AchievementCategory, CompanyMilestone, ProjectPortfolio
+
+TYPES = ['AWARD', 'CERTIFICATION', 'MILESTONE', 'RECOGNITION', 'PROJECT_SUCCESS']
+PROJECT_TYPES = ['OIL_SPILL', 'WATER_TREATMENT', 'ENVIRONMENTAL', 'MARINE', 'CONSULTANCY']
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the achievements page and its feed endpoints on a synthetic archive '
+        '(rolled back afterwards): server time, queries and bytes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--achievements', type=int, default=5000)
+        parser.add_argument('--projects', type=int, default=500)
+        parser.add_argument('--milestones', type=int, default=200)
+        parser.add_argument('--repeat', type=int, default=5, help='Requests per measurement')
+
+    def handle(self, *args, **options):
+        self.client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost')
+        self.repeat = options['repeat']
+
+        # Everything happens in a transaction that is rolled back at the end;
+        # the page cache is off so every request does the full work
+        with transaction.atomic(), override_settings(PAGE_CACHE_ENABLED=False):
+            self.create_archive(options['achievements'], options['projects'], options['milestones'])
+
+            self.stdout.write(f'\n{"request":<48}{"median ms":>10}{"queries":>9}{"bytes":>12}')
+            self.measure('/achievements/')
+            try:
+                feed_url = reverse('axflo_app:achievements_feed', args=['achievements'])
+            except NoReverseMatch:
+                feed_url = None
+            if feed_url:
+                self.measure(feed_url)
+                self.measure(f'{feed_url}?type=award&year=2015')
+                # Page 50, reached by following the cursors
+                cursor = None
+                for _ in range(49):
+                    cursor = self.client.get(feed_url, {'cursor': cursor} if cursor else {}).json()['next']
+                self.measure(f'{feed_url}?cursor={cursor}', label=f'{feed_url} (page 50)')
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('\n>> Benchmark completed, synthetic archive rolled back'))
+
+    def create_archive(self, achievements, projects, milestones):
+        self.stdout.write(
+            f'>> Creating {achievements} achievements, {projects} projects and {milestones} milestones...'
+        )
+        rng = random.Random(42)
+        start = date(2000, 1, 1)
+        category = AchievementCategory.objects.create(name='Benchmark', icon='fa-award')
+        Achievement.objects.bulk_create([
+            Achievement(
+                title=f'Benchmark achievement {i}',
+                description='Synthetic achievement description. ' * 12,
+                short_description='Synthetic achievement for the benchmark',
+                achievement_type=rng.choice(TYPES),
+                category=category,
+                achievement_date=start + timedelta(days=rng.randrange(9000)),
+                impact_metrics={'co2_reduced': co2, 'people_trained': rng.randrange(100)},
+                co2_reduced=co2,
+            )
+            for i, co2 in enumerate(rng.randrange(1000) for _ in range(achievements))
+        ], batch_size=1000)
+        ProjectPortfolio.objects.bulk_create([
+            ProjectPortfolio(
+                title=f'Benchmark project {i}',
+                slug=f'benchmark-project-{i}',
+                client='Benchmark client',
+                location='Port Harcourt',
+                project_type=rng.choice(PROJECT_TYPES),
+                brief_description='Synthetic project for the benchmark',
+                detailed_description='Synthetic project description. ' * 20,
+                start_date=start + timedelta(days=rng.randrange(8000)),
+                completion_date=start + timedelta(days=8000 + rng.randrange(1000)) if i % 5 else None,
+                environmental_impact={'co2_prevented': co2},
+                co2_prevented=co2,
+                key_statistics={'crew': rng.randrange(200), 'vessels': rng.randrange(10)},
+            )
+            for i, co2 in enumerate(rng.randrange(5000) for _ in range(projects))
+        ], batch_size=1000)
+        milestone_dates = [start + timedelta(days=rng.randrange(9000)) for _ in range(milestones)]
+        CompanyMilestone.objects.bulk_create([
+            CompanyMilestone(
+                title=f'Benchmark milestone {i}',
+                description='Synthetic milestone description. ' * 5,
+                milestone_date=milestone_date,
+                milestone_year=milestone_date.year,
+            )
+            for i, milestone_date in enumerate(milestone_dates)
+        ], batch_size=1000)
+
+    def measure(self, url, label=None):
+        timings = []
+        for _ in range(self.repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = self.client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+        label = label or url
+        self.stdout.write(
+            f'{label[:47]:<48}{statistics.median(timings):>10.1f}{len(queries):>9}'
+            f'{filesizeformat(len(response.content)):>12}'
+        )
@@ -0,0 +1,158 @@
+import http.client
+import os
+import shlex
+import socket
+import statistics
+import subprocess
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from axflo_app.models import NewsArticle
+
+DEFAULT_WSGI_COMMAND = (
+    'gunicorn axflo_project.wsgi:application --bind 127.0.0.1:{port} '
+    '--workers {workers} --threads {threads}'
+)
+DEFAULT_ASGI_COMMAND = 'daphne -b 127.0.0.1 -p {port} axflo_project.asgi:application'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the public pages under the WSGI deployment (gunicorn with the sync views, as in '
+        'the Procfile), gunicorn with the async views, and the ASGI one (daphne with the async views): '
+        'requests/sec and latency percentiles at a fixed concurrency. '
+        'The page cache is off in every server unless --page-cache is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', action='append', help='Page to request (repeatable, default: the async pages)')
+        parser.add_argument('--concurrency', type=int, default=32, help='Simultaneous clients')
+        parser.add_argument('--duration', type=float, default=15, help='Seconds per server')
+        parser.add_argument('--workers', type=int, default=1, help='gunicorn worker processes')
+        parser.add_argument('--threads', type=int, default=8, help='Threads per gunicorn worker')
+        parser.add_argument('--wsgi-command', default=DEFAULT_WSGI_COMMAND)
+        parser.add_argument('--asgi-command', default=DEFAULT_ASGI_COMMAND)
+        parser.add_argument('--page-cache', action='store_true', help='Leave the full-page cache on')
+
+    def handle(self, *args, **options):
+        paths = options['path'] or self.default_paths()
+        self.host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+        env = dict(os.environ, PAGE_CACHE_ENABLED=str(options['page_cache']))
+        self.stdout.write(
+            f'>> {len(paths)} pages, {options["concurrency"]} clients, {options["duration"]:.0f} s per server, '
+            f'page cache {"on" if options["page_cache"] else "off"}'
+        )
+
+        # (label, server command, ASGI_MODE); the first is the baseline
+        servers = [
+            ('WSGI', options['wsgi_command'], False),
+            ('WSGI async', options['wsgi_command'], True),
+            ('ASGI', options['asgi_command'], True),
+        ]
+        results = {}
+        for mode, template, asgi_mode in servers:
+            port = free_port()
+            command = template.format(port=port, workers=options['workers'], threads=options['threads'])
+            self.stdout.write(f'>> {mode} ({"async" if asgi_mode else "sync"} views): {command}')
+            server = subprocess.Popen(
+                shlex.split(command), env=dict(env, ASGI_MODE=str(asgi_mode)),
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            )
+            try:
+                self.wait_for(port, server)
+                # Warm up templates, connections and caches
+                self.run_load(port, paths, options['concurrency'], 2)
+                results[mode] = self.run_load(port, paths, options['concurrency'], options['duration'])
+            finally:
+                server.terminate()
+                server.wait(timeout=10)
+
+        self.stdout.write(f'\n{"":<12}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"errors":>8}')
+        for mode, (count, elapsed, latencies, errors) in results.items():
+            self.stdout.write(
+                f'{mode:<12}{count / elapsed:>10.1f}{statistics.median(latencies) * 1000:>10.1f}'
+                f'{percentile(latencies, 0.95) * 1000:>10.1f}{percentile(latencies, 0.99) * 1000:>10.1f}'
+                f'{errors:>8}'
+            )
+        baseline = results['WSGI'][0] / results['WSGI'][1]
+        self.stdout.write('')
+        for mode in ('WSGI async', 'ASGI'):
+            rate = results[mode][0] / results[mode][1]
+            self.stdout.write(self.style.SUCCESS(
+                f'{mode} serves {rate / baseline:.2f}x the requests/sec of WSGI with sync views'
+            ))
+
+    def default_paths(self):
+        paths = ['/', reverse('axflo_app:media'), reverse('axflo_app:careers'), reverse('axflo_app:achievements')]
+        slug = NewsArticle.objects.filter(status='PUBLISHED').values_list('slug', flat=True).first()
+        if slug:
+            paths.append(reverse('axflo_app:blog_detail', args=[slug]))
+        return paths
+
+    def wait_for(self, port, server, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'Server exited: {server.stderr.read().decode(errors="replace")[-2000:]}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'Server did not start listening on port {port}')
+
+    def run_load(self, port, paths, concurrency, duration):
+        """Closed-loop load: each client sends its next request when the last one returns"""
+        latencies = []
+        errors = [0]
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def client(offset):
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            i = offset
+            while time.perf_counter() < deadline:
+                path = paths[i % len(paths)]
+                i += 1
+                started = time.perf_counter()
+                try:
+                    connection.request('GET', path, headers={'Host': self.host})
+                    response = connection.getresponse()
+                    response.read()
+                    ok = response.status == 200
+                    if response.getheader('Connection', '').lower() == 'close':
+                        connection.close()
+                except (OSError, http.client.HTTPException):
+                    ok = False
+                    connection.close()
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors[0] += 1
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if not latencies:
+            raise CommandError('Every request failed')
+        return len(latencies), time.perf_counter() - started, latencies, errors[0]
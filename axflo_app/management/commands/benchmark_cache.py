@@ -0,0 +1,127 @@
+import multiprocessing
+import random
+import tempfile
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from axflo_app.page_cache import (
+    PAGE_CACHE_PREFIX, get_group_version, invalidate_page_group
+)
+
+BENCHMARK_GROUP = 'benchmark'
+
+
+def _run_worker(worker_id, options, generation, results):
+    """Simulate page traffic in one worker process and report its hit rate"""
+    cache = caches['default']
+    rng = random.Random(worker_id)
+    pages = options['pages']
+    hits = misses = stale_hits = 0
+
+    for i in range(options['requests']):
+        # Worker 0 plays the staff member editing content
+        if worker_id == 0 and i and i % options['invalidate_every'] == 0:
+            with generation.get_lock():
+                generation.value += 1
+            invalidate_page_group(BENCHMARK_GROUP)
+
+        # Skewed page popularity, as on the public site
+        page = min(int(rng.paretovariate(1.2)), pages) - 1
+        key = f'{PAGE_CACHE_PREFIX}:{BENCHMARK_GROUP}:v{get_group_version(BENCHMARK_GROUP)}:{page}'
+        entry = cache.get(key)
+        if entry is None:
+            misses += 1
+            cache.set(key, generation.value, 300)
+        else:
+            hits += 1
+            if entry < generation.value:
+                stale_hits += 1
+
+    results.put((worker_id, hits, misses, stale_hits))
+
+
+class Command(BaseCommand):
+    help = 'Measure page-cache hit rate and stale reads across N worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backend',
+            type=str,
+            choices=['configured', 'locmem', 'file'],
+            default='configured',
+            help='Cache backend to benchmark (configured uses settings.CACHES)'
+        )
+        parser.add_argument('--workers', type=int, default=4, help='Number of worker processes')
+        parser.add_argument('--requests', type=int, default=5000, help='Requests per worker')
+        parser.add_argument('--pages', type=int, default=200, help='Number of distinct pages')
+        parser.add_argument(
+            '--invalidate-every',
+            type=int,
+            default=1000,
+            help='Invalidate the page group every N requests of worker 0'
+        )
+
+    def handle(self, *args, **options):
+        backend = options['backend']
+        if backend == 'locmem':
+            cache_settings = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        elif backend == 'file':
+            cache_settings = {'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': tempfile.mkdtemp(prefix='axflo-cache-bench-'),
+            }}
+        else:
+            cache_settings = None
+
+        if cache_settings:
+            with override_settings(CACHES=cache_settings):
+                self.run_benchmark(backend, options)
+        else:
+            self.run_benchmark(backend, options)
+
+    def run_benchmark(self, backend, options):
+        cache = caches['default']
+        cache.delete(f'{PAGE_CACHE_PREFIX}:version:{BENCHMARK_GROUP}')
+        caches.close_all()
+
+        ctx = multiprocessing.get_context('fork')
+        generation = ctx.Value('i', 0)
+        results = ctx.Queue()
+        workers = [
+            ctx.Process(target=_run_worker, args=(worker_id, options, generation, results))
+            for worker_id in range(options['workers'])
+        ]
+
+        self.stdout.write(
+            f'>> Benchmarking {backend} cache ({cache.__class__.__name__}) '
+            f'with {options["workers"]} workers x {options["requests"]} requests...'
+        )
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        rows = sorted(results.get() for _ in workers)
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        total_hits = total_misses = total_stale = 0
+        for worker_id, hits, misses, stale_hits in rows:
+            total_hits += hits
+            total_misses += misses
+            total_stale += stale_hits
+            self.stdout.write(
+                f'   worker {worker_id}: hit rate {hits / (hits + misses):.1%}, '
+                f'stale hits {stale_hits}'
+            )
+
+        total = total_hits + total_misses
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nBenchmark completed in {elapsed:.2f}s\n'
+                f'Overall hit rate: {total_hits / total:.1%} ({total_hits}/{total})\n'
+                f'Stale hits after invalidation: {total_stale}'
+            )
+        )
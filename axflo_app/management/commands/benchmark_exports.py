@@ -0,0 +1,88 @@
+import time
+import tracemalloc
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.defaultfilters import filesizeformat
+from django.test import Client
+from django.urls import reverse
+
+from axflo_app.models import Subscriber, SubscriptionCategory
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream the subscriber export over a synthetic list (rolled back afterwards) '
+        'and report time and peak Python memory, against loading the queryset whole'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000)
+        parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv')
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost')
+
+        with transaction.atomic():
+            staff = User.objects.create_user(f'export-benchmark-{uuid.uuid4().hex[:8]}', is_staff=True)
+            client.force_login(staff)
+            url = reverse('axflo_app:admin_subscribers_export')
+            self.categories = [
+                SubscriptionCategory.objects.create(name=f'Benchmark interest {i}') for i in range(3)
+            ]
+
+            # A tenth of the list, then all of it: a flat export peaks at the same memory
+            created = 0
+            for rows in sorted({max(1, options['rows'] // 10), options['rows']}):
+                self.create_subscribers(created, rows)
+                created = rows
+                tracemalloc.start()
+                started = time.perf_counter()
+                response = client.get(url, {'format': options['format']})
+                size = lines = 0
+                for chunk in response.streaming_content:
+                    size += len(chunk)
+                    lines += chunk.count(b'\n')
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.stdout.write(
+                    f'>> streamed export: {lines} lines, {filesizeformat(size)} in {elapsed:.1f} s, '
+                    f'peak memory {filesizeformat(peak)}'
+                )
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            subscribers = list(Subscriber.objects.prefetch_related('interests'))
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.stdout.write(
+                f'>> whole queryset in memory: {len(subscribers)} rows in {elapsed:.1f} s, '
+                f'peak memory {filesizeformat(peak)}'
+            )
+            del subscribers
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('\n>> Benchmark completed, synthetic subscribers rolled back'))
+
+    def create_subscribers(self, start, end):
+        self.stdout.write(f'>> Creating subscribers {start}-{end}...')
+        through = Subscriber.interests.through
+        for batch_start in range(start, end, 5000):
+            batch = Subscriber.objects.bulk_create([
+                Subscriber(
+                    email=f'export-benchmark-{i}@example.com',
+                    first_name='Benchmark',
+                    last_name=f'Subscriber {i}',
+                    unsubscribe_token=f'export-benchmark-{i}',
+                )
+                for i in range(batch_start, min(end, batch_start + 5000))
+            ])
+            through.objects.bulk_create([
+                through(subscriber_id=subscriber.pk, subscriptioncategory_id=self.categories[i % 3].pk)
+                for i, subscriber in enumerate(batch)
+            ])
@@ -0,0 +1,130 @@
+import time
+
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+
+from axflo_app.models import Newsletter, NewsletterDelivery, Subscriber, SubscriptionCategory
+from axflo_app.newsletter_delivery import deliver_newsletter
+
+BACKENDS = {
+    'counting': 'axflo_app.management.commands.benchmark_newsletter.CountingEmailBackend',
+    'locmem': 'django.core.mail.backends.locmem.EmailBackend',
+    'smtp': 'django.core.mail.backends.smtp.EmailBackend',
+}
+
+
+class CountingEmailBackend(BaseEmailBackend):
+    """Serialize every message like SMTP would, but only count them"""
+    sent = 0
+    connections_opened = 0
+
+    def open(self):
+        CountingEmailBackend.connections_opened += 1
+        return True
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            message.message().as_bytes()
+        CountingEmailBackend.sent += len(email_messages)
+        return len(email_messages)
+
+
+class Command(BaseCommand):
+    help = 'Deliver a newsletter to N synthetic subscribers and report throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscribers', type=int, default=100000, help='Number of synthetic subscribers')
+        parser.add_argument(
+            '--backend',
+            type=str,
+            choices=list(BACKENDS),
+            default='counting',
+            help='Mail backend (smtp talks to --smtp-host/--smtp-port, e.g. an aiosmtpd stand-in)'
+        )
+        parser.add_argument('--smtp-host', type=str, default='localhost')
+        parser.add_argument('--smtp-port', type=int, default=8025)
+        parser.add_argument('--batch-size', type=int, default=500, help='Messages per SMTP batch')
+        parser.add_argument('--concurrency', type=int, default=4, help='Parallel SMTP connections')
+        parser.add_argument('--rate-limit', type=float, default=0, help='Messages per second (0 = unlimited)')
+
+    def handle(self, *args, **options):
+        email_settings = {
+            'EMAIL_BACKEND': BACKENDS[options['backend']],
+            'EMAIL_HOST': options['smtp_host'],
+            'EMAIL_PORT': options['smtp_port'],
+            'EMAIL_USE_TLS': False,
+            'EMAIL_HOST_USER': '',
+            'EMAIL_HOST_PASSWORD': '',
+        }
+
+        # Everything happens in a transaction that is rolled back at the end
+        with override_settings(**email_settings), transaction.atomic():
+            newsletter = self.create_fixtures(options['subscribers'])
+            self.run_benchmark(newsletter, options)
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('\n>> Benchmark completed, synthetic data rolled back'))
+
+    def create_fixtures(self, count):
+        self.stdout.write(f'>> Creating {count} synthetic subscribers...')
+        categories = [
+            SubscriptionCategory.objects.create(name=f'Benchmark category {i}') for i in range(4)
+        ]
+        Subscriber.objects.bulk_create(
+            [
+                Subscriber(email=f'benchmark-{i}@example.com', unsubscribe_token=f'benchmark-token-{i}')
+                for i in range(count)
+            ],
+            batch_size=2000,
+        )
+
+        # Every subscriber follows one or two categories
+        Interest = Subscriber.interests.through
+        subscriber_ids = Subscriber.objects.filter(
+            email__startswith='benchmark-'
+        ).values_list('id', flat=True)
+        interests = []
+        for i, subscriber_id in enumerate(subscriber_ids.iterator(chunk_size=2000)):
+            interests.append(Interest(subscriber_id=subscriber_id, subscriptioncategory_id=categories[i % 4].id))
+            if i % 3 == 0:
+                interests.append(Interest(subscriber_id=subscriber_id, subscriptioncategory_id=categories[(i + 1) % 4].id))
+        Interest.objects.bulk_create(interests, batch_size=2000)
+
+        newsletter = Newsletter.objects.create(
+            title='Benchmark newsletter',
+            content='Quarterly update on our offshore, environmental and renewable energy projects.\n' * 20,
+        )
+        newsletter.categories.set(categories[:3])
+        return newsletter
+
+    def run_benchmark(self, newsletter, options):
+        self.stdout.write(
+            f'>> Delivering with {options["concurrency"]} connections, '
+            f'batches of {options["batch_size"]}...'
+        )
+        started = time.perf_counter()
+        result = deliver_newsletter(
+            newsletter,
+            batch_size=options['batch_size'],
+            concurrency=options['concurrency'],
+            rate_limit=options['rate_limit'],
+        )
+        elapsed = time.perf_counter() - started
+
+        delivered = NewsletterDelivery.objects.filter(newsletter=newsletter, status='SENT').count()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nSent {result["sent"]} messages ({result["failed"]} failed) in {elapsed:.2f}s '
+                f'= {result["sent"] / elapsed:.0f} msg/s\n'
+                f'Template renders: {result["renders"]} (one per interest set)\n'
+                f'Delivery rows marked SENT: {delivered}'
+            )
+        )
+        if options['backend'] == 'counting':
+            self.stdout.write(f'Mail connections opened: {CountingEmailBackend.connections_opened}')
+
+        # A second run must not mail anyone again
+        again = deliver_newsletter(newsletter, batch_size=options['batch_size'], concurrency=options['concurrency'])
+        self.stdout.write(f'Re-run sent {again["sent"]} messages (expected 0)')
@@ -0,0 +1,95 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from axflo_app.models import NewsArticle
+from axflo_app.search import get_search_backend, rebuild_search_index, search_articles
+
+WORDS = [
+    'offshore', 'pipeline', 'drilling', 'refinery', 'environmental', 'response',
+    'spill', 'containment', 'marine', 'vessel', 'safety', 'training', 'waste',
+    'recycling', 'water', 'treatment', 'renewable', 'energy', 'solar', 'project',
+    'engineering', 'procurement', 'installation', 'commissioning', 'inspection',
+    'platform', 'subsea', 'maintenance', 'logistics', 'emergency', 'community',
+    'partnership', 'certification', 'compliance', 'monitoring', 'technology',
+]
+
+# Filler vocabulary so topic words are selective, as in real articles
+FILLER = [f'word{n}' for n in range(5000)]
+
+QUERIES = ['pipeline', 'oil spill response', 'renewable energy', 'subsea inspection', 'trainings']
+
+
+class Command(BaseCommand):
+    help = 'Compare full-text search against the old icontains filter on a synthetic archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=100000, help='Number of synthetic articles')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'>> Search backend: {get_search_backend() or "icontains fallback"}'
+        )
+
+        # Everything happens in a transaction that is rolled back at the end
+        with transaction.atomic():
+            self.create_articles(options['articles'])
+            self.run_benchmark(options['repeat'])
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('\n>> Benchmark completed, synthetic articles rolled back'))
+
+    def create_articles(self, count):
+        self.stdout.write(f'>> Creating {count} synthetic articles...')
+        rng = random.Random(42)
+        now = timezone.now()
+        batch = []
+        for i in range(count):
+            batch.append(NewsArticle(
+                title=' '.join(rng.choices(WORDS, k=3) + rng.choices(FILLER, k=3)).title(),
+                slug=f'benchmark-article-{i}',
+                excerpt=' '.join(rng.choices(WORDS, k=2) + rng.choices(FILLER, k=23)),
+                content=' '.join(rng.choices(WORDS, k=5) + rng.choices(FILLER, k=295)),
+                tags=', '.join(rng.choices(WORDS, k=3)),
+                status='PUBLISHED',
+                published_at=now,
+            ))
+            if len(batch) == 2000:
+                NewsArticle.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            NewsArticle.objects.bulk_create(batch)
+
+        started = time.perf_counter()
+        rebuild_search_index()
+        self.stdout.write(f'   Search index built in {time.perf_counter() - started:.2f}s')
+
+    def run_benchmark(self, repeat):
+        published = NewsArticle.objects.filter(status='PUBLISHED').order_by('-published_at')
+
+        self.stdout.write(f'\n{"query":<22}{"icontains ms":>14}{"fulltext ms":>14}{"matches":>10}')
+        for query in QUERIES:
+            icontains = published.filter(
+                Q(title__icontains=query) |
+                Q(excerpt__icontains=query) |
+                Q(tags__icontains=query)
+            )
+            fulltext = search_articles(published, query)
+
+            # First page plus the total count, as the media page does
+            old_ms = self.time_query(lambda: (icontains.count(), list(icontains[:5])), repeat)
+            new_ms = self.time_query(lambda: (fulltext.count(), list(fulltext[:5])), repeat)
+            self.stdout.write(f'{query:<22}{old_ms:>14.1f}{new_ms:>14.1f}{fulltext.count():>10}')
+
+    def time_query(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - started) * 1000)
+        return sorted(timings)[len(timings) // 2]
@@ -0,0 +1,72 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+
+from axflo_app.models import Newsletter, Subscriber, Task
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the latency of the staff "send newsletter now" request with delivery run '
+        'inside the request (as before the task queue) vs queued for the worker'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscribers', type=int, default=2000, help='Number of synthetic subscribers')
+        parser.add_argument('--requests', type=int, default=5, help='Newsletters sent per mode')
+
+    def handle(self, *args, **options):
+        # Messages are serialized as for SMTP but not sent (see benchmark_newsletter)
+        with override_settings(
+            EMAIL_BACKEND='axflo_app.management.commands.benchmark_newsletter.CountingEmailBackend',
+            STAFF_NOTIFICATION_EMAILS=[],
+        ), transaction.atomic():
+            self.stdout.write(f'>> Creating {options["subscribers"]} synthetic subscribers...')
+            Subscriber.objects.bulk_create(
+                [
+                    Subscriber(email=f'benchmark-{i}@example.com', unsubscribe_token=f'benchmark-token-{i}')
+                    for i in range(options['subscribers'])
+                ],
+                batch_size=2000,
+            )
+            host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+            client = Client(HTTP_HOST=host)
+            client.force_login(User.objects.create_user('benchmark-staff', is_staff=True))
+
+            self.stdout.write(f'\n{"mode":<10}{"p50 ms":>10}{"max ms":>10}')
+            # TASK_QUEUE_EAGER runs deliver_newsletter() inside the request,
+            # which is what the create view did before delivery was queued
+            for mode, eager in (('inline', True), ('queued', False)):
+                with override_settings(TASK_QUEUE_EAGER=eager):
+                    timings = self.measure(client, mode, options['requests'])
+                self.stdout.write(f'{mode:<10}{self.percentile(timings, 50):>10.1f}{max(timings):>10.1f}')
+
+            queued = Task.objects.filter(status='QUEUED').count()
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n>> Benchmark completed ({queued} deliveries were queued), synthetic data rolled back'
+        ))
+
+    def measure(self, client, mode, count):
+        timings = []
+        for i in range(count):
+            started = time.perf_counter()
+            response = client.post('/admin-newsletter-create/', {
+                'title': f'Benchmark {mode} {i}',
+                'content': 'Quarterly update on our offshore and renewable energy projects.\n' * 20,
+                'template_type': 'basic',
+                'send_option': 'immediate',
+            })
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 302 or not Newsletter.objects.filter(title=f'Benchmark {mode} {i}').exists():
+                raise RuntimeError(f'Newsletter {i} was not created ({response.status_code})')
+        return timings
+
+    def percentile(self, timings, pct):
+        ordered = sorted(timings)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
@@ -0,0 +1,64 @@
+import gzip
+import os
+import time
+
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from axflo_app.bundles import BUNDLES, build_bundles, bundle_path
+
+
+def _gzipped(text):
+    return len(gzip.compress(text.encode('utf-8'), 9))
+
+
+class Command(BaseCommand):
+    help = (
+        'Build the per-page CSS/JS bundles and critical CSS from the static sources '
+        'and report their sizes. collectstatic builds them through STORAGES["staticfiles"]; '
+        'this command checks a build without collecting.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Also write the bundles into this directory')
+
+    def handle(self, *args, **options):
+        sources = {}
+
+        def read(path):
+            if path not in sources:
+                with open(finders.find(path), encoding='utf-8') as f:
+                    sources[path] = f.read()
+            return sources[path]
+
+        started = time.perf_counter()
+        output = build_bundles(read)
+        elapsed = time.perf_counter() - started
+
+        for name, spec in BUNDLES.items():
+            line = [f'>> {name}:']
+            for kind in ('css', 'js'):
+                source = '\n'.join(read(path) for path in spec[kind])
+                bundle = output[bundle_path(name, kind)]
+                line.append(
+                    f'{kind} {len(spec[kind])} files {filesizeformat(len(source.encode()))} '
+                    f'-> {filesizeformat(len(bundle.encode()))} ({filesizeformat(_gzipped(bundle))} gzipped);'
+                )
+            critical = output.get(bundle_path(name, 'critical'))
+            if critical is not None:
+                line.append(
+                    f'critical {filesizeformat(len(critical.encode()))} ({filesizeformat(_gzipped(critical))} gzipped)'
+                )
+            self.stdout.write(' '.join(line).rstrip(';'))
+
+        if options['output']:
+            for path, content in output.items():
+                target = os.path.join(options['output'], path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, 'w', encoding='utf-8') as f:
+                    f.write(content)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n{len(BUNDLES)} pages, {len(output)} files built in {elapsed:.1f}s'
+        ))
@@ -0,0 +1,270 @@
+import uuid
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from axflo_app import request_metrics
+from axflo_app.models import (
+    Achievement, AchievementCategory, BlogCategory, CompanyMilestone, ContactResponse,
+    ContactSubmission, InquiryCategory, JobApplication, JobPosting, NewsArticle, Newsletter,
+    ProjectPortfolio, Subscriber, SubscriptionCategory, parse_requirements,
+)
+
+# Most queries each page may run with cold caches: (URL name, sample
+# object the URL takes, budget). Pages that run a query per row also fail
+# the growth check, which repeats every request after adding more rows.
+PUBLIC_BUDGETS = [
+    ('axflo_app:index', None, 4),
+    ('axflo_app:media', None, 5),
+    ('axflo_app:careers', None, 2),
+    ('axflo_app:achievements', None, 10),
+    ('axflo_app:blog_detail', 'article_slug', 5),
+    ('axflo_app:contact', None, 2),
+]
+STAFF_BUDGETS = [
+    ('axflo_app:admindashboard', None, 12),
+    ('axflo_app:admin_users', None, 4),
+    ('axflo_app:admin_contacts', None, 7),
+    ('axflo_app:admin_contact_detail', 'contact_id', 7),
+    ('axflo_app:admin_subscribers', None, 6),
+    ('axflo_app:admin_newsletters', None, 6),
+    ('axflo_app:admin_newsletter_categories', None, 8),
+    ('axflo_app:admin_newsletter_edit', 'newsletter_id', 6),
+    ('axflo_app:admin_careers', None, 6),
+    ('axflo_app:admin_applications', None, 8),
+    ('axflo_app:admin_application_detail', 'application_id', 5),
+    ('axflo_app:admin_blog', None, 7),
+    ('axflo_app:admin_blog_categories', None, 6),
+    ('axflo_app:admin_blog_edit', 'article_id', 6),
+    ('axflo_app:admin_achievements', None, 7),
+    ('axflo_app:admin_achievement_categories', None, 6),
+    ('axflo_app:admin_portfolio', None, 10),
+    ('axflo_app:admin_milestones', None, 8),
+    ('admin:axflo_app_contactsubmission_changelist', None, 8),
+    ('admin:axflo_app_contactresponse_changelist', None, 8),
+    ('admin:axflo_app_contactresponse_add', None, 5),
+    ('admin:axflo_app_jobapplication_changelist', None, 8),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed realistic data volumes (rolled back afterwards), request the public and staff '
+        'pages with cold caches and fail if any runs more queries than its budget, or more '
+        'queries once the tables have grown (an N+1). Repeated SQL is reported with its call site.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1, help='Multiply the seeded row counts')
+        parser.add_argument('--repeat-threshold', type=int, default=5,
+                            help='Report SQL that runs this many times in one request')
+
+    def handle(self, *args, **options):
+        self.run_id = uuid.uuid4().hex[:8]
+        self.repeat_threshold = options['repeat_threshold']
+        failures = []
+
+        # The timing/metrics middleware stays out of the way (this command
+        # collects itself) and each request starts with an empty cache
+        with override_settings(
+            PAGE_CACHE_ENABLED=False,
+            REQUEST_TIMING_ENABLED=False,
+            METRICS_ENABLED=False,
+            N_PLUS_ONE_DETECTION=False,
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': f'query-budgets-{self.run_id}',
+            }},
+        ), transaction.atomic():
+            request_metrics.install_hooks()
+            host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+            public = Client(HTTP_HOST=host)
+            staff = Client(HTTP_HOST=host)
+            staff.force_login(User.objects.create_superuser(f'query-budgets-{self.run_id}', is_staff=True))
+
+            self.seed(options['scale'])
+            first = self.measure(public, staff)
+            self.seed(options['scale'] * 2)
+            second = self.measure(public, staff)
+
+            self.stdout.write(f'\n{"page":<50}{"queries":>9}{"grown":>7}{"budget":>8}')
+            for name, budget in [(name, budget) for name, _, budget in PUBLIC_BUDGETS + STAFF_BUDGETS]:
+                before, repeated = first[name]
+                after, repeated_after = second[name]
+                problems = []
+                if after > budget:
+                    problems.append('over budget')
+                if after > before:
+                    problems.append('grows with the data')
+                line = f'{name:<50}{before:>9}{after:>7}{budget:>8}'
+                if problems:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f'{line}  {", ".join(problems)}'))
+                else:
+                    self.stdout.write(line)
+                for count, shape, site in repeated_after:
+                    self.stdout.write(self.style.WARNING(f'   {count} x {shape[:160]}'))
+                    self.stdout.write(self.style.WARNING(f'     from {site}'))
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'{len(failures)} page(s) over their query budget: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('\n>> All pages within their query budgets, seeded data rolled back'))
+
+    def measure(self, public, staff):
+        results = {}
+        for client, budgets in ((public, PUBLIC_BUDGETS), (staff, STAFF_BUDGETS)):
+            for name, sample, _ in budgets:
+                url = reverse(name, args=[self.samples[sample]] if sample else None)
+                cache.clear()
+                with request_metrics.collect(self.repeat_threshold) as metrics:
+                    response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f'{url} answered {response.status_code}')
+                results[name] = (metrics.queries, metrics.repeated_queries())
+        return results
+
+    def seed(self, scale):
+        """Top the tables up to ``scale`` times the base volumes"""
+        self.stdout.write(f'>> Seeding data at {scale}x...')
+        self.samples = {}
+        prefix = f'qb-{self.run_id}'
+        today = date.today()
+
+        def top_up(model, count, build, **filters):
+            existing = model.objects.filter(**filters).count()
+            model.objects.bulk_create([build(i) for i in range(existing, count)], batch_size=1000)
+            return list(model.objects.filter(**filters))
+
+        blog_categories = top_up(
+            BlogCategory, 6 * scale,
+            lambda i: BlogCategory(name=f'{prefix} topic {i}', slug=f'{prefix}-topic-{i}'),
+            slug__startswith=prefix,
+        )
+        author = User.objects.get(username=f'query-budgets-{self.run_id}')
+        articles = top_up(
+            NewsArticle, 150 * scale,
+            lambda i: NewsArticle(
+                title=f'Article {i}', slug=f'{prefix}-article-{i}', content='Body text. ' * 200,
+                excerpt='Excerpt', category=blog_categories[i % len(blog_categories)], author=author,
+                status='PUBLISHED', featured=i % 20 == 0,
+                published_at=timezone.now() - timedelta(hours=i),
+            ),
+            slug__startswith=prefix,
+        )
+        self.samples['article_slug'] = articles[0].slug
+        self.samples['article_id'] = articles[0].pk
+
+        inquiry_types = top_up(
+            InquiryCategory, 5 * scale,
+            lambda i: InquiryCategory(name=f'{prefix} inquiry {i}'),
+            name__startswith=prefix,
+        )
+        contacts = top_up(
+            ContactSubmission, 400 * scale,
+            lambda i: ContactSubmission(
+                name=f'Contact {i}', email=f'{prefix}-contact-{i}@example.com',
+                inquiry_type=inquiry_types[i % len(inquiry_types)], message='Hello ' * 50, read=i % 3 == 0,
+            ),
+            email__startswith=prefix,
+        )
+        self.samples['contact_id'] = contacts[0].pk
+        top_up(
+            ContactResponse, 100 * scale,
+            lambda i: ContactResponse(contact_submission=contacts[i], response_text='Thanks', staff_member=author),
+            staff_member=author,
+        )
+
+        jobs = top_up(
+            JobPosting, 20 * scale,
+            lambda i: JobPosting(
+                title=f'{prefix} job {i}', description='Role description', location='Port Harcourt',
+                department='Operations', requirements='Degree\nFive years\nHSE training',
+                requirements_list=parse_requirements('Degree\nFive years\nHSE training'),
+            ),
+            title__startswith=prefix,
+        )
+        applications = top_up(
+            JobApplication, 300 * scale,
+            lambda i: JobApplication(
+                job_posting=jobs[i % len(jobs)], first_name='Applicant', last_name=str(i),
+                email=f'{prefix}-applicant-{i}@example.com', phone='0800000000',
+                resume='resumes/cv.pdf', cover_letter='Cover letter',
+            ),
+            email__startswith=prefix,
+        )
+        self.samples['application_id'] = applications[0].pk
+
+        interests = top_up(
+            SubscriptionCategory, 6 * scale,
+            lambda i: SubscriptionCategory(name=f'{prefix} interest {i}'),
+            name__startswith=prefix,
+        )
+        existing = set(Subscriber.objects.filter(email__startswith=prefix).values_list('pk', flat=True))
+        subscribers = top_up(
+            Subscriber, 2000 * scale,
+            lambda i: Subscriber(
+                email=f'{prefix}-subscriber-{i}@example.com', unsubscribe_token=f'{prefix}-{i}',
+                active_status=i % 10 != 0,
+            ),
+            email__startswith=prefix,
+        )
+        through = Subscriber.interests.through
+        through.objects.bulk_create([
+            through(subscriber_id=subscriber.pk, subscriptioncategory_id=interests[subscriber.pk % len(interests)].pk)
+            for subscriber in subscribers if subscriber.pk not in existing
+        ], batch_size=1000)
+
+        existing = set(Newsletter.objects.filter(title__startswith=prefix).values_list('pk', flat=True))
+        newsletters = top_up(
+            Newsletter, 30 * scale,
+            lambda i: Newsletter(title=f'{prefix} issue {i}', content='Newsletter body', sent=i % 2 == 0),
+            title__startswith=prefix,
+        )
+        self.samples['newsletter_id'] = newsletters[0].pk
+        through = Newsletter.categories.through
+        through.objects.bulk_create([
+            through(newsletter_id=newsletter.pk, subscriptioncategory_id=interests[newsletter.pk % len(interests)].pk)
+            for newsletter in newsletters if newsletter.pk not in existing
+        ])
+
+        achievement_categories = top_up(
+            AchievementCategory, 6 * scale,
+            lambda i: AchievementCategory(name=f'{prefix} award type {i}'),
+            name__startswith=prefix,
+        )
+        top_up(
+            Achievement, 100 * scale,
+            lambda i: Achievement(
+                title=f'{prefix} achievement {i}', description='Achievement description',
+                category=achievement_categories[i % len(achievement_categories)],
+                achievement_date=today - timedelta(days=i), featured=i % 10 == 0,
+                impact_metrics={'co2_reduced': 100}, co2_reduced=100,
+            ),
+            title__startswith=prefix,
+        )
+        top_up(
+            ProjectPortfolio, 30 * scale,
+            lambda i: ProjectPortfolio(
+                title=f'{prefix} project {i}', slug=f'{prefix}-project-{i}', client='Client', location='Bonny',
+                project_type='OIL_SPILL', brief_description='Brief', detailed_description='Details',
+                start_date=today - timedelta(days=30 * i),
+            ),
+            slug__startswith=prefix,
+        )
+        top_up(
+            CompanyMilestone, 15 * scale,
+            lambda i: CompanyMilestone(
+                title=f'{prefix} milestone {i}', description='Milestone',
+                milestone_date=today - timedelta(days=365 * i), milestone_year=today.year - i,
+            ),
+            title__startswith=prefix,
+        )
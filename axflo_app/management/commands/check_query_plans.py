@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from axflo_app.models import (
+    NewsArticle, JobPosting, ContactSubmission, Subscriber, JobApplication,
+    Achievement, ProjectPortfolio
+)
+
+
+def get_hot_queries():
+    """The main list queries of the site, with the index each should use"""
+    return [
+        ('Published articles (media, index)', 'newsarticle_status_pub_idx',
+         NewsArticle.objects.filter(status='PUBLISHED').order_by('-published_at')),
+        ('Featured articles (index, sidebar)', 'newsarticle_featured_pub_idx',
+         NewsArticle.objects.filter(status='PUBLISHED', featured=True).order_by('-published_at')[:3]),
+        ('Related articles (blog detail)', 'newsarticle_cat_status_idx',
+         NewsArticle.objects.filter(category_id=1, status='PUBLISHED').order_by('-published_at')[:3]),
+        ('Active jobs (careers)', 'jobposting_status_posted_idx',
+         JobPosting.objects.filter(status='ACTIVE').order_by('-posted_date')),
+        ('All contacts (admin, dashboard)', 'contact_date_idx',
+         ContactSubmission.objects.order_by('-date')[:5]),
+        ('Unread contacts (admin)', 'contact_unread_date_idx',
+         ContactSubmission.objects.filter(read=False).order_by('-date')),
+        ('All subscribers (admin, dashboard)', 'subscriber_date_idx',
+         Subscriber.objects.order_by('-subscription_date')[:5]),
+        ('Active subscribers (admin)', 'subscriber_active_date_idx',
+         Subscriber.objects.filter(active_status=True).order_by('-subscription_date')),
+        ('New applications (admin)', 'jobapp_status_date_idx',
+         JobApplication.objects.filter(status='SUBMITTED').order_by('-application_date')),
+        ('Active achievements (achievements)', 'achievement_status_date_idx',
+         Achievement.objects.filter(status='ACTIVE').order_by('-achievement_date', 'display_order')),
+        ('Featured achievements (achievements)', 'achievement_featured_idx',
+         Achievement.objects.filter(status='ACTIVE', featured=True).order_by('display_order', '-achievement_date')[:3]),
+        ('Completed projects (achievements)', 'portfolio_status_date_idx',
+         ProjectPortfolio.objects.filter(status='FEATURED').order_by('-completion_date', 'display_order')),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Check with EXPLAIN that the main list queries use their indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the full query plan for every query'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'>> Checking query plans on {connection.vendor}...')
+        failures = []
+
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Small tables are cheaper to scan, so the planner would
+                # ignore the indexes on a fresh database
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for label, index_name, queryset in get_hot_queries():
+                plan = queryset.explain()
+                if index_name in plan:
+                    self.stdout.write(self.style.SUCCESS(f'   OK    {label}: {index_name}'))
+                else:
+                    failures.append(label)
+                    self.stdout.write(self.style.ERROR(f'   FAIL  {label}: expected {index_name}'))
+                if options['verbose_plans'] or index_name not in plan:
+                    for line in plan.splitlines():
+                        self.stdout.write(f'         {line}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} queries do not use their index: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('\nAll hot queries use their indexes'))
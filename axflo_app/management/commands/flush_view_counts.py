@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from axflo_app.view_counts import flush_all_pending_views
+
+
+class Command(BaseCommand):
+    help = 'Write buffered article, achievement and portfolio views to the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and flush every N seconds (0 flushes once and exits)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows folded into each UPDATE statement'
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        batch_size = options['batch_size']
+
+        while True:
+            flushed = flush_all_pending_views(batch_size=batch_size)
+            for label, count in flushed.items():
+                if count:
+                    self.stdout.write(self.style.SUCCESS(f'Flushed {count} views for {label}'))
+
+            if not interval:
+                break
+            time.sleep(interval)
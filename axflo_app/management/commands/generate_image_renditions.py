@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from axflo_app import tasks
+from axflo_app.images import IMAGE_FIELDS, generate_renditions
+from axflo_app.page_cache import invalidate_pages_for_model
+from axflo_app.task_queue import enqueue
+
+
+class Command(BaseCommand):
+    help = 'Create missing WebP/JPEG renditions for every uploaded image (safe to re-run)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queue',
+            action='store_true',
+            help='Queue the work for run_worker instead of doing it here'
+        )
+
+    def handle(self, *args, **options):
+        total_images = total_written = 0
+
+        for model, field_names in IMAGE_FIELDS.items():
+            names = set()
+            for row in model.objects.values_list(*field_names).iterator(chunk_size=500):
+                names.update(name for name in row if name)
+            if not names:
+                continue
+
+            label = model._meta.label
+            total_images += len(names)
+            if options['queue']:
+                enqueue(tasks.generate_image_renditions, model_label=label, source_names=sorted(names))
+                self.stdout.write(f'>> Queued {len(names)} images from {label}')
+                continue
+
+            written = sum(generate_renditions(name) for name in sorted(names))
+            total_written += written
+            if written:
+                invalidate_pages_for_model(model)
+            self.stdout.write(f'>> {label}: {len(names)} images, {written} renditions written')
+
+        if options['queue']:
+            self.stdout.write(self.style.SUCCESS(f'\nQueued {total_images} images'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'\nChecked {total_images} images, wrote {total_written} renditions'
+            ))
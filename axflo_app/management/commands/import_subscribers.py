@@ -0,0 +1,42 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from axflo_app.subscriber_import import IMPORT_BATCH_SIZE, SubscriberImportError, import_subscribers
+
+
+class Command(BaseCommand):
+    help = (
+        'Import newsletter subscribers from a CSV file with an email column and optional '
+        'first_name, last_name and interests (category names separated by ; or |)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to import, or - for standard input')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Rows per insert batch')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            if options['path'] == '-':
+                sys.stdin.reconfigure(encoding='utf-8-sig')
+                result = import_subscribers(sys.stdin, batch_size=options['batch_size'])
+            else:
+                with open(options['path'], encoding='utf-8-sig', newline='') as f:
+                    result = import_subscribers(f, batch_size=options['batch_size'])
+        except (OSError, SubscriberImportError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f'>> {result["rows"]} rows read in {time.perf_counter() - started:.1f} s: '
+            f'{result["existing"]} already subscribed, {result["duplicates"]} repeated in the file, '
+            f'{result["invalid"]} invalid'
+        )
+        for error in result['errors']:
+            self.stdout.write(self.style.WARNING(f'   {error}'))
+        if result['unknown_interests']:
+            self.stdout.write(self.style.WARNING(
+                f'>> Unknown interests skipped: {", ".join(result["unknown_interests"])}'
+            ))
+        self.stdout.write(self.style.SUCCESS(f'Imported {result["created"]} subscribers'))
@@ -0,0 +1,184 @@
+import http.client
+import itertools
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.template.defaultfilters import filesizeformat
+from django.test.utils import override_settings
+
+# Connections a browser opens per host over HTTP/1.1
+PARALLEL_CONNECTIONS = 6
+
+
+class ThrottledLink:
+    """A network link with a fixed round-trip time and bandwidth shared by all connections"""
+
+    def __init__(self, rtt_ms, kbps):
+        self.rtt = rtt_ms / 1000
+        self.bytes_per_second = kbps * 1000 / 8
+        self.lock = threading.Lock()
+        self.free_at = 0
+
+    def transfer(self, size):
+        with self.lock:
+            start = max(time.perf_counter(), self.free_at)
+            self.free_at = done = start + size / self.bytes_per_second
+        time.sleep(max(0, done - time.perf_counter()))
+
+
+def throttle(app, link):
+    def throttled_app(environ, start_response):
+        # Request out and first byte back
+        time.sleep(link.rtt)
+        result = app(environ, start_response)
+        try:
+            for chunk in result:
+                link.transfer(len(chunk))
+                yield chunk
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+    return throttled_app
+
+
+class ThreadingServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class RenderBlockingParser(HTMLParser):
+    """Local stylesheets and synchronous scripts in <head>, which hold up the first render"""
+
+    def __init__(self):
+        super().__init__()
+        self.in_head = True
+        self.in_noscript = False
+        self.urls = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'body':
+            self.in_head = False
+        elif tag == 'noscript':
+            self.in_noscript = True
+        if not self.in_head or self.in_noscript:
+            return
+        url = None
+        if tag == 'link' and attrs.get('rel') == 'stylesheet':
+            url = attrs.get('href')
+        elif tag == 'script' and 'async' not in attrs and 'defer' not in attrs:
+            url = attrs.get('src')
+        # Third-party CDN files are the same before and after, so they are left out
+        if url and url.startswith(settings.STATIC_URL):
+            self.urls.append(url)
+
+    def handle_endtag(self, tag):
+        if tag == 'noscript':
+            self.in_noscript = False
+        elif tag == 'head':
+            self.in_head = False
+
+
+class Command(BaseCommand):
+    help = (
+        'Estimate the first render time of a page over a throttled connection, with '
+        'the individual CSS/JS files (before) and the bundles with critical CSS (after). '
+        'Counts the HTML and the render-blocking local files in <head>; run collectstatic first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', action='append', help='Page to measure (repeatable, default /)')
+        parser.add_argument('--rtt', type=int, default=150, help='Round-trip time in ms')
+        parser.add_argument('--kbps', type=int, default=1600, help='Download bandwidth in kbit/s')
+        parser.add_argument('--runs', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            raise CommandError('Run with DEBUG off, against collected static files')
+        self.link = ThrottledLink(options['rtt'], options['kbps'])
+        self.host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+
+        server = make_server(
+            '127.0.0.1', 0, throttle(get_wsgi_application(), self.link),
+            server_class=ThreadingServer, handler_class=QuietHandler
+        )
+        self.port = server.server_port
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.stdout.write(
+            f'>> {options["rtt"]} ms RTT, {options["kbps"]} kbit/s, '
+            f'{PARALLEL_CONNECTIONS} connections, median of {options["runs"]} runs'
+        )
+
+        try:
+            for path in options['path'] or ['/']:
+                results = {}
+                for label, enabled in (('before', False), ('after', True)):
+                    # Cached pages would keep whichever asset tags were rendered first
+                    with override_settings(ASSET_BUNDLES_ENABLED=enabled, PAGE_CACHE_ENABLED=False):
+                        self.load(path)  # warm up templates and caches
+                        runs = [self.load(path) for _ in range(options['runs'])]
+                    results[label] = min(runs, key=lambda run: abs(run[0] - statistics.median(r[0] for r in runs)))
+
+                for label, (elapsed, html_size, blocking, blocking_size) in results.items():
+                    self.stdout.write(
+                        f'>> {path} {label}: {elapsed * 1000:.0f} ms '
+                        f'(HTML {filesizeformat(html_size)}, {blocking} render-blocking files '
+                        f'{filesizeformat(blocking_size)})'
+                    )
+                before, after = results['before'][0], results['after'][0]
+                self.stdout.write(self.style.SUCCESS(
+                    f'{path}: first render {before * 1000:.0f} ms -> {after * 1000:.0f} ms '
+                    f'({(1 - after / before) * 100:.0f}% faster)'
+                ))
+        finally:
+            server.shutdown()
+
+    def fetch(self, url, new_connection):
+        if new_connection:
+            # TCP handshake
+            time.sleep(self.link.rtt)
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        try:
+            connection.request('GET', url, headers={
+                'Host': self.host,
+                'Accept-Encoding': 'gzip, deflate, br, zstd',
+            })
+            response = connection.getresponse()
+            body = response.read()
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise CommandError(f'{url} returned {response.status}')
+        return body
+
+    def load(self, path):
+        """Time until the HTML and every render-blocking file in its <head> have arrived"""
+        started = time.perf_counter()
+        html = self.fetch(path, new_connection=True)
+        parser = RenderBlockingParser()
+        parser.feed(html.decode('utf-8'))
+
+        # The first worker reuses the connection the HTML came over
+        connections = itertools.count()
+        opened = threading.local()
+
+        def fetch_asset(url):
+            new_connection = not getattr(opened, 'value', False) and next(connections) > 0
+            opened.value = True
+            return len(self.fetch(url, new_connection))
+
+        with ThreadPoolExecutor(max_workers=PARALLEL_CONNECTIONS) as executor:
+            sizes = list(executor.map(fetch_asset, parser.urls))
+        return time.perf_counter() - started, len(html), len(sizes), sum(sizes)
@@ -0,0 +1,102 @@
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+from django.test import Client
+
+from axflo_app.middleware import PrecompressedStaticMiddleware
+
+ASSET_ATTR_RE = re.compile(r'(?:href|src|srcset)="([^"]+)"')
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the bytes transferred for the static assets of a page before '
+        '(source files, uncompressed) and after collectstatic optimisation and precompression'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/', help='Page whose assets are measured')
+        parser.add_argument(
+            '--accept-encoding',
+            default='gzip, deflate, br, zstd',
+            help='Accept-Encoding sent for the "after" requests'
+        )
+
+    def handle(self, *args, **options):
+        names = self.get_asset_names(options['path'])
+        if not names:
+            raise CommandError(f'No static assets found on {options["path"]}')
+
+        middleware = PrecompressedStaticMiddleware(get_response=lambda request: None)
+        gzip_only = {'HTTP_ACCEPT_ENCODING': 'gzip'}
+        best = {'HTTP_ACCEPT_ENCODING': options['accept_encoding']}
+
+        totals = {'before': 0, 'gzip': 0, 'after': 0}
+        measured = 0
+        for name in names:
+            source = finders.find(name)
+            if source is None:
+                self.stdout.write(self.style.WARNING(f'>> {name}: not found, skipped'))
+                continue
+            try:
+                url = settings.STATIC_URL + staticfiles_storage.stored_name(name)
+            except ValueError:
+                raise CommandError(f'{name} is missing from the manifest; run collectstatic first')
+            # Same lookup as PrecompressedStaticMiddleware.__call__
+            static_file = middleware.find_file(url) if middleware.autorefresh else middleware.files.get(url)
+            if static_file is None:
+                raise CommandError(f'{url} is not in STATIC_ROOT; run collectstatic first')
+
+            with open(source, 'rb') as f:
+                before = len(f.read())
+            gzip_size, _, _ = self.fetch(static_file, gzip_only)
+            after, encoding, cache_control = self.fetch(static_file, best)
+
+            measured += 1
+            totals['before'] += before
+            totals['gzip'] += gzip_size
+            totals['after'] += after
+            self.stdout.write(
+                f'>> {name}: {filesizeformat(before)} -> {filesizeformat(after)} '
+                f'({encoding or "identity"}; gzip {filesizeformat(gzip_size)}) [{cache_control}]'
+            )
+
+        saved = (1 - totals['after'] / totals['before']) * 100 if totals['before'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'\n{measured} assets on {options["path"]}: {filesizeformat(totals["before"])} before, '
+            f'{filesizeformat(totals["gzip"])} with gzip only, '
+            f'{filesizeformat(totals["after"])} after (-{saved:.0f}%)'
+        ))
+
+    def get_asset_names(self, path):
+        """Unhashed static names referenced by the page's href/src/srcset attributes"""
+        host = next((host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost')
+        response = Client().get(path, HTTP_HOST=host)
+        if response.status_code != 200:
+            raise CommandError(f'{path} returned {response.status_code}')
+
+        unhashed = {hashed: name for name, hashed in getattr(staticfiles_storage, 'hashed_files', {}).items()}
+        names = []
+        for value in ASSET_ATTR_RE.findall(response.content.decode('utf-8')):
+            for candidate in value.split(','):
+                url = candidate.strip().split(' ')[0].split('?')[0].split('#')[0]
+                if not url.startswith(settings.STATIC_URL):
+                    continue
+                name = url[len(settings.STATIC_URL):]
+                name = unhashed.get(name, name)
+                if name not in names:
+                    names.append(name)
+        return names
+
+    @staticmethod
+    def fetch(static_file, request_headers):
+        """(bytes sent, Content-Encoding, Cache-Control) for a GET of ``static_file``"""
+        response = static_file.get_response('GET', request_headers)
+        if response.file is not None:
+            response.file.close()
+        headers = dict(response.headers)
+        return int(headers['Content-Length']), headers.get('Content-Encoding'), headers.get('Cache-Control')
@@ -0,0 +1,63 @@
+import os
+import time
+
+from django.contrib.staticfiles.finders import get_finders
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from axflo_app.static_images import optimize_static_images, output_size
+
+
+class Command(BaseCommand):
+    help = (
+        'Optimise the static JPEG/PNG images and report the bytes saved per file. '
+        'collectstatic does the same through STORAGES["staticfiles"]; running this '
+        'first only warms the cache.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=None, help='Images encoded in parallel')
+
+    def handle(self, *args, **options):
+        # Same discovery rules as collectstatic: the first file found for a path wins
+        sources = {}
+        for finder in get_finders():
+            for path, storage in finder.list(['CVS', '.*', '*~']):
+                name = os.path.join(storage.prefix, path) if getattr(storage, 'prefix', None) else path
+                sources.setdefault(name, (name, storage, path))
+
+        started = time.perf_counter()
+        results = sorted(
+            optimize_static_images(sources.values(), jobs=options['jobs']),
+            key=lambda result: result['name']
+        )
+        elapsed = time.perf_counter() - started
+
+        original_total = optimized_total = 0
+        encoded = 0
+        for result in results:
+            name = result['name']
+            original = result['original_size']
+            optimized = output_size(result, name)
+            original_total += original
+            optimized_total += optimized
+            encoded += not result['cached']
+
+            stem = os.path.splitext(name)[0]
+            siblings = ', '.join(
+                f'{fmt} {filesizeformat(output_size(result, f"{stem}.{fmt}"))}'
+                for fmt in ('webp', 'avif') if f'{stem}.{fmt}' in result['files']
+            )
+            saved = (1 - optimized / original) * 100 if original else 0
+            self.stdout.write(
+                f'>> {name}: {filesizeformat(original)} -> {filesizeformat(optimized)} '
+                f'(-{saved:.0f}%){", " + siblings if siblings else ""}'
+                f'{" [cached]" if result["cached"] else ""}'
+            )
+
+        saved_total = original_total - optimized_total
+        self.stdout.write(self.style.SUCCESS(
+            f'\n{len(results)} images, {encoded} encoded in {elapsed:.1f}s: '
+            f'{filesizeformat(original_total)} -> {filesizeformat(optimized_total)} '
+            f'({filesizeformat(saved_total)} saved)'
+        ))
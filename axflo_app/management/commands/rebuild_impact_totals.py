@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from axflo_app.models import Achievement, ProjectPortfolio
+from axflo_app.page_cache import invalidate_pages_for_model
+from axflo_app.stats import get_environmental_impact, invalidate_environmental_impact, rebuild_impact_columns
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the co2 columns of achievements and portfolio projects from their JSON '
+        'metrics (needed after bulk updates that skip save()) and refresh the page total'
+    )
+
+    def handle(self, *args, **options):
+        for model in (Achievement, ProjectPortfolio):
+            fixed = rebuild_impact_columns(model)
+            self.stdout.write(f'>> {model._meta.verbose_name_plural}: {fixed} rows updated')
+            if fixed:
+                invalidate_pages_for_model(model)
+
+        invalidate_environmental_impact()
+        self.stdout.write(self.style.SUCCESS(
+            f'\nEnvironmental impact total: {get_environmental_impact():,}'
+        ))
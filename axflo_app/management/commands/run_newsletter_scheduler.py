@@ -0,0 +1,71 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from axflo_app.newsletter_delivery import (
+    ClaimLost, claim_due_newsletters, deliver_newsletter, get_delivery_latency, renew_claim
+)
+
+
+class Command(BaseCommand):
+    help = 'Send scheduled newsletters once their send date has passed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Send whatever is due and exit (for cron)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=30,
+            help='Seconds between checks when running continuously'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help='Newsletters claimed per check'
+        )
+
+    def handle(self, *args, **options):
+        latencies = []
+
+        while True:
+            newsletters = claim_due_newsletters(limit=options['limit'])
+            for newsletter in newsletters:
+                self.stdout.write(f'>> Sending scheduled newsletter "{newsletter.title}"...')
+                try:
+                    result = deliver_newsletter(newsletter, heartbeat=lambda: renew_claim(newsletter))
+                except ClaimLost as e:
+                    self.stdout.write(self.style.WARNING(f'   Stopped: {e}'))
+                    continue
+                except Exception as e:
+                    # The claim expires and another run retries it
+                    self.stdout.write(self.style.ERROR(f'   Delivery failed: {e}'))
+                    continue
+
+                latency = get_delivery_latency(newsletter)
+                if latency is not None:
+                    latencies.append(latency)
+                self.stdout.write(self.style.SUCCESS(
+                    f'   Sent {result["sent"]} messages ({result["failed"]} failed), '
+                    f'first delivery {self.format_latency(latency)} after the send date'
+                ))
+
+            if options['once']:
+                break
+            # Keep draining while there is a backlog
+            if len(newsletters) < options['limit']:
+                time.sleep(options['interval'])
+
+        if latencies:
+            self.stdout.write(self.style.SUCCESS(
+                f'\nSchedule latency over {len(latencies)} newsletters: '
+                f'median {statistics.median(latencies):.1f}s, max {max(latencies):.1f}s'
+            ))
+
+    def format_latency(self, latency):
+        return 'n/a' if latency is None else f'{latency:.1f}s'
@@ -0,0 +1,84 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+import axflo_app.tasks  # noqa: F401 - registers the task functions
+from axflo_app.task_queue import claim_tasks, requeue_dead_tasks, run_task
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks (emails, notifications, newsletter delivery)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2, help='Worker threads in this process')
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait when the queue is empty'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the queue is empty instead of waiting for more work'
+        )
+        parser.add_argument(
+            '--requeue-dead',
+            action='store_true',
+            help='Give every dead task a fresh set of attempts before starting'
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue_dead']:
+            count = requeue_dead_tasks()
+            self.stdout.write(f'>> Requeued {count} dead tasks')
+
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.processed = {'done': 0, 'failed': 0}
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *args: self.stopping.set())
+
+        self.stdout.write(f'>> Starting {options["threads"]} worker threads...')
+        workers = [
+            threading.Thread(target=self.work, args=(options,), name=f'task-worker-{i}')
+            for i in range(options['threads'])
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                while worker.is_alive():
+                    worker.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stopping.set()
+            for worker in workers:
+                worker.join()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Worker stopped: {self.processed["done"]} tasks done, {self.processed["failed"]} failed'
+        ))
+
+    def work(self, options):
+        try:
+            while not self.stopping.is_set():
+                claimed = claim_tasks(limit=1)
+                if not claimed:
+                    if options['once']:
+                        break
+                    self.stopping.wait(options['poll_interval'])
+                    continue
+
+                for task_obj in claimed:
+                    succeeded = run_task(task_obj)
+                    with self.lock:
+                        self.processed['done' if succeeded else 'failed'] += 1
+                    if not succeeded:
+                        self.stdout.write(self.style.ERROR(
+                            f'   {task_obj.name} failed (attempt {task_obj.attempts}/{task_obj.max_attempts})'
+                        ))
+        finally:
+            connection.close()
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from axflo_app.models import Newsletter
+from axflo_app.newsletter_delivery import deliver_newsletter
+
+
+class Command(BaseCommand):
+    help = 'Send a newsletter to every subscriber that has not received it yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('newsletter_id', type=int, help='ID of the newsletter to send')
+        parser.add_argument('--batch-size', type=int, default=None, help='Messages per SMTP batch')
+        parser.add_argument('--concurrency', type=int, default=None, help='Parallel SMTP connections')
+        parser.add_argument(
+            '--rate-limit',
+            type=float,
+            default=None,
+            help='Maximum messages per second across all connections (0 = unlimited)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            newsletter = Newsletter.objects.get(id=options['newsletter_id'])
+        except Newsletter.DoesNotExist:
+            raise CommandError(f'Newsletter {options["newsletter_id"]} does not exist')
+
+        self.stdout.write(f'>> Sending "{newsletter.title}"...')
+        result = deliver_newsletter(
+            newsletter,
+            batch_size=options['batch_size'],
+            concurrency=options['concurrency'],
+            rate_limit=options['rate_limit'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Sent {result["sent"]} messages'))
+        if result['failed']:
+            self.stdout.write(self.style.ERROR(
+                f'{result["failed"]} messages failed; run the command again to retry them'
+            ))
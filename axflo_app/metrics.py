@@ -0,0 +1,343 @@
+"""
+Aggregated request metrics in the Prometheus text format.
+
+RequestTimingMiddleware calls record() for every request it serves with
+the request_metrics.py counters. Each process sums them by URL name
+(``axflo_app:achievements``; ``<unmatched>`` for 404s) into:
+
+- a latency histogram and a query-count histogram;
+- response counts by status code;
+- database seconds and cache hits/misses.
+
+Processes share their numbers through files. Each one writes its totals
+to ``worker-<pid>-<start time>.json`` in METRICS_DIR, replacing the file
+atomically and at most every METRICS_FLUSH_INTERVAL seconds (and on exit).
+The start time keeps a process that reuses a PID from overwriting an exited
+worker's file. render() merges every file in the directory, so the
+staff-only endpoint reports all gunicorn/daphne workers on the machine.
+At most every ARCHIVE_INTERVAL seconds, the files of exited workers are
+folded into ``archive.json`` and deleted. Their counts are kept, so the
+counters never go backwards, and a scrape reads one file per live worker
+plus the archive.
+"""
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: exited workers' files are not archived
+    fcntl = None
+
+from django.conf import settings
+from django.urls import URLPattern, URLResolver, get_resolver
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+UNMATCHED_ROUTE = '<unmatched>'
+ARCHIVE_INTERVAL = 5 * 60
+ARCHIVE_FILE = 'archive.json'
+WORKER_FILE_RE = re.compile(r'^worker-(\d+)(?:-(\d+))?\.json$')
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_totals = None
+_totals_pid = None
+_totals_file = None
+_last_flush = 0.0
+_last_archive = 0.0
+
+
+def _new_route():
+    return {
+        'count': 0,
+        'latency_buckets': [0] * len(LATENCY_BUCKETS),
+        'latency_sum': 0.0,
+        'query_buckets': [0] * len(QUERY_BUCKETS),
+        'query_sum': 0,
+        'db_seconds': 0.0,
+        'cache_hits': 0,
+        'cache_misses': 0,
+        'statuses': {},
+    }
+
+
+def _start_time(pid):
+    """When a process started, in clock ticks since boot; None without /proc"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # Field 22; the command name before it may contain spaces
+    return stat.rsplit(')', 1)[1].split()[19]
+
+
+def _process_totals():
+    # gunicorn forks its workers after the app is loaded, so totals
+    # inherited from the parent are dropped
+    global _totals, _totals_pid, _totals_file
+    if _totals_pid != os.getpid():
+        pid = os.getpid()
+        _totals, _totals_pid = {}, pid
+        _totals_file = f'worker-{pid}-{_start_time(pid) or time.time_ns()}.json'
+    return _totals
+
+
+def _observe(buckets, bounds, value):
+    # Non-cumulative here; render() adds them up
+    for i, bound in enumerate(bounds):
+        if value <= bound:
+            buckets[i] += 1
+            return
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else UNMATCHED_ROUTE
+
+
+def record(request, response, request_metrics, seconds):
+    """Add one served request to this process's totals"""
+    with _lock:
+        route = _process_totals().setdefault(route_name(request), _new_route())
+        route['count'] += 1
+        _observe(route['latency_buckets'], LATENCY_BUCKETS, seconds)
+        route['latency_sum'] += seconds
+        _observe(route['query_buckets'], QUERY_BUCKETS, request_metrics.queries)
+        route['query_sum'] += request_metrics.queries
+        route['db_seconds'] += request_metrics.db_time
+        route['cache_hits'] += request_metrics.cache_hits
+        route['cache_misses'] += request_metrics.cache_misses
+        status = str(response.status_code)
+        route['statuses'][status] = route['statuses'].get(status, 0) + 1
+        due = time.monotonic() - _last_flush >= settings.METRICS_FLUSH_INTERVAL
+    if due:
+        flush()
+
+
+# ================================
+# SHARING BETWEEN PROCESSES
+# ================================
+
+def _metrics_dir():
+    return Path(settings.METRICS_DIR)
+
+
+def flush():
+    """Write this process's totals to its file in METRICS_DIR"""
+    global _last_flush
+    with _flush_lock:
+        with _lock:
+            _last_flush = time.monotonic()
+            totals = _process_totals()
+            if not totals:
+                return
+            data = json.dumps(totals)
+        directory = _metrics_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / _totals_file
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(data)
+        os.replace(temporary, path)
+
+
+atexit.register(flush)
+
+
+def _merge(into, routes):
+    for name, route in routes.items():
+        merged = into.setdefault(name, _new_route())
+        for key in ('count', 'latency_sum', 'query_sum', 'db_seconds', 'cache_hits', 'cache_misses'):
+            merged[key] += route[key]
+        for key in ('latency_buckets', 'query_buckets'):
+            merged[key] = [a + b for a, b in zip(merged[key], route[key])]
+        for status, count in route['statuses'].items():
+            merged['statuses'][status] = merged['statuses'].get(status, 0) + count
+
+
+def _read_json(path, default):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return default
+
+
+def _read_archive(directory):
+    """{'routes': merged totals of exited workers, 'merged': their file names}"""
+    return _read_json(directory / ARCHIVE_FILE, {'routes': {}, 'merged': []})
+
+
+def _has_exited(name):
+    match = WORKER_FILE_RE.match(name)
+    if match is None:
+        return False
+    pid, start = int(match.group(1)), match.group(2)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass  # alive, but owned by another user
+    # Alive; a different start time means the PID now belongs to another process
+    current = _start_time(pid)
+    return start is not None and current is not None and current != start
+
+
+def archive_exited_workers():
+    """
+    Fold the files of exited workers into the archive and delete them.
+    Returns the number of files archived, or None if another process is
+    archiving.
+    """
+    directory = _metrics_dir()
+    if fcntl is None or not directory.is_dir():
+        return 0
+    with open(directory / 'archive.lock', 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return None
+        archive = _read_archive(directory)
+        merged = set(archive['merged'])
+        exited = [
+            path for path in sorted(directory.glob('worker-*.json'))
+            if path.name not in merged and _has_exited(path.name)
+        ]
+        for path in exited:
+            _merge(archive['routes'], _read_json(path, {}))
+        # The archive names the files it holds, so neither a file left behind
+        # by a crash before the deletes nor a concurrent collect_all() counts
+        # one twice
+        names = merged | {path.name for path in exited}
+        archive['merged'] = sorted(name for name in names if (directory / name).exists())
+        temporary = directory / f'{ARCHIVE_FILE}.tmp'
+        temporary.write_text(json.dumps(archive))
+        os.replace(temporary, directory / ARCHIVE_FILE)
+        for name in names:
+            (directory / name).unlink(missing_ok=True)
+    return len(exited)
+
+
+def collect_all():
+    """The totals of every process that has written to METRICS_DIR, merged by route"""
+    global _last_archive
+    flush()
+    if time.monotonic() - _last_archive >= ARCHIVE_INTERVAL:
+        _last_archive = time.monotonic()
+        archive_exited_workers()
+
+    # Workers first, then the archive: a file archived in between is then
+    # either in the archive or was read before it was deleted
+    directory = _metrics_dir()
+    workers = {path.name: _read_json(path, {}) for path in sorted(directory.glob('worker-*.json'))}
+    archive = _read_archive(directory)
+    merged = {}
+    _merge(merged, archive['routes'])
+    archived = set(archive['merged'])
+    for name, routes in workers.items():
+        if name not in archived:
+            _merge(merged, routes)
+    return merged
+
+
+# ================================
+# PROMETHEUS TEXT FORMAT
+# ================================
+
+def _route_names(resolver=None, namespace=''):
+    """Every named URL pattern, as view names like axflo_app:achievements"""
+    for pattern in (resolver or get_resolver()).url_patterns:
+        if isinstance(pattern, URLResolver):
+            inner = f'{namespace}{pattern.namespace}:' if pattern.namespace else namespace
+            yield from _route_names(pattern, inner)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f'{namespace}{pattern.name}'
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _histogram(lines, name, route, buckets, bounds, total, count):
+    cumulative = 0
+    for bound, observed in zip(bounds, buckets):
+        cumulative += observed
+        lines.append(f'{name}_bucket{{route="{route}",le="{_number(bound)}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{route="{route}",le="+Inf"}} {count}')
+    lines.append(f'{name}_sum{{route="{route}"}} {_number(total)}')
+    lines.append(f'{name}_count{{route="{route}"}} {count}')
+
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    routes = collect_all()
+    # The site's routes are reported at zero until first requested, so
+    # every page has series (Django admin routes appear once used)
+    for name in _route_names():
+        if name.startswith(f'{__package__}:'):
+            routes.setdefault(name, _new_route())
+    names = sorted(routes)
+
+    lines = [
+        '# HELP axflo_http_request_duration_seconds Time to serve a request, by URL name.',
+        '# TYPE axflo_http_request_duration_seconds histogram',
+    ]
+    for name in names:
+        route = routes[name]
+        _histogram(
+            lines, 'axflo_http_request_duration_seconds', _label(name),
+            route['latency_buckets'], LATENCY_BUCKETS, route['latency_sum'], route['count'],
+        )
+
+    lines += [
+        '# HELP axflo_http_request_queries Database queries per request, by URL name.',
+        '# TYPE axflo_http_request_queries histogram',
+    ]
+    for name in names:
+        route = routes[name]
+        _histogram(
+            lines, 'axflo_http_request_queries', _label(name),
+            route['query_buckets'], QUERY_BUCKETS, route['query_sum'], route['count'],
+        )
+
+    lines += [
+        '# HELP axflo_http_responses_total Responses sent, by URL name and status code.',
+        '# TYPE axflo_http_responses_total counter',
+    ]
+    for name in names:
+        for status, count in sorted(routes[name]['statuses'].items()):
+            lines.append(f'axflo_http_responses_total{{route="{_label(name)}",status="{status}"}} {count}')
+
+    lines += [
+        '# HELP axflo_db_seconds_total Time spent in database queries, by URL name.',
+        '# TYPE axflo_db_seconds_total counter',
+    ]
+    for name in names:
+        lines.append(f'axflo_db_seconds_total{{route="{_label(name)}"}} {_number(routes[name]["db_seconds"])}')
+
+    lines += [
+        '# HELP axflo_cache_lookups_total Cache lookups, by URL name and result.',
+        '# TYPE axflo_cache_lookups_total counter',
+    ]
+    for name in names:
+        route = routes[name]
+        lines.append(f'axflo_cache_lookups_total{{route="{_label(name)}",result="hit"}} {route["cache_hits"]}')
+        lines.append(f'axflo_cache_lookups_total{{route="{_label(name)}",result="miss"}} {route["cache_misses"]}')
+
+    hits = sum(route['cache_hits'] for route in routes.values())
+    lookups = hits + sum(route['cache_misses'] for route in routes.values())
+    lines += [
+        '# HELP axflo_cache_hit_ratio Share of cache lookups that hit, over all requests.',
+        '# TYPE axflo_cache_hit_ratio gauge',
+        f'axflo_cache_hit_ratio {_number(hits / lookups if lookups else 0.0)}',
+    ]
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,156 @@
+"""
+Project middleware.
+"""
+import logging
+import os
+from wsgiref.headers import Headers
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.responders import MissingFileError, StaticFile
+
+from . import metrics as metrics_store
+from . import request_metrics
+from .storage import ENCODING_SUFFIXES
+
+performance_logger = logging.getLogger('axflo_app.performance')
+
+
+class PrecompressedStaticMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that also knows the .zst variants written by
+    PrecompressedManifestStaticFilesStorage. Each request gets the smallest
+    of the identity/gzip/br/zstd files the client accepts, and hashed names
+    are sent with ``Cache-Control: max-age=315360000, public, immutable``.
+
+    Unlike WhiteNoise 6's own middleware it is async-capable, so under ASGI
+    the middleware chain and the async views run without a sync hop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            # Looks files up on disk (development only)
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+    @staticmethod
+    def is_compressed_variant(path, stat_cache=None):
+        for suffix in ENCODING_SUFFIXES.values():
+            if path.endswith(suffix):
+                uncompressed_path = path[:-len(suffix)]
+                if stat_cache is None:
+                    return os.path.isfile(uncompressed_path)
+                return uncompressed_path in stat_cache
+        return False
+
+    def get_static_file(self, path, url, stat_cache=None):
+        # As WhiteNoise's own, which only looks for .gz and .br
+        if stat_cache is None and not os.path.exists(path):
+            raise MissingFileError(path)
+        headers = Headers([])
+        self.add_mime_headers(headers, path, url)
+        self.add_cache_headers(headers, path, url)
+        if self.allow_all_origins:
+            headers['Access-Control-Allow-Origin'] = '*'
+        if self.add_headers_function is not None:
+            self.add_headers_function(headers, path, url)
+        return StaticFile(
+            path,
+            headers.items(),
+            stat_cache=stat_cache,
+            encodings={encoding: path + suffix for encoding, suffix in ENCODING_SUFFIXES.items()},
+        )
+
+
+def view_name(request):
+    """Dotted name of the view that served ``request``, e.g. views.achievements"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '-'
+    return match._func_path.removeprefix(f'{__package__}.')
+
+
+class RequestTimingMiddleware:
+    """
+    Times each request (wall clock, database, templates and cache lookups;
+    see request_metrics.py).
+
+    With REQUEST_TIMING_ENABLED it sends the numbers to staff as a
+    Server-Timing header and logs requests over SLOW_REQUEST_MS or
+    SLOW_REQUEST_QUERIES to the axflo_app.performance logger with the view
+    name. With METRICS_ENABLED it adds them to the per-route totals in
+    metrics.py. With N_PLUS_ONE_DETECTION it logs every SQL shape run
+    N_PLUS_ONE_THRESHOLD or more times in one request, with its call site.
+    With all three off it drops out of the middleware chain and no hooks
+    are installed.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.timing = settings.REQUEST_TIMING_ENABLED
+        self.metrics = settings.METRICS_ENABLED
+        self.repeat_threshold = settings.N_PLUS_ONE_THRESHOLD if settings.N_PLUS_ONE_DETECTION else 0
+        if not (self.timing or self.metrics or self.repeat_threshold):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_seconds = settings.SLOW_REQUEST_MS / 1000
+        self.slow_queries = settings.SLOW_REQUEST_QUERIES
+        request_metrics.install_hooks()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with request_metrics.collect(self.repeat_threshold) as metrics:
+            response = self.get_response(request)
+        total = metrics.elapsed
+        user = getattr(request, 'user', None) if self.timing else None
+        self.report(request, response, metrics, total, user)
+        return response
+
+    async def __acall__(self, request):
+        with request_metrics.collect(self.repeat_threshold) as metrics:
+            response = await self.get_response(request)
+        total = metrics.elapsed
+        user = await request.auser() if self.timing and hasattr(request, 'auser') else None
+        self.report(request, response, metrics, total, user)
+        return response
+
+    def report(self, request, response, metrics, total, user):
+        if self.metrics:
+            metrics_store.record(request, response, metrics, total)
+        for count, shape, site in metrics.repeated_queries():
+            performance_logger.warning(
+                'Repeated query in %s %s (%s): %s runs from %s: %s',
+                request.method, request.path, view_name(request), count, site, shape[:500],
+            )
+        if not self.timing:
+            return
+        if user is not None and (user.is_staff or user.is_superuser):
+            response['Server-Timing'] = metrics.server_timing(total)
+        if total >= self.slow_seconds or metrics.queries >= self.slow_queries:
+            performance_logger.warning(
+                'Slow request %s %s (%s, status %s): %s',
+                request.method, request.path, view_name(request), response.status_code,
+                metrics.summary(total),
+            )
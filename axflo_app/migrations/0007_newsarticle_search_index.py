@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# Inlined rather than imported from axflo_app.search, so later changes to
+# the search module cannot change what this migration did
+
+ARTICLE_TABLE = 'axflo_app_newsarticle'
+FTS_TABLE = 'axflo_app_newsarticle_fts'
+
+POSTGRES_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(excerpt, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(tags, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'C')"
+)
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'ALTER TABLE {ARTICLE_TABLE} ADD COLUMN search_vector tsvector')
+        schema_editor.execute(f'UPDATE {ARTICLE_TABLE} SET search_vector = {POSTGRES_VECTOR_SQL}')
+        schema_editor.execute(
+            f'CREATE INDEX newsarticle_search_vector_gin ON {ARTICLE_TABLE} USING GIN (search_vector)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"title, excerpt, tags, content, tokenize='porter unicode61')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, excerpt, tags, content) "
+            f"SELECT id, title, coalesce(excerpt, ''), tags, content FROM {ARTICLE_TABLE}"
+        )
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS newsarticle_search_vector_gin')
+        schema_editor.execute(f'ALTER TABLE {ARTICLE_TABLE} DROP COLUMN IF EXISTS search_vector')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('axflo_app', '0006_achievementcategory_companymilestone_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
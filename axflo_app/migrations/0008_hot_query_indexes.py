@@ -0,0 +1,61 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('axflo_app', '0007_newsarticle_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='achievement',
+            index=models.Index(fields=['status', '-achievement_date', 'display_order'], name='achievement_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='achievement',
+            index=models.Index(condition=models.Q(('featured', True)), fields=['status', 'display_order', '-achievement_date'], name='achievement_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactsubmission',
+            index=models.Index(fields=['-date'], name='contact_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactsubmission',
+            index=models.Index(condition=models.Q(('read', False)), fields=['-date'], name='contact_unread_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['status', '-application_date'], name='jobapp_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['status', '-posted_date'], name='jobposting_status_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['status', '-published_at'], name='newsarticle_status_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(condition=models.Q(('featured', True)), fields=['status', '-published_at'], name='newsarticle_featured_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['category', 'status', '-published_at'], name='newsarticle_cat_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectportfolio',
+            index=models.Index(fields=['status', '-completion_date', 'display_order'], name='portfolio_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(fields=['-subscription_date'], name='subscriber_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(condition=models.Q(('active_status', True)), fields=['-subscription_date'], name='subscriber_active_date_idx'),
+        ),
+    ]
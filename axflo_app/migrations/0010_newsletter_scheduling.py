@@ -0,0 +1,22 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('axflo_app', '0009_newsletterdelivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsletter',
+            name='delivery_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(condition=models.Q(('sent', False)), fields=['send_date'], name='newsletter_due_idx'),
+        ),
+    ]
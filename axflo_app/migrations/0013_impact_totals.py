@@ -0,0 +1,57 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:15
+
+from django.db import migrations, models
+
+# Inlined rather than imported from axflo_app, so later changes to the app
+# cannot change what this migration did
+
+# Model -> (JSON field, metric key, new column)
+IMPACT_COLUMNS = {
+    'Achievement': ('impact_metrics', 'co2_reduced', 'co2_reduced'),
+    'ProjectPortfolio': ('environmental_impact', 'co2_prevented', 'co2_prevented'),
+}
+
+
+def metric_total(metrics, key):
+    if not metrics or key not in metrics:
+        return 0
+    try:
+        return int(metrics[key])
+    except (ValueError, TypeError):
+        return 0
+
+
+def backfill_impact_columns(apps, schema_editor, batch_size=500):
+    for model_name, (source, metric, column) in IMPACT_COLUMNS.items():
+        model = apps.get_model('axflo_app', model_name)
+        changed = []
+        for pk, metrics in model.objects.values_list('pk', source).iterator(chunk_size=batch_size):
+            value = metric_total(metrics, metric)
+            if value:
+                changed.append(model(pk=pk, **{column: value}))
+            if len(changed) >= batch_size:
+                model.objects.bulk_update(changed, [column])
+                changed = []
+        if changed:
+            model.objects.bulk_update(changed, [column])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('axflo_app', '0012_imagerendition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='achievement',
+            name='co2_reduced',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='projectportfolio',
+            name='co2_prevented',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_impact_columns, migrations.RunPython.noop),
+    ]
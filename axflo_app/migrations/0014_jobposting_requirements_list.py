@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:17
+
+import re
+
+from django.db import migrations, models
+
+# Inlined rather than imported from axflo_app.models, so later changes to
+# the app cannot change what this migration did
+
+
+def parse_requirements(text):
+    if not text:
+        return []
+    parts = re.split(r'[\n,;]', text)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def backfill_requirements_list(apps, schema_editor):
+    JobPosting = apps.get_model('axflo_app', 'JobPosting')
+    jobs = list(JobPosting.objects.only('pk', 'requirements'))
+    for job in jobs:
+        job.requirements_list = parse_requirements(job.requirements)
+    JobPosting.objects.bulk_update(jobs, ['requirements_list'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('axflo_app', '0013_impact_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobposting',
+            name='requirements_list',
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.RunPython(backfill_requirements_list, migrations.RunPython.noop),
+    ]
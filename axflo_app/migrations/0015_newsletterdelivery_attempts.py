@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('axflo_app', '0014_jobposting_requirements_list'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsletterdelivery',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -1,9 +1,36 @@
+import re
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 
 # Create your models here.
 
+
+def metric_total(metrics, key):
+    """Integer value of ``metrics[key]`` from a JSON metrics blob, 0 when absent or not a number"""
+    if not metrics or key not in metrics:
+        return 0
+    try:
+        return int(metrics[key])
+    except (ValueError, TypeError):
+        return 0
+
+
+def parse_requirements(text):
+    """Split a free-text requirements field on newlines, commas and semicolons"""
+    if not text:
+        return []
+    parts = re.split(r'[\n,;]', text)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _with_update_field(update_fields, source, target):
+    """Extend save()'s update_fields so a denormalised column follows its source field"""
+    if update_fields is not None and source in update_fields and target not in update_fields:
+        return [*update_fields, target]
+    return update_fields
+
 # ================================
 # EXISTING MODELS (PRESERVED)
 # ================================
@@ -59,6 +86,15 @@ class NewsArticle(models.Model):
         ordering = ['-created_at']
         verbose_name = "News Article"
         verbose_name_plural = "News Articles"
+        indexes = [
+            models.Index(fields=['status', '-published_at'], name='newsarticle_status_pub_idx'),
+            models.Index(
+                fields=['status', '-published_at'],
+                condition=models.Q(featured=True),
+                name='newsarticle_featured_pub_idx',
+            ),
+            models.Index(fields=['category', 'status', '-published_at'], name='newsarticle_cat_status_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -74,6 +110,12 @@ class NewsArticle(models.Model):
             self.published_at = timezone.now()
         
         super().save(*args, **kwargs)
+        
+        # Keep the full-text search index in step with the article
+        update_fields = kwargs.get('update_fields')
+        if not update_fields or set(update_fields) & {'title', 'excerpt', 'tags', 'content'}:
+            from .search import index_article
+            index_article(self)
     
     def get_image_url(self):
         """Return image URL, prioritizing uploaded image over URL"""
@@ -137,6 +179,10 @@ class ContactSubmission(models.Model):
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['-date'], name='contact_date_idx'),
+            models.Index(fields=['-date'], condition=models.Q(read=False), name='contact_unread_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.inquiry_type.name}"
@@ -192,12 +238,22 @@ class JobPosting(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ACTIVE')
     posted_date = models.DateTimeField(auto_now_add=True)
     closing_date = models.DateField(blank=True, null=True)
+    # parse_requirements(requirements), kept in step by save()
+    requirements_list = models.JSONField(default=list, editable=False)
     
     class Meta:
         ordering = ['-posted_date']
+        indexes = [
+            models.Index(fields=['status', '-posted_date'], name='jobposting_status_posted_idx'),
+        ]
     
     def __str__(self):
         return self.title
+    
+    def save(self, *args, **kwargs):
+        self.requirements_list = parse_requirements(self.requirements)
+        kwargs['update_fields'] = _with_update_field(kwargs.get('update_fields'), 'requirements', 'requirements_list')
+        super().save(*args, **kwargs)
 
 class JobApplication(models.Model):
     APPLICATION_STATUS_CHOICES = [
@@ -241,6 +297,9 @@ class JobApplication(models.Model):
     
     class Meta:
         ordering = ['-application_date']
+        indexes = [
+            models.Index(fields=['status', '-application_date'], name='jobapp_status_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.job_posting.title}"
@@ -271,6 +330,14 @@ class Subscriber(models.Model):
     
     class Meta:
         ordering = ['-subscription_date']
+        indexes = [
+            models.Index(fields=['-subscription_date'], name='subscriber_date_idx'),
+            models.Index(
+                fields=['-subscription_date'],
+                condition=models.Q(active_status=True),
+                name='subscriber_active_date_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.email
@@ -284,13 +351,43 @@ class Newsletter(models.Model):
     categories = models.ManyToManyField(SubscriptionCategory, blank=True)
     created_date = models.DateTimeField(auto_now_add=True)
     sent = models.BooleanField(default=False)
+    # Set when a scheduler claims the newsletter for delivery
+    delivery_started_at = models.DateTimeField(blank=True, null=True)
     
     class Meta:
         ordering = ['-created_date']
+        indexes = [
+            models.Index(fields=['send_date'], condition=models.Q(sent=False), name='newsletter_due_idx'),
+        ]
     
     def __str__(self):
         return self.title
 
+class NewsletterDelivery(models.Model):
+    """Delivery state of one newsletter for one subscriber"""
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+    
+    newsletter = models.ForeignKey(Newsletter, on_delete=models.CASCADE, related_name='deliveries')
+    subscriber = models.ForeignKey(Subscriber, on_delete=models.CASCADE, related_name='deliveries')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    # Send attempts so far; failures are retried up to NEWSLETTER_MAX_ATTEMPTS
+    attempts = models.PositiveSmallIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['newsletter', 'subscriber']
+        indexes = [
+            models.Index(fields=['newsletter', 'status'], name='delivery_newsletter_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.newsletter.title} -> {self.subscriber.email} ({self.status})"
+
 
 # ================================
 # D. CONTENT MODELS
@@ -458,6 +555,8 @@ class Achievement(models.Model):
     
     # Metadata
     impact_metrics = models.JSONField(default=dict, blank=True, help_text="Key metrics (e.g., {'saved_cost': 500000, 'co2_reduced': 1000})")
+    # impact_metrics['co2_reduced'], kept in step by save() for the page totals
+    co2_reduced = models.BigIntegerField(default=0, editable=False)
     external_link = models.URLField(blank=True, help_text="Link to news article or external recognition")
     
     # Ordering and tracking
@@ -468,9 +567,25 @@ class Achievement(models.Model):
     
     class Meta:
         ordering = ['-achievement_date', 'display_order']
+        indexes = [
+            models.Index(
+                fields=['status', '-achievement_date', 'display_order'],
+                name='achievement_status_date_idx',
+            ),
+            models.Index(
+                fields=['status', 'display_order', '-achievement_date'],
+                condition=models.Q(featured=True),
+                name='achievement_featured_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.title
+    
+    def save(self, *args, **kwargs):
+        self.co2_reduced = metric_total(self.impact_metrics, 'co2_reduced')
+        kwargs['update_fields'] = _with_update_field(kwargs.get('update_fields'), 'impact_metrics', 'co2_reduced')
+        super().save(*args, **kwargs)
 
 class ProjectPortfolio(models.Model):
     PORTFOLIO_STATUS_CHOICES = [
@@ -516,6 +631,8 @@ class ProjectPortfolio(models.Model):
     
     # Metrics and achievements
     environmental_impact = models.JSONField(default=dict, blank=True, help_text="Environmental metrics achieved")
+    # environmental_impact['co2_prevented'], kept in step by save() for the page totals
+    co2_prevented = models.BigIntegerField(default=0, editable=False)
     key_statistics = models.JSONField(default=dict, blank=True, help_text="Key project statistics")
     
     # Status and display
@@ -535,6 +652,12 @@ class ProjectPortfolio(models.Model):
         ordering = ['-completion_date', 'display_order']
         verbose_name = "Project Portfolio"
         verbose_name_plural = "Project Portfolio"
+        indexes = [
+            models.Index(
+                fields=['status', '-completion_date', 'display_order'],
+                name='portfolio_status_date_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -543,6 +666,10 @@ class ProjectPortfolio(models.Model):
         if not self.slug:
             from django.utils.text import slugify
             self.slug = slugify(self.title)
+        self.co2_prevented = metric_total(self.environmental_impact, 'co2_prevented')
+        kwargs['update_fields'] = _with_update_field(
+            kwargs.get('update_fields'), 'environmental_impact', 'co2_prevented'
+        )
         super().save(*args, **kwargs)
     
     def get_tags_list(self):
@@ -570,3 +697,64 @@ class CompanyMilestone(models.Model):
         if self.milestone_date:
             self.milestone_year = self.milestone_date.year
         super().save(*args, **kwargs)
+
+
+# ================================
+# IMAGE RENDITIONS
+# ================================
+
+class ImageRendition(models.Model):
+    """A resized copy of an uploaded image (see images.py)"""
+    FORMAT_CHOICES = [
+        ('webp', 'WebP'),
+        ('jpeg', 'JPEG'),
+    ]
+    
+    source_name = models.CharField(max_length=255, help_text="Storage name of the original upload")
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    target_width = models.PositiveIntegerField()
+    file = models.CharField(max_length=255, help_text="Storage name of the rendition")
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['source_name', 'format', 'width']
+        unique_together = ['source_name', 'format', 'target_width']
+    
+    def __str__(self):
+        return f"{self.source_name} ({self.format}, {self.width}w)"
+
+
+# ================================
+# BACKGROUND TASKS
+# ================================
+
+class Task(models.Model):
+    """A unit of background work picked up by the run_worker command"""
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('DEAD', 'Dead'),
+    ]
+    
+    name = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['run_at']
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='task_status_run_at_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.status})"
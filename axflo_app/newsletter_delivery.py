@@ -0,0 +1,398 @@
+"""
+Newsletter delivery.
+
+deliver_newsletter() streams a newsletter's recipients with .iterator(),
+renders the message body once per distinct set of matching interests and
+sends it in batches. Each sender thread keeps a single SMTP connection open
+for all of its batches, and a shared limiter caps the overall send rate.
+Every recipient gets a NewsletterDelivery row, so an interrupted run can be
+resumed without mailing anyone twice. Failed recipients are retried by
+later runs, up to NEWSLETTER_MAX_ATTEMPTS times each, and the newsletter is
+only marked sent once none of them is left to retry. Recipients still
+PENDING from an interrupted run are not sent to again: the message may
+already have gone out, and mailing nobody twice wins over completeness.
+
+Scheduled newsletters are picked up by claim_due_newsletters(), which the
+run_newsletter_scheduler command calls; several schedulers may run at once.
+Staff "send now" takes the same claim with claim_newsletter() and is refused
+while a scheduler holds it. The claim is renewed after every batch, so a
+long rate-limited send is never taken for abandoned while it is still
+running. Each batch also claims its recipients' rows, so if two runs do
+overlap, every recipient is still mailed by only one of them.
+"""
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F, Min, Prefetch, Q
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Newsletter, NewsletterDelivery, Subscriber, SubscriptionCategory
+from .stats import invalidate_stats_for_model
+
+UNSUBSCRIBE_PLACEHOLDER = '__AXFLO_UNSUBSCRIBE_URL__'
+
+
+def get_recipients(newsletter):
+    """Active subscribers interested in the newsletter (everyone if it has no categories)"""
+    category_ids = list(newsletter.categories.values_list('id', flat=True))
+    recipients = Subscriber.objects.filter(active_status=True)
+    if category_ids:
+        recipients = recipients.filter(interests__in=category_ids).distinct()
+    return recipients
+
+
+class MessageRenderer:
+    """Build messages, rendering the templates once per set of matching interests"""
+
+    def __init__(self, newsletter):
+        self.newsletter = newsletter
+        self.category_ids = set(newsletter.categories.values_list('id', flat=True))
+        self.rendered = {}
+
+    def render(self, categories):
+        key = frozenset(category.id for category in categories)
+        if key not in self.rendered:
+            context = {
+                'newsletter': self.newsletter,
+                'categories': sorted(categories, key=lambda category: category.name),
+                'unsubscribe_url': UNSUBSCRIBE_PLACEHOLDER,
+            }
+            self.rendered[key] = (
+                render_to_string('axflo_app/emails/newsletter.txt', context),
+                render_to_string('axflo_app/emails/newsletter.html', context),
+            )
+        return self.rendered[key]
+
+    def build(self, subscriber):
+        categories = [
+            category for category in subscriber.interests.all()
+            if category.id in self.category_ids
+        ]
+        text, html = self.render(categories)
+
+        unsubscribe_url = settings.SITE_URL.rstrip('/')
+        if subscriber.unsubscribe_token:
+            unsubscribe_url += reverse('axflo_app:newsletter_unsubscribe', args=[subscriber.unsubscribe_token])
+
+        message = EmailMultiAlternatives(
+            subject=self.newsletter.title,
+            body=text.replace(UNSUBSCRIBE_PLACEHOLDER, unsubscribe_url),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[subscriber.email],
+            headers={'List-Unsubscribe': f'<{unsubscribe_url}>'},
+        )
+        message.attach_alternative(html.replace(UNSUBSCRIBE_PLACEHOLDER, unsubscribe_url), 'text/html')
+        return message
+
+
+class RateLimiter:
+    """Space sends so that all threads together stay under ``rate`` per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            slot = max(self.next_slot, time.monotonic())
+            self.next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class BatchSender:
+    """Send batches over one reused mail connection per thread"""
+
+    def __init__(self, rate_limit=0):
+        self.limiter = RateLimiter(rate_limit)
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def get_connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            self.local.connection = connection
+            with self.lock:
+                self.connections.append(connection)
+        return connection
+
+    def drop_connection(self):
+        connection = getattr(self.local, 'connection', None)
+        self.local.connection = None
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def send_batch(self, batch):
+        """Send [(subscriber_id, message)]; returns [(subscriber_id, error or '')]"""
+        results = []
+        for position, (subscriber_id, message) in enumerate(batch):
+            try:
+                connection = self.get_connection()
+            except Exception as e:
+                # The mail server is unreachable: fail the rest of the batch
+                # (to be retried by a later run) rather than the whole send
+                self.local.connection = None
+                error = _error_text(e)
+                results.extend((pending_id, error) for pending_id, _ in batch[position:])
+                break
+            self.limiter.wait()
+            try:
+                sent = connection.send_messages([message])
+                results.append((subscriber_id, '' if sent else 'Rejected by mail server'))
+            except Exception as e:
+                results.append((subscriber_id, _error_text(e)))
+                # The connection may be broken; the next message opens a fresh one
+                self.drop_connection()
+        return results
+
+    def close(self):
+        for connection in self.connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+def _error_text(error):
+    return str(error) or error.__class__.__name__
+
+
+def _record_deliveries(newsletter, results):
+    now = timezone.now()
+    NewsletterDelivery.objects.bulk_create(
+        [
+            NewsletterDelivery(
+                newsletter=newsletter,
+                subscriber_id=subscriber_id,
+                status='FAILED' if error else 'SENT',
+                error=error,
+                sent_at=None if error else now,
+            )
+            for subscriber_id, error in results
+        ],
+        update_conflicts=True,
+        unique_fields=['newsletter', 'subscriber'],
+        update_fields=['status', 'error', 'sent_at'],
+    )
+    failed = sum(1 for _, error in results if error)
+    return len(results) - failed, failed
+
+
+def _mark_pending(newsletter, subscriber_ids):
+    """
+    Claim the deliveries of a batch for this run and return the subscriber
+    ids it may send to. Rows another run has sent or set PENDING are left
+    alone, so overlapping runs never mail anyone twice.
+    """
+    # Rows this run creates or moves to PENDING carry the token until they
+    # have been read back
+    token = f'claim:{uuid.uuid4().hex}'
+    batch = NewsletterDelivery.objects.filter(newsletter=newsletter, subscriber_id__in=subscriber_ids)
+    with transaction.atomic():
+        NewsletterDelivery.objects.bulk_create(
+            [
+                NewsletterDelivery(
+                    newsletter=newsletter, subscriber_id=subscriber_id,
+                    status='PENDING', error=token, attempts=1,
+                )
+                for subscriber_id in subscriber_ids
+            ],
+            ignore_conflicts=True,
+        )
+        batch.filter(status='FAILED', attempts__lt=settings.NEWSLETTER_MAX_ATTEMPTS).update(
+            status='PENDING', error=token, attempts=F('attempts') + 1
+        )
+        claimed = set(batch.filter(error=token).values_list('subscriber_id', flat=True))
+        batch.filter(error=token).update(error='')
+    return claimed
+
+
+def _finished_deliveries(newsletter):
+    """Deliveries that are not sent again: delivered, in flight or interrupted, or out of attempts"""
+    return NewsletterDelivery.objects.filter(newsletter=newsletter).filter(
+        Q(status__in=['SENT', 'PENDING']) | Q(status='FAILED', attempts__gte=settings.NEWSLETTER_MAX_ATTEMPTS)
+    )
+
+
+def deliver_newsletter(newsletter, batch_size=None, concurrency=None, rate_limit=None, heartbeat=None):
+    """
+    Send a newsletter to every recipient that has not received it yet.
+
+    ``heartbeat()`` is called after every batch, to keep a claim or lock on
+    the send alive; if it raises, the batches already handed to the sender
+    threads are finished and recorded, and the exception is re-raised.
+
+    Returns ``{'sent': n, 'failed': n, 'renders': n}`` for this run, where
+    renders counts the distinct message bodies rendered. Recipients that
+    failed are retried by the next call until they run out of attempts; the
+    newsletter is marked sent when none is left to retry.
+    """
+    batch_size = batch_size or settings.NEWSLETTER_BATCH_SIZE
+    concurrency = concurrency or settings.NEWSLETTER_CONCURRENCY
+    rate_limit = settings.NEWSLETTER_RATE_LIMIT if rate_limit is None else rate_limit
+
+    finished = _finished_deliveries(newsletter).values('subscriber_id')
+    recipients = get_recipients(newsletter).exclude(id__in=finished).only(
+        'id', 'email', 'unsubscribe_token'
+    ).order_by('id').prefetch_related(
+        Prefetch('interests', queryset=SubscriptionCategory.objects.only('id', 'name'))
+    )
+
+    renderer = MessageRenderer(newsletter)
+    sender = BatchSender(rate_limit)
+    totals = {'sent': 0, 'failed': 0}
+    in_flight = deque()
+
+    def collect(future):
+        sent, failed = _record_deliveries(newsletter, future.result())
+        totals['sent'] += sent
+        totals['failed'] += failed
+        if heartbeat is not None:
+            heartbeat()
+
+    def submit(batch):
+        claimed = _mark_pending(newsletter, [subscriber_id for subscriber_id, _ in batch])
+        batch = [message for message in batch if message[0] in claimed]
+        if not batch:
+            return
+        in_flight.append(executor.submit(sender.send_batch, batch))
+        # Bound memory: keep at most two batches queued per thread
+        while len(in_flight) > concurrency * 2:
+            collect(in_flight.popleft())
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            batch = []
+            for subscriber in recipients.iterator(chunk_size=batch_size):
+                batch.append((subscriber.id, renderer.build(subscriber)))
+                if len(batch) >= batch_size:
+                    submit(batch)
+                    batch = []
+            if batch:
+                submit(batch)
+            while in_flight:
+                collect(in_flight.popleft())
+    except BaseException:
+        # Record what the sender threads still send, so it is not re-sent
+        while in_flight:
+            future = in_flight.popleft()
+            if not future.exception():
+                _record_deliveries(newsletter, future.result())
+        raise
+    finally:
+        sender.close()
+
+    # Otherwise a scheduled newsletter stays claimed, and is picked up again
+    # for the retries once the claim times out
+    retryable = NewsletterDelivery.objects.filter(
+        newsletter=newsletter, status='FAILED', attempts__lt=settings.NEWSLETTER_MAX_ATTEMPTS
+    )
+    if not retryable.exists():
+        Newsletter.objects.filter(pk=newsletter.pk).update(
+            sent=True, send_date=newsletter.send_date or timezone.now()
+        )
+        # update() sends no post_save for the dashboard counters
+        invalidate_stats_for_model(Newsletter)
+    totals['renders'] = len(renderer.rendered)
+    return totals
+
+
+# ================================
+# SCHEDULING
+# ================================
+
+def _unclaimed(now):
+    abandoned = now - timedelta(seconds=settings.NEWSLETTER_CLAIM_TIMEOUT)
+    return Q(delivery_started_at__isnull=True) | Q(delivery_started_at__lt=abandoned)
+
+
+def get_due_newsletters(now=None):
+    """Unsent newsletters whose send date has passed and that nobody is sending"""
+    now = now or timezone.now()
+    return Newsletter.objects.filter(sent=False, send_date__lte=now).filter(_unclaimed(now))
+
+
+def claim_newsletter(newsletter):
+    """
+    Claim an unsent newsletter for a send staff started ("send now").
+    Returns False while a scheduler or another send holds the claim.
+    """
+    now = timezone.now()
+    claimed = Newsletter.objects.filter(_unclaimed(now), pk=newsletter.pk, sent=False).update(
+        delivery_started_at=now
+    )
+    if claimed:
+        newsletter.delivery_started_at = now
+    return bool(claimed)
+
+
+def release_claim(newsletter):
+    """Give up this process's claim on a newsletter, if it still holds it"""
+    Newsletter.objects.filter(
+        pk=newsletter.pk, delivery_started_at=newsletter.delivery_started_at
+    ).update(delivery_started_at=None)
+
+
+class ClaimLost(Exception):
+    """Another scheduler took over a newsletter this process was sending"""
+
+
+def renew_claim(newsletter):
+    """Move this process's claim on a newsletter forward; raises ClaimLost if it is no longer ours"""
+    now = timezone.now()
+    renewed = Newsletter.objects.filter(
+        pk=newsletter.pk, delivery_started_at=newsletter.delivery_started_at
+    ).update(delivery_started_at=now)
+    if not renewed:
+        raise ClaimLost(f'Newsletter {newsletter.pk} was claimed by another scheduler')
+    newsletter.delivery_started_at = now
+
+
+def claim_due_newsletters(limit=10):
+    """
+    Claim up to ``limit`` due newsletters for this process and return them.
+
+    Rows are locked with SELECT ... FOR UPDATE SKIP LOCKED so concurrent
+    schedulers never wait on each other, and each claim is a conditional
+    UPDATE so a newsletter is only claimed once even on databases without
+    row locks (SQLite).
+    """
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        candidates = list(
+            get_due_newsletters(now).order_by('send_date')
+            .select_for_update(skip_locked=True)[:limit]
+        )
+        for newsletter in candidates:
+            if get_due_newsletters(now).filter(pk=newsletter.pk).update(delivery_started_at=now):
+                newsletter.delivery_started_at = now
+                claimed.append(newsletter)
+    return claimed
+
+
+def get_delivery_latency(newsletter):
+    """Seconds between a newsletter's send date and its first delivered message"""
+    first_sent = newsletter.deliveries.filter(status='SENT').aggregate(first=Min('sent_at'))['first']
+    if first_sent is None or newsletter.send_date is None:
+        return None
+    return (first_sent - newsletter.send_date).total_seconds()
@@ -0,0 +1,263 @@
+"""
+Full-page cache for the public site.
+
+Rendered pages are stored per page group (index, media, careers...) and keyed
+on path, query string and cookie-consent state. Each group carries a version
+number in the cache; bumping it retires every cached variant of that group at
+once, which is how model saves purge exactly the pages they feed.
+
+Views given a ``validators`` function also answer conditional GETs: the
+ETag and Last-Modified of a group are derived from a cheap aggregate over
+the page's data (cached per group version), and matching If-None-Match /
+If-Modified-Since requests get a 304 before the view or cache is touched.
+
+get_cached_fragment() keeps pre-rendered parts of a page (the careers job
+listing) under the same group versions, for requests the page cache skips.
+"""
+import hashlib
+import re
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.utils.safestring import mark_safe
+
+PAGE_CACHE_PREFIX = 'page'
+CSRF_PLACEHOLDER = '__AXFLO_CSRF_TOKEN__'
+CONSENT_COOKIE_NAME = 'cookie_consent'
+
+CSRF_INPUT_RE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+# Page groups fed by each model, keyed by model label
+MODEL_PAGE_GROUPS = {
+    'axflo_app.newsarticle': ['index', 'media', 'blog_detail'],
+    'axflo_app.blogcategory': ['media', 'blog_detail'],
+    'axflo_app.jobposting': ['index', 'careers'],
+    'axflo_app.achievement': ['achievements'],
+    'axflo_app.achievementcategory': ['achievements'],
+    'axflo_app.projectportfolio': ['achievements'],
+    'axflo_app.companymilestone': ['achievements'],
+}
+
+
+def get_page_cache_timeout():
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60)
+
+
+def _version_key(group):
+    return f'{PAGE_CACHE_PREFIX}:version:{group}'
+
+
+def _fresh_version():
+    # Seeded from the clock rather than 1: a version key evicted from the
+    # cache must not come back as a number whose pages are still stored
+    return time.time_ns()
+
+
+def get_group_version(group):
+    """Return the current version of a page group, initialising it if missing"""
+    version = cache.get(_version_key(group))
+    if version is None:
+        cache.add(_version_key(group), _fresh_version(), None)
+        version = cache.get(_version_key(group)) or _fresh_version()
+    return version
+
+
+def _modified_key(group):
+    return f'{PAGE_CACHE_PREFIX}:modified:{group}'
+
+
+def invalidate_page_group(group):
+    """Retire every cached variant of a page group"""
+    try:
+        cache.incr(_version_key(group))
+    except ValueError:
+        # Version key missing (evicted or never set) - start a fresh one
+        cache.set(_version_key(group), _fresh_version(), None)
+    # Changes the data timestamps miss (categories, milestones, deletions)
+    # still move Last-Modified forward
+    cache.set(_modified_key(group), timezone.now(), None)
+
+
+def invalidate_pages_for_model(model):
+    """Purge the page groups fed by the given model class or instance"""
+    for group in MODEL_PAGE_GROUPS.get(model._meta.label_lower, []):
+        invalidate_page_group(group)
+
+
+def should_bypass_cache(request):
+    """Only anonymous GET/HEAD traffic is served from the page cache"""
+    if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+        return True
+    if request.method not in ('GET', 'HEAD'):
+        return True
+    # Checked on raw cookies so anonymous hits never load a session
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return True
+    if 'messages' in request.COOKIES:
+        return True
+    return False
+
+
+def build_page_cache_key(request, group):
+    """Key a page on group version, path, query string and consent state"""
+    query = request.META.get('QUERY_STRING', '')
+    if query:
+        query = '&'.join(sorted(query.split('&')))
+    consent = request.COOKIES.get(CONSENT_COOKIE_NAME, '')
+    raw = f'{request.path}?{query}|{consent}'
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'{PAGE_CACHE_PREFIX}:{group}:v{get_group_version(group)}:{digest}'
+
+
+def _build_response(request, entry):
+    content, content_type, charset = entry
+    content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+    response = HttpResponse(content, content_type=content_type, charset=charset)
+    response['X-Page-Cache'] = 'HIT'
+    return response
+
+
+def get_page_validators(request, group, validators):
+    """
+    Return (etag, last_modified) for a page of a group.
+
+    ``validators()`` returns a dict with the group data's ``latest`` change
+    (a datetime or None) and anything else that changes with the content,
+    such as row counts. It is only called once per group version, so it
+    covers every page of the group rather than one URL.
+    """
+    key = f'{PAGE_CACHE_PREFIX}:validators:{group}:v{get_group_version(group)}'
+    state = cache.get(key)
+    if state is None:
+        data = validators()
+        latest = data.get('latest')
+        modified = cache.get(_modified_key(group))
+        if modified is not None and (latest is None or modified > latest):
+            latest = modified
+        digest = hashlib.md5(repr(sorted(data.items())).encode('utf-8')).hexdigest()
+        state = (f'{group}:{get_group_version(group)}:{digest}', latest)
+        cache.set(key, state, get_page_cache_timeout())
+
+    token, latest = state
+    # Pages differ by cookie-consent state, and CACHE_VERSION is bumped on deploys
+    consent = request.COOKIES.get(CONSENT_COOKIE_NAME, '')
+    raw = f'{token}|{consent}|{settings.CACHE_VERSION}'
+    etag = f'"{hashlib.md5(raw.encode("utf-8")).hexdigest()}"'
+    return etag, latest
+
+
+def get_cached_fragment(group, name, render):
+    """
+    Return the HTML of a page fragment, rendered by ``render()`` at most once
+    per group version. Unlike whole pages it is shared by every visitor,
+    signed-in or not, so it must not contain per-request content.
+    """
+    if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+        return render()
+    key = f'{PAGE_CACHE_PREFIX}:fragment:{group}:{name}:v{get_group_version(group)}'
+    html = cache.get(key)
+    if html is None:
+        html = render()
+        cache.set(key, html, get_page_cache_timeout())
+    return mark_safe(html)
+
+
+def _lookup(request, group, on_hit, validators, args, kwargs):
+    """
+    Return (response, state): a 304 or cached response to serve, or None
+    and the state _store() needs once the view has run.
+    """
+    etag = latest = None
+    if validators is not None:
+        etag, latest = get_page_validators(request, group, validators)
+        response = get_conditional_response(
+            request, etag=etag,
+            last_modified=int(latest.timestamp()) if latest else None,
+        )
+        if response is not None:
+            if on_hit is not None:
+                on_hit(request, *args, **kwargs)
+            return _add_validators(response, etag, latest), None
+
+    cache_key = build_page_cache_key(request, group)
+    entry = cache.get(cache_key)
+    if entry is not None:
+        if on_hit is not None:
+            on_hit(request, *args, **kwargs)
+        return _add_validators(_build_response(request, entry), etag, latest), None
+    return None, (cache_key, etag, latest)
+
+
+def _store(response, state):
+    cache_key, etag, latest = state
+    if (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+    ):
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+        content = CSRF_INPUT_RE.sub(
+            r'\g<1>' + CSRF_PLACEHOLDER + r'\g<2>',
+            response.content.decode(response.charset),
+        )
+        entry = (content, response['Content-Type'], response.charset)
+        cache.set(cache_key, entry, get_page_cache_timeout())
+        response['X-Page-Cache'] = 'MISS'
+        _add_validators(response, etag, latest)
+    return response
+
+
+def cache_public_page(group, on_hit=None, validators=None):
+    """
+    Serve anonymous requests for a public view from the page cache.
+
+    ``on_hit`` is called with the request and view kwargs whenever a cached
+    copy or a 304 is served, for side effects the skipped view would have
+    performed. ``validators`` enables conditional GETs (see
+    get_page_validators). Async views get an async wrapper, which does the
+    (blocking) cache work in a thread.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                if should_bypass_cache(request):
+                    return await view_func(request, *args, **kwargs)
+                response, state = await sync_to_async(_lookup)(request, group, on_hit, validators, args, kwargs)
+                if response is not None:
+                    return response
+                response = await view_func(request, *args, **kwargs)
+                return await sync_to_async(_store)(response, state)
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if should_bypass_cache(request):
+                return view_func(request, *args, **kwargs)
+            response, state = _lookup(request, group, on_hit, validators, args, kwargs)
+            if response is not None:
+                return response
+            return _store(view_func(request, *args, **kwargs), state)
+        return wrapper
+    return decorator
+
+
+def _add_validators(response, etag, latest):
+    if etag is None:
+        return response
+    response['ETag'] = etag
+    if latest is not None:
+        response['Last-Modified'] = http_date(latest.timestamp())
+    # Revalidate on every visit rather than reuse the page heuristically
+    patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ['Cookie'])
+    return response
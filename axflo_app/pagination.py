@@ -0,0 +1,231 @@
+"""
+Keyset (cursor) pagination for the staff list views.
+
+CursorPaginator walks a queryset by its ordering columns instead of OFFSET,
+so deep pages cost the same as the first one. Pages are addressed by opaque
+tokens that carry the sort key of the row to continue from. The page objects
+mirror django.core.paginator.Page (has_next, next_page_number, start_index,
+paginator.count, ...), so the admin templates' ``?page=`` links work as they
+did with Paginator: tokens for next/previous, plain numbers for first/last.
+"""
+import base64
+import binascii
+import json
+import math
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+# Below this many rows an exact COUNT(*) is cheap enough to run
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+def _reverse_ordering(ordering):
+    return [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+
+
+def _dump_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(number, direction, keys):
+    payload = json.dumps({'n': number, 'd': direction, 'k': [_dump_value(key) for key in keys]})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (number, direction, keys), or None for a malformed token"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        number, direction, keys = int(payload['n']), payload['d'], list(payload['k'])
+    except (ValueError, TypeError, KeyError, UnicodeError, binascii.Error):
+        return None
+    if direction not in ('next', 'prev'):
+        return None
+    return number, direction, keys
+
+
+class CursorPage:
+    """One page of a CursorPaginator, template-compatible with Django's Page"""
+
+    def __init__(self, object_list, number, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage {self.number} of {self.paginator.num_pages}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def next_page_number(self):
+        """Token for the page after this one"""
+        return encode_cursor(
+            self.number + 1, 'next', self.paginator.get_keys(self.object_list[-1])
+        )
+
+    def previous_page_number(self):
+        """Token for the page before this one (plain 1 for the first page)"""
+        if self.number <= 2:
+            return 1
+        return encode_cursor(
+            self.number - 1, 'prev', self.paginator.get_keys(self.object_list[0])
+        )
+
+    def start_index(self):
+        if not self.object_list:
+            return 0
+        return (self.number - 1) * self.paginator.per_page + 1
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1 if self.object_list else 0
+
+
+class CursorPaginator:
+    """
+    Paginate ``queryset`` ordered by ``ordering`` (e.g. ``['-date']``).
+
+    The primary key is appended to the ordering as a tie-breaker so every
+    row has a unique sort key. With ``estimate_count`` the total for large
+    unfiltered tables comes from the planner statistics instead of COUNT(*).
+    """
+
+    def __init__(self, queryset, per_page, ordering, estimate_count=False):
+        ordering = list(ordering)
+        if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            descending = ordering and ordering[-1].startswith('-')
+            ordering.append('-pk' if descending else 'pk')
+        self.ordering = ordering
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = per_page
+        self.estimate_count = estimate_count
+        self.count_is_estimate = False
+
+    def get_keys(self, obj):
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    @cached_property
+    def count(self):
+        if self.estimate_count and not self.queryset.query.where:
+            estimate = self._estimated_table_rows()
+            if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                self.count_is_estimate = True
+                return estimate
+        return self.queryset.count()
+
+    def _estimated_table_rows(self):
+        connection = connections[self.queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [self.queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    @cached_property
+    def num_pages(self):
+        return max(1, math.ceil(self.count / self.per_page))
+
+    @property
+    def page_range(self):
+        return range(1, self.num_pages + 1)
+
+    def _keyset_filter(self, keys, forward):
+        """Rows after (forward) or before the given sort key"""
+        clauses = []
+        for i, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') == forward else 'gt'
+            conditions = {prev.lstrip('-'): keys[j] for j, prev in enumerate(self.ordering[:i])}
+            conditions[f'{name}__{lookup}'] = keys[i]
+            clauses.append(Q(**conditions))
+        return reduce(or_, clauses)
+
+    def get_page(self, page):
+        """
+        Return a page for a ``?page=`` value: a cursor token, a page number
+        (1 and the last page are served by keyset, others by OFFSET), or
+        nothing for the first page. Invalid values fall back to page 1.
+        """
+        page = str(page).strip() if page is not None else ''
+        if page.isdigit():
+            return self._number_page(int(page))
+        cursor = decode_cursor(page) if page else None
+        if cursor is None:
+            return self._first_page()
+        try:
+            return self._cursor_page(*cursor)
+        except (ValidationError, ValueError, TypeError, IndexError):
+            return self._first_page()
+
+    def _first_page(self):
+        rows = list(self.queryset[:self.per_page + 1])
+        return CursorPage(rows[:self.per_page], 1, self, len(rows) > self.per_page, False)
+
+    def _last_page(self):
+        count = self.count
+        size = self.per_page
+        if not self.count_is_estimate:
+            size = count - (self.num_pages - 1) * self.per_page or self.per_page
+        rows = list(self.queryset.order_by(*_reverse_ordering(self.ordering))[:size])
+        rows.reverse()
+        return CursorPage(rows, self.num_pages, self, False, self.num_pages > 1)
+
+    def _number_page(self, number):
+        if number <= 1:
+            return self._first_page()
+        if number >= self.num_pages:
+            return self._last_page()
+        offset = (number - 1) * self.per_page
+        rows = list(self.queryset[offset:offset + self.per_page + 1])
+        return CursorPage(rows[:self.per_page], number, self, len(rows) > self.per_page, True)
+
+    def _cursor_page(self, number, direction, keys):
+        if len(keys) != len(self.ordering):
+            return self._first_page()
+
+        if direction == 'next':
+            rows = list(self.queryset.filter(self._keyset_filter(keys, forward=True))[:self.per_page + 1])
+            if not rows:
+                return self._last_page()
+            return CursorPage(rows[:self.per_page], max(number, 2), self, len(rows) > self.per_page, True)
+
+        rows = list(
+            self.queryset.filter(self._keyset_filter(keys, forward=False))
+            .order_by(*_reverse_ordering(self.ordering))[:self.per_page + 1]
+        )
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        if not has_previous:
+            # Reached the start of the list; renumber from the top
+            return self._first_page()
+        return CursorPage(rows, max(number, 2), self, True, True)
@@ -0,0 +1,120 @@
+"""
+Live updates for the staff dashboard.
+
+Open dashboard, contacts and applications pages hold a websocket to
+consumers.StaffDashboardConsumer and join the DASHBOARD_GROUP channel
+group. When a contact submission, job application or subscriber is
+created, the post_save receivers in signals.py call broadcast_created(),
+which sends the group one event once the transaction commits:
+
+    {"model": "contacts",
+     "deltas": {"contacts.total": 1, "contacts.unread": 1},
+     "row": {"id": 12, "title": "Ada Obi", "subtitle": "General", ...}}
+
+Delta keys are the stats.py counter names, so the page adds them to the
+numbers it rendered instead of anyone re-running the counts. Bulk writes
+(the subscriber import) send one event with the summed deltas and no row.
+
+Broadcasting never fails the write that triggered it: a missing or
+unreachable channel layer is logged and skipped.
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import ContactSubmission, JobApplication, Subscriber
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_GROUP = 'staff_dashboard'
+
+
+def _date(value):
+    # Same format as the dashboard's {{ date|date:"M d, Y" }}
+    return timezone.localtime(value).strftime('%b %d, %Y')
+
+
+def _contact_event(contact):
+    return 'contacts', {
+        'contacts.total': 1,
+        'contacts.unread': 0 if contact.read else 1,
+    }, {
+        'id': contact.pk,
+        'title': contact.name,
+        'subtitle': contact.inquiry_type.name,
+        'date': _date(contact.date),
+        'status': 'read' if contact.read else 'unread',
+        'status_label': 'Read' if contact.read else 'New',
+        'url': reverse('axflo_app:admin_contact_detail', args=[contact.pk]),
+    }
+
+
+def _application_event(application):
+    return 'applications', {
+        'applications.total': 1,
+        'applications.new': 1 if application.status == 'SUBMITTED' else 0,
+    }, {
+        'id': application.pk,
+        'title': f'{application.first_name} {application.last_name}',
+        'subtitle': application.job_posting.title,
+        'date': _date(application.application_date),
+        'status': application.status.lower(),
+        'status_label': application.get_status_display(),
+        'url': reverse('axflo_app:admin_application_detail', args=[application.pk]),
+    }
+
+
+def _subscriber_event(subscriber):
+    name = f'{subscriber.first_name} {subscriber.last_name}'.strip()
+    return 'subscribers', {
+        'subscribers.total': 1,
+        'subscribers.active': 1 if subscriber.active_status else 0,
+        'subscribers.inactive': 0 if subscriber.active_status else 1,
+    }, {
+        'id': subscriber.pk,
+        'title': subscriber.email,
+        'subtitle': name,
+        'date': _date(subscriber.subscription_date),
+        'status': 'active' if subscriber.active_status else 'inactive',
+        'status_label': 'Active' if subscriber.active_status else 'Inactive',
+        'url': reverse('axflo_app:admin_subscribers'),
+    }
+
+
+EVENT_BUILDERS = {
+    ContactSubmission: _contact_event,
+    JobApplication: _application_event,
+    Subscriber: _subscriber_event,
+}
+
+
+def _send(payload):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(
+            DASHBOARD_GROUP, {'type': 'dashboard.event', 'payload': payload}
+        )
+    except Exception:
+        logger.exception('Could not broadcast dashboard event for %s', payload['model'])
+
+
+def broadcast(model, deltas, row=None):
+    """Send a dashboard event once the current transaction commits"""
+    payload = {
+        'model': model,
+        'deltas': {name: delta for name, delta in deltas.items() if delta},
+        'row': row,
+    }
+    transaction.on_commit(lambda: _send(payload))
+
+
+def broadcast_created(instance):
+    """Announce a newly created contact submission, job application or subscriber"""
+    model, deltas, row = EVENT_BUILDERS[type(instance)](instance)
+    broadcast(model, deltas, row)
@@ -0,0 +1,244 @@
+"""
+Per-request performance counters.
+
+RequestTimingMiddleware (middleware.py) opens a RequestMetrics for each
+request with collect(); while it is open, the hooks installed by
+install_hooks() add to it:
+
+- database time and query count, through an execute wrapper placed on
+  every connection as it is opened;
+- template render time, by timing the outermost Template.render call
+  (includes render inside it and are not counted twice);
+- cache hits and misses (and their lookup time), by wrapping get() and
+  get_many() of the configured cache backends.
+
+collect(repeat_threshold=n) also counts queries by SQL shape (the SQL with
+literals and IN lists collapsed). The first time a shape runs n times in
+one request it is recorded with its call site: the innermost project
+frame, plus the template line when the query comes from a template. This
+is the N+1 detector; it walks the stack, so it is meant for development.
+
+The current RequestMetrics lives in a context variable, so it follows the
+request into sync_to_async threads and async views. With no request open
+the hooks only read that variable. install_hooks() runs once, and only if
+the middleware is enabled.
+"""
+import re
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+
+_current = ContextVar('request_metrics', default=None)
+_MISSING = object()
+_installed = False
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN \((?:\s*(?:%s|\?)\s*,?)+\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+# Frames of the instrumentation itself are never the call site
+_SKIPPED_FILES = {__file__, str(Path(__file__).with_name('middleware.py'))}
+
+
+class RequestMetrics:
+    __slots__ = (
+        'started', 'db_time', 'queries', 'template_time', 'templates', 'template_depth',
+        'cache_time', 'cache_hits', 'cache_misses', 'repeat_threshold', 'query_shapes', 'repeated',
+    )
+
+    def __init__(self, repeat_threshold=0):
+        self.started = time.perf_counter()
+        self.db_time = self.template_time = self.cache_time = 0.0
+        self.queries = self.templates = self.template_depth = 0
+        self.cache_hits = self.cache_misses = 0
+        self.repeat_threshold = repeat_threshold
+        # SQL shape -> times run, and shape -> call site once over the threshold
+        self.query_shapes = {}
+        self.repeated = {}
+
+    def repeated_queries(self):
+        """(times run, SQL shape, call site) for each shape over the threshold, most run first"""
+        return sorted(
+            ((self.query_shapes[shape], shape, site) for shape, site in self.repeated.items()),
+            reverse=True,
+        )
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total):
+        """The Server-Timing header value (durations in milliseconds)"""
+        return ', '.join([
+            f'total;dur={total * 1000:.1f}',
+            f'db;desc="{self.queries} queries";dur={self.db_time * 1000:.1f}',
+            f'tpl;desc="{self.templates} templates";dur={self.template_time * 1000:.1f}',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses";dur={self.cache_time * 1000:.1f}',
+        ])
+
+    def summary(self, total):
+        return (
+            f'{total * 1000:.0f} ms total, db {self.db_time * 1000:.0f} ms in {self.queries} queries, '
+            f'templates {self.template_time * 1000:.0f} ms, '
+            f'cache {self.cache_hits} hits/{self.cache_misses} misses'
+        )
+
+
+def current_metrics():
+    """The RequestMetrics of the request being served, or None"""
+    return _current.get()
+
+
+@contextmanager
+def collect(repeat_threshold=0):
+    metrics = RequestMetrics(repeat_threshold)
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+# ================================
+# REPEATED QUERIES
+# ================================
+
+def sql_shape(sql):
+    """``sql`` with literals, numbers and IN lists replaced, so N+1 queries compare equal"""
+    shape = _STRING_LITERAL_RE.sub('?', sql)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _IN_LIST_RE.sub('IN (...)', shape)
+    return _WHITESPACE_RE.sub(' ', shape).strip()
+
+
+def call_site():
+    """Where the running query comes from: the innermost project frame and template line"""
+    base_dir = str(settings.BASE_DIR)
+    code_site = template_site = None
+    frame = sys._getframe(1)
+    while frame is not None and code_site is None:
+        code = frame.f_code
+        if template_site is None and code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                template_site = f'{origin.template_name}:{token.lineno}'
+        filename = code.co_filename
+        if (filename.startswith(base_dir) and filename not in _SKIPPED_FILES
+                and 'site-packages' not in filename):
+            code_site = f'{Path(filename).relative_to(base_dir)}:{frame.f_lineno} in {code.co_name}'
+        frame = frame.f_back
+    if template_site is None:
+        return code_site or '?'
+    if code_site is None:
+        # Async views render through sync_to_async, leaving no project frame
+        return f'template {template_site}'
+    return f'template {template_site}, rendered from {code_site}'
+
+
+def _count_shape(metrics, sql):
+    shape = sql_shape(sql)
+    count = metrics.query_shapes.get(shape, 0) + 1
+    metrics.query_shapes[shape] = count
+    if count == metrics.repeat_threshold:
+        metrics.repeated[shape] = call_site()
+
+
+# ================================
+# HOOKS
+# ================================
+
+def _time_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    if metrics.repeat_threshold:
+        _count_shape(metrics, sql)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - started
+        metrics.queries += 1
+
+
+def _wrap_connection(sender, connection, **kwargs):
+    # Connections persist across reconnects, so only wrap once
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _time_query)
+
+
+def _wrap_template_render(render):
+    def timed_render(self, context):
+        metrics = _current.get()
+        if metrics is None:
+            return render(self, context)
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_time += time.perf_counter() - started
+            metrics.templates += 1
+    return timed_render
+
+
+def _wrap_cache_get(get):
+    def timed_get(self, key, default=None, version=None):
+        metrics = _current.get()
+        if metrics is None:
+            return get(self, key, default, version)
+        started = time.perf_counter()
+        value = get(self, key, _MISSING, version)
+        metrics.cache_time += time.perf_counter() - started
+        if value is _MISSING:
+            metrics.cache_misses += 1
+            return default
+        metrics.cache_hits += 1
+        return value
+    return timed_get
+
+
+def _wrap_cache_get_many(get_many):
+    def timed_get_many(self, keys, version=None):
+        metrics = _current.get()
+        if metrics is None:
+            return get_many(self, keys, version)
+        keys = list(keys)
+        started = time.perf_counter()
+        values = get_many(self, keys, version)
+        metrics.cache_time += time.perf_counter() - started
+        metrics.cache_hits += len(values)
+        metrics.cache_misses += len(keys) - len(values)
+        return values
+    return timed_get_many
+
+
+def install_hooks():
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    connection_created.connect(_wrap_connection, dispatch_uid='request_metrics_time_queries')
+    for connection in connections.all(initialized_only=True):
+        _wrap_connection(None, connection)
+    Template.render = _wrap_template_render(Template.render)
+
+    for backend in {type(caches[alias]) for alias in caches}:
+        backend.get = _wrap_cache_get(backend.get)
+        # BaseCache.get_many() calls get(), which already counts each key
+        if backend.get_many is not BaseCache.get_many:
+            backend.get_many = _wrap_cache_get_many(backend.get_many)
@@ -0,0 +1,161 @@
+"""
+Full-text search for news articles.
+
+PostgreSQL keeps a weighted ``tsvector`` column with a GIN index on
+axflo_app_newsarticle; SQLite keeps an FTS5 table (porter stemming) keyed by
+article id. Both are written by index_article(), which NewsArticle.save()
+calls, and queried by search_articles(), which filters, ranks and annotates
+each hit with a highlighted snippet. The column, index and FTS5 table are
+created by migration 0007.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, TextField
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+ARTICLE_TABLE = 'axflo_app_newsarticle'
+FTS_TABLE = 'axflo_app_newsarticle_fts'
+SEARCH_CONFIG = 'english'
+
+# Snippet markers are control characters so article text can be escaped
+# safely before they are turned into <mark> tags
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+# Title matches outrank excerpt/tag matches, which outrank body matches
+POSTGRES_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(excerpt, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(tags, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(content, '')), 'C')"
+)
+
+SEARCH_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def get_search_backend(using=None):
+    vendor = (using or connection).vendor
+    if vendor == 'postgresql':
+        return 'postgresql'
+    if vendor == 'sqlite':
+        return 'sqlite'
+    return None
+
+
+# ================================
+# INDEXING
+# ================================
+
+def index_article(article):
+    """Bring the search index up to date with a saved article"""
+    backend = get_search_backend()
+    with connection.cursor() as cursor:
+        if backend == 'postgresql':
+            cursor.execute(
+                f'UPDATE {ARTICLE_TABLE} SET search_vector = {POSTGRES_VECTOR_SQL} WHERE id = %s',
+                [article.pk]
+            )
+        elif backend == 'sqlite':
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [article.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, excerpt, tags, content) VALUES (%s, %s, %s, %s, %s)',
+                [article.pk, article.title, article.excerpt or '', article.tags, article.content]
+            )
+
+
+def rebuild_search_index():
+    """Re-index every article, e.g. after bulk_create or raw imports"""
+    backend = get_search_backend()
+    with connection.cursor() as cursor:
+        if backend == 'postgresql':
+            cursor.execute(f'UPDATE {ARTICLE_TABLE} SET search_vector = {POSTGRES_VECTOR_SQL}')
+        elif backend == 'sqlite':
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, excerpt, tags, content) "
+                f"SELECT id, title, coalesce(excerpt, ''), tags, content FROM {ARTICLE_TABLE}"
+            )
+
+
+def unindex_article(article_id):
+    """Remove a deleted article from the search index"""
+    if get_search_backend() == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [article_id])
+
+
+# ================================
+# QUERYING
+# ================================
+
+def _fts5_query(search_query):
+    """Quote every term so user input cannot use FTS5 query syntax"""
+    return ' '.join(f'"{token}"' for token in SEARCH_TOKEN_RE.findall(search_query))
+
+
+def search_articles(queryset, search_query):
+    """
+    Filter a NewsArticle queryset to full-text matches, best first.
+
+    Each result carries ``search_rank`` and ``search_snippet`` annotations;
+    pass the snippet through highlight_snippet() for display.
+    """
+    backend = get_search_backend()
+
+    if backend == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.filter(
+            RawSQL(f'{ARTICLE_TABLE}.search_vector @@ {tsquery}', [search_query], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f'ts_rank_cd({ARTICLE_TABLE}.search_vector, {tsquery})', [search_query]),
+            search_snippet=RawSQL(
+                f"ts_headline('{SEARCH_CONFIG}', coalesce(nullif({ARTICLE_TABLE}.excerpt, ''), "
+                f"{ARTICLE_TABLE}.content), {tsquery}, "
+                f"'StartSel={MARK_START}, StopSel={MARK_END}, MaxWords=35, MinWords=15')",
+                [search_query]
+            ),
+        ).order_by('-search_rank', '-published_at')
+
+    if backend == 'sqlite':
+        match = _fts5_query(search_query)
+        if not match:
+            return queryset.none()
+        # MATCH runs once in the id filter, so counting the matches never
+        # probes the index row by row. The ranks come from one materialized
+        # pass over the matches (bm25() is lower-is-better, so it is negated
+        # to sort like ts_rank); snippets are only made for the rows fetched.
+        materialized = 'MATERIALIZED ' if connection.Database.sqlite_version_info >= (3, 35) else ''
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f'WITH ranked (id, rank) AS {materialized}('
+                f'SELECT rowid, -bm25({FTS_TABLE}, 10.0, 5.0, 5.0, 1.0) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s'
+                f') SELECT rank FROM ranked WHERE ranked.id = {ARTICLE_TABLE}.id',
+                [match], output_field=FloatField()
+            ),
+            search_snippet=RawSQL(
+                f"SELECT snippet({FTS_TABLE}, -1, '{MARK_START}', '{MARK_END}', '...', 30) "
+                f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {ARTICLE_TABLE}.id',
+                [match], output_field=TextField()
+            ),
+        ).order_by('-search_rank', '-published_at')
+
+    # Other databases fall back to substring matching
+    return queryset.filter(
+        Q(title__icontains=search_query) |
+        Q(excerpt__icontains=search_query) |
+        Q(tags__icontains=search_query)
+    )
+
+
+def highlight_snippet(snippet):
+    """Escape a search snippet and turn its match markers into <mark> tags"""
+    if not snippet:
+        return ''
+    html = escape(strip_tags(snippet)).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+    return mark_safe(html)
@@ -0,0 +1,142 @@
+"""
+Signal receivers for the axflo_app
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
+
+from .models import (
+    NewsArticle, BlogCategory, JobPosting, Achievement, AchievementCategory,
+    ProjectPortfolio, CompanyMilestone, ContactSubmission, Subscriber,
+    Newsletter, JobApplication
+)
+from .images import IMAGE_FIELDS, delete_renditions, get_image_names, has_renditions
+from .page_cache import invalidate_pages_for_model
+from .realtime import EVENT_BUILDERS, broadcast_created
+from .search import unindex_article
+from .stats import invalidate_stats_for_model
+from .task_queue import enqueue
+from . import tasks
+
+# Saves that only touch these fields do not change any rendered page
+NON_RENDERED_FIELDS = {'view_count'}
+
+PAGE_CACHED_MODELS = [
+    NewsArticle, BlogCategory, JobPosting, Achievement, AchievementCategory,
+    ProjectPortfolio, CompanyMilestone,
+]
+
+
+def purge_page_cache_on_save(sender, instance, update_fields=None, **kwargs):
+    """Purge the public pages fed by a model when one of its rows changes"""
+    if update_fields and set(update_fields) <= NON_RENDERED_FIELDS:
+        return
+    invalidate_pages_for_model(sender)
+
+
+def purge_page_cache_on_delete(sender, instance, **kwargs):
+    """Purge the public pages fed by a model when one of its rows is deleted"""
+    invalidate_pages_for_model(sender)
+
+
+for model in PAGE_CACHED_MODELS:
+    post_save.connect(
+        purge_page_cache_on_save, sender=model,
+        dispatch_uid=f'purge_page_cache_on_save_{model._meta.model_name}'
+    )
+    post_delete.connect(
+        purge_page_cache_on_delete, sender=model,
+        dispatch_uid=f'purge_page_cache_on_delete_{model._meta.model_name}'
+    )
+
+
+STATS_MODELS = [
+    User, ContactSubmission, Subscriber, Newsletter, NewsArticle, JobPosting,
+    JobApplication, Achievement, ProjectPortfolio,
+]
+
+
+def purge_stats_on_change(sender, instance, update_fields=None, **kwargs):
+    """Drop cached dashboard counters when a counted table changes"""
+    if update_fields and set(update_fields) <= NON_RENDERED_FIELDS:
+        return
+    invalidate_stats_for_model(sender)
+
+
+for model in STATS_MODELS:
+    post_save.connect(
+        purge_stats_on_change, sender=model,
+        dispatch_uid=f'purge_stats_on_save_{model._meta.model_name}'
+    )
+    post_delete.connect(
+        purge_stats_on_change, sender=model,
+        dispatch_uid=f'purge_stats_on_delete_{model._meta.model_name}'
+    )
+
+
+def broadcast_new_row(sender, instance, created=False, raw=False, **kwargs):
+    """Push new contacts, applications and subscribers to open staff dashboards"""
+    if created and not raw:
+        broadcast_created(instance)
+
+
+for model in EVENT_BUILDERS:
+    post_save.connect(
+        broadcast_new_row, sender=model,
+        dispatch_uid=f'broadcast_new_row_{model._meta.model_name}'
+    )
+
+
+def remove_article_from_search_index(sender, instance, **kwargs):
+    """Drop a deleted article from the full-text search index"""
+    unindex_article(instance.pk)
+
+
+post_delete.connect(
+    remove_article_from_search_index, sender=NewsArticle,
+    dispatch_uid='remove_article_from_search_index'
+)
+
+
+def remember_image_names(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Note the images a row had before this save, to spot replaced uploads"""
+    if raw or instance.pk is None or (update_fields and set(update_fields) <= NON_RENDERED_FIELDS):
+        return
+    previous = sender.objects.filter(pk=instance.pk).first()
+    instance._previous_image_names = get_image_names(previous) if previous else []
+
+
+def queue_image_renditions(sender, instance, update_fields=None, **kwargs):
+    """Have the task worker resize newly uploaded images"""
+    if update_fields and set(update_fields) <= NON_RENDERED_FIELDS:
+        return
+    current = get_image_names(instance)
+    replaced = set(getattr(instance, '_previous_image_names', [])) - set(current)
+    instance._previous_image_names = current
+    if replaced:
+        transaction.on_commit(lambda: delete_renditions(replaced))
+    names = [name for name in current if not has_renditions(name)]
+    if names:
+        enqueue(tasks.generate_image_renditions, model_label=sender._meta.label, source_names=names)
+
+
+def delete_image_renditions(sender, instance, **kwargs):
+    """Remove the renditions of a deleted row's images"""
+    names = get_image_names(instance)
+    if names:
+        transaction.on_commit(lambda: delete_renditions(names))
+
+
+for model in IMAGE_FIELDS:
+    pre_save.connect(
+        remember_image_names, sender=model,
+        dispatch_uid=f'remember_image_names_{model._meta.model_name}'
+    )
+    post_save.connect(
+        queue_image_renditions, sender=model,
+        dispatch_uid=f'queue_image_renditions_{model._meta.model_name}'
+    )
+    post_delete.connect(
+        delete_image_renditions, sender=model,
+        dispatch_uid=f'delete_image_renditions_{model._meta.model_name}'
+    )
@@ -71,10 +71,12 @@ function initializeCounters() {
 // =====================================
 function initializeFiltering() {
     const filterButtons = document.querySelectorAll('.filter-btn');
-    const cards = document.querySelectorAll('[data-category]');
     
     filterButtons.forEach(button => {
         button.addEventListener('click', () => {
+            // Looked up on each click to include cards added by Load More
+            const cards = document.querySelectorAll('[data-category]');
+            
             // Update active button
             filterButtons.forEach(btn => btn.classList.remove('active'));
             button.classList.add('active');
@@ -398,38 +400,80 @@ function openPortfolioModal(projectId) {
 // =====================================
 function initializeLoadMore() {
     const loadMoreBtn = document.getElementById('loadMoreBtn');
-    if (!loadMoreBtn) return;
+    const grid = document.getElementById('achievementsGrid');
+    if (!loadMoreBtn || !grid) return;
     
-    let currentPage = 1;
     const itemsPerPage = 12;
+    const data = window.achievementsData || {};
+    // Cursor of the next page of each feed, null once it is exhausted
+    const next = data.next || {};
+    let loading = false;
+    
+    const hasMoreOnServer = () => Object.values(next).some(Boolean);
+    const updateButton = () => {
+        const hidden = document.querySelectorAll('.hidden-item').length;
+        loadMoreBtn.style.display = hidden > 0 || hasMoreOnServer() ? 'inline-flex' : 'none';
+    };
     
     // Hide items beyond first page initially
     const allCards = document.querySelectorAll('[data-category]');
-    if (allCards.length > itemsPerPage) {
-        Array.from(allCards).slice(itemsPerPage).forEach(card => {
-            card.style.display = 'none';
-            card.classList.add('hidden-item');
+    Array.from(allCards).slice(itemsPerPage).forEach(card => {
+        card.style.display = 'none';
+        card.classList.add('hidden-item');
+    });
+    updateButton();
+    
+    // Fetch the next page of every feed that has one; the cards arrive hidden
+    async function fetchNextPages() {
+        const feeds = Object.keys(next).filter(feed => next[feed]);
+        const payloads = await Promise.all(feeds.map(feed => {
+            const url = window.achievementsFeedUrl.replace('FEED', feed) + '?cursor=' + encodeURIComponent(next[feed]);
+            return fetch(url, { headers: { 'Accept': 'application/json' } })
+                .then(response => response.ok ? response.json() : null)
+                .catch(() => null);
+        }));
+        
+        payloads.forEach((payload, index) => {
+            const feed = feeds[index];
+            if (!payload || !payload.success) {
+                next[feed] = null;
+                return;
+            }
+            next[feed] = payload.next;
+            // Keep the modal data in step with the cards
+            data[feed] = (data[feed] || []).concat(payload.results);
+            
+            const template = document.createElement('template');
+            template.innerHTML = payload.html;
+            Array.from(template.content.children).forEach(card => {
+                card.style.display = 'none';
+                card.classList.add('hidden-item');
+                grid.appendChild(card);
+            });
         });
-        loadMoreBtn.style.display = 'inline-flex';
     }
     
-    loadMoreBtn.addEventListener('click', () => {
-        const hiddenCards = document.querySelectorAll('.hidden-item');
-        const cardsToShow = Array.from(hiddenCards).slice(0, itemsPerPage);
+    loadMoreBtn.addEventListener('click', async () => {
+        if (loading) return;
+        loading = true;
         
-        cardsToShow.forEach((card, index) => {
-            setTimeout(() => {
-                card.style.display = 'block';
+        try {
+            if (document.querySelectorAll('.hidden-item').length < itemsPerPage && hasMoreOnServer()) {
+                await fetchNextPages();
+            }
+            
+            const cardsToShow = Array.from(document.querySelectorAll('.hidden-item')).slice(0, itemsPerPage);
+            cardsToShow.forEach((card, index) => {
                 card.classList.remove('hidden-item');
-                card.style.animation = 'fadeInUp 0.5s ease-out';
-            }, index * 100);
-        });
-        
-        if (hiddenCards.length <= itemsPerPage) {
-            loadMoreBtn.style.display = 'none';
+                setTimeout(() => {
+                    card.style.display = 'block';
+                    card.style.animation = 'fadeInUp 0.5s ease-out';
+                }, index * 100);
+            });
+        } finally {
+            loading = false;
+            updateButton();
         }
-        
-        currentPage++;
     });
 }
 
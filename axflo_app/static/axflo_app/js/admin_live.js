@@ -0,0 +1,134 @@
+/* ================================
+   ADMIN LIVE UPDATES
+   Keeps dashboard counters and recent-activity lists current over a websocket
+   (see axflo_app/realtime.py for the event format)
+   ================================ */
+
+(function () {
+    const SOCKET_PATH = '/ws/admin/dashboard/';
+    const MAX_RETRY_DELAY = 30000;
+    const MAX_FEED_ITEMS = 5;
+    // Reconnects in a row that may fail before the page stops trying
+    const MAX_FAILED_CONNECTS = 5;
+
+    let retryDelay = 1000;
+    let everOpened = false;
+    let failedConnects = 0;
+
+    // ================================
+    // COUNTERS
+    // ================================
+
+    function applyDeltas(deltas) {
+        Object.entries(deltas).forEach(([name, delta]) => {
+            document.querySelectorAll(`[data-live-counter="${name}"]`).forEach(element => {
+                const current = parseInt(element.textContent.replace(/[^\d-]/g, ''), 10) || 0;
+                element.textContent = current + delta;
+                element.classList.remove('live-updated');
+                void element.offsetWidth;  // restart the highlight animation
+                element.classList.add('live-updated');
+            });
+        });
+    }
+
+    // ================================
+    // RECENT ACTIVITY FEEDS
+    // ================================
+
+    function buildFeedItem(row) {
+        const item = document.createElement('div');
+        item.style.cssText = 'display: flex; justify-content: space-between; align-items: center; '
+            + 'padding: 0.75rem 0; border-bottom: 1px solid rgba(255,255,255,0.1);';
+
+        const summary = document.createElement('div');
+        const title = document.createElement('a');
+        title.href = row.url;
+        title.style.color = 'var(--text-primary)';
+        title.style.fontWeight = 'bold';
+        title.textContent = row.title;
+        summary.appendChild(title);
+        if (row.subtitle) {
+            const subtitle = document.createElement('span');
+            subtitle.style.cssText = 'color: var(--text-secondary); margin-left: 0.5rem;';
+            subtitle.textContent = `- ${row.subtitle}`;
+            summary.appendChild(subtitle);
+        }
+
+        const meta = document.createElement('div');
+        meta.style.textAlign = 'right';
+        const date = document.createElement('div');
+        date.style.cssText = 'color: var(--text-tertiary); font-size: 0.85rem;';
+        date.textContent = row.date;
+        const badge = document.createElement('span');
+        badge.className = `status-badge ${row.status}`;
+        badge.style.cssText = 'font-size: 0.75rem; padding: 0.2rem 0.5rem;';
+        badge.textContent = row.status_label;
+        meta.append(date, badge);
+
+        item.append(summary, meta);
+        return item;
+    }
+
+    function prependRow(model, row) {
+        document.querySelectorAll(`[data-live-feed="${model}"]`).forEach(feed => {
+            feed.prepend(buildFeedItem(row));
+            while (feed.children.length > MAX_FEED_ITEMS) {
+                feed.lastElementChild.remove();
+            }
+        });
+    }
+
+    // Pages that list rows in a table show a notice instead of inserting rows
+    function showNotice(model) {
+        document.querySelectorAll(`[data-live-notice="${model}"]`).forEach(notice => {
+            const count = (parseInt(notice.dataset.count, 10) || 0) + 1;
+            notice.dataset.count = count;
+            notice.querySelector('[data-live-notice-count]').textContent = count;
+            notice.style.display = '';
+        });
+    }
+
+    // ================================
+    // CONNECTION
+    // ================================
+
+    function connect() {
+        const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        const socket = new WebSocket(`${scheme}://${window.location.host}${SOCKET_PATH}`);
+
+        let opened = false;
+        socket.addEventListener('open', () => {
+            opened = everOpened = true;
+            failedConnects = 0;
+            retryDelay = 1000;
+        });
+
+        socket.addEventListener('message', message => {
+            const event = JSON.parse(message.data);
+            applyDeltas(event.deltas || {});
+            if (event.row) {
+                prependRow(event.model, event.row);
+                showNotice(event.model);
+            }
+        });
+
+        // Reconnect with backoff; a closed socket just leaves the page static.
+        // A first handshake that fails means the server rejects the socket
+        // (or has no such route), so the page does not retry at all.
+        socket.addEventListener('close', () => {
+            if (!opened) {
+                failedConnects += 1;
+                if (!everOpened || failedConnects >= MAX_FAILED_CONNECTS) {
+                    return;
+                }
+            }
+            setTimeout(connect, retryDelay);
+            retryDelay = Math.min(retryDelay * 2, MAX_RETRY_DELAY);
+        });
+    }
+
+    // Templates only include this script in ASGI_MODE, where the socket exists
+    if ('WebSocket' in window) {
+        connect();
+    }
+})();
@@ -0,0 +1,192 @@
+"""
+Optimisation of the JPEG/PNG images shipped in the static tree.
+
+optimize_static_images() recompresses each image (JPEGs re-encoded at
+STATIC_IMAGE_QUALITY, PNGs losslessly), caps its width at
+STATIC_IMAGE_MAX_WIDTH and emits resized variants at STATIC_IMAGE_WIDTHS
+plus WebP/AVIF siblings of each (where they are smaller), e.g. for
+``images/plan1.jpg``:
+
+    images/plan1.jpg  images/plan1.webp  images/plan1.avif
+    images/plan1-640w.jpg  images/plan1-640w.webp  images/plan1-640w.avif ...
+
+Results are cached under STATIC_IMAGE_CACHE_DIR by a hash of the source
+bytes and the settings, so only new or changed images are encoded again.
+The collectstatic hook lives in storage.py; the optimize_static command
+warms the cache and reports the bytes saved.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+IMAGE_EXTENSIONS = {'.jpg': 'jpeg', '.jpeg': 'jpeg', '.png': 'png'}
+
+# Bump to re-encode everything after changing how images are processed
+OPTIMIZER_VERSION = 1
+
+
+def get_options():
+    return {
+        'version': OPTIMIZER_VERSION,
+        'quality': getattr(settings, 'STATIC_IMAGE_QUALITY', 85),
+        'max_width': getattr(settings, 'STATIC_IMAGE_MAX_WIDTH', 2560),
+        'widths': sorted(getattr(settings, 'STATIC_IMAGE_WIDTHS', [640, 1280])),
+        'formats': list(getattr(settings, 'STATIC_IMAGE_FORMATS', ['webp', 'avif'])),
+    }
+
+
+def get_cache_dir():
+    return getattr(settings, 'STATIC_IMAGE_CACHE_DIR', os.path.join(settings.BASE_DIR, '.cache', 'static-images'))
+
+
+def is_optimizable(name):
+    return os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+def _encode(image, fmt, options):
+    buffer = BytesIO()
+    icc_profile = image.info.get('icc_profile')
+    if fmt == 'jpeg':
+        image.save(buffer, 'JPEG', quality=options['quality'], optimize=True,
+                   progressive=True, icc_profile=icc_profile)
+    elif fmt == 'png':
+        image.save(buffer, 'PNG', optimize=True, icc_profile=icc_profile)
+    elif fmt == 'webp':
+        image.save(buffer, 'WEBP', quality=options['quality'] - 5, method=6, icc_profile=icc_profile)
+    elif fmt == 'avif':
+        image.save(buffer, 'AVIF', quality=options['quality'] - 25, speed=6, icc_profile=icc_profile)
+    return buffer.getvalue()
+
+
+def _prepare(image, source_format):
+    """Apply EXIF rotation and drop alpha channels that are fully opaque"""
+    image = ImageOps.exif_transpose(image)
+    if image.mode == 'P':
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    if image.mode in ('RGBA', 'LA') and image.getchannel('A').getextrema()[0] == 255:
+        image = image.convert('RGB' if image.mode == 'RGBA' else 'L')
+    if source_format == 'jpeg' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    if image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        image = image.convert('RGBA')
+    return image
+
+
+def _resize(image, width):
+    if image.width <= width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def _variant_name(name, suffix):
+    stem, extension = os.path.splitext(name)
+    return f'{stem}{suffix}' if '.' in suffix else f'{stem}{suffix}{extension}'
+
+
+def _encode_all(data, source_format, options):
+    """Return {suffix: bytes} for the optimised original and every variant"""
+    with Image.open(BytesIO(data)) as original:
+        original.load()
+        image = _prepare(original, source_format)
+    main = _resize(image, options['max_width'])
+
+    encoded = {}
+    optimized = _encode(main, source_format, options)
+    # Never replace an original with something larger (already well compressed)
+    encoded[''] = optimized if len(optimized) < len(data) else data
+    variants = [('', main)] + [
+        (f'-{width}w', _resize(main, width)) for width in options['widths'] if width < main.width
+    ]
+    for suffix, image in variants:
+        if suffix not in encoded:
+            encoded[suffix] = _encode(image, source_format, options)
+        for fmt in options['formats']:
+            content = _encode(image, fmt, options)
+            # A sibling only earns its place by being smaller
+            if len(content) < len(encoded[suffix]):
+                encoded[f'{suffix}.{fmt}'] = content
+    return encoded
+
+
+def optimize_image(name, data, options=None):
+    """
+    Optimise one image given its static path and bytes.
+
+    Returns ``{'name', 'original_size', 'cached', 'files': {path: cache file}}``
+    where ``files`` maps every output static path (the optimised original
+    included) to the cached file holding its bytes.
+    """
+    options = options or get_options()
+    source_format = IMAGE_EXTENSIONS[os.path.splitext(name)[1].lower()]
+    digest = hashlib.sha256(data)
+    digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+    key = digest.hexdigest()
+    entry_dir = os.path.join(get_cache_dir(), key[:2], key)
+    index_path = os.path.join(entry_dir, 'index.json')
+
+    cached = os.path.exists(index_path)
+    if cached:
+        with open(index_path) as f:
+            suffixes = json.load(f)
+    else:
+        encoded = _encode_all(data, source_format, options)
+        tmp_dir = f'{entry_dir}.tmp{os.getpid()}-{threading.get_ident()}'
+        os.makedirs(tmp_dir, exist_ok=True)
+        suffixes = {}
+        for i, (suffix, content) in enumerate(sorted(encoded.items())):
+            filename = f'{i}.bin'
+            with open(os.path.join(tmp_dir, filename), 'wb') as f:
+                f.write(content)
+            suffixes[suffix] = filename
+        with open(os.path.join(tmp_dir, 'index.json'), 'w') as f:
+            json.dump(suffixes, f)
+        # Entries appear atomically, so an interrupted run never leaves half of one
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return {
+        'name': name,
+        'original_size': len(data),
+        'cached': cached,
+        'files': {
+            _variant_name(name, suffix): os.path.join(entry_dir, filename)
+            for suffix, filename in suffixes.items()
+        },
+    }
+
+
+def optimize_static_images(sources, jobs=None):
+    """
+    Optimise ``sources``, an iterable of (static path, readable storage,
+    storage path), in parallel. Returns a list of optimize_image() results;
+    files Pillow cannot read are left out.
+    """
+    options = get_options()
+    jobs = jobs or min(8, os.cpu_count() or 1)
+
+    def run(source):
+        name, storage, path = source
+        with storage.open(path) as f:
+            data = f.read()
+        try:
+            return optimize_image(name, data, options)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return None
+
+    images = [source for source in sources if is_optimizable(source[0])]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return [result for result in executor.map(run, images) if result]
+
+
+def output_size(result, name):
+    return os.path.getsize(result['files'][name])
@@ -0,0 +1,172 @@
+"""
+Dashboard statistics for the staff area.
+
+Every table's counters are computed with a single conditional-aggregation
+query and cached for a short time. Writes to a table drop its cached entry
+(see signals.py) so the dashboard never lags behind staff edits.
+
+The environmental impact total on the achievements page works the same way,
+summing the co2 columns that Achievement and ProjectPortfolio keep in step
+with their JSON metrics on save. Bulk queryset.update() calls send no
+signals, so they must call invalidate_stats_for_model() themselves; the
+timeout bounds how stale a missed one can get.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from .models import (
+    ContactSubmission, Subscriber, Newsletter, NewsArticle, JobPosting,
+    JobApplication, Achievement, ProjectPortfolio, metric_total
+)
+
+STATS_CACHE_PREFIX = 'stats'
+
+
+def _count(**filters):
+    return Count('id', filter=Q(**filters))
+
+
+# name -> (model, aggregates); each entry is answered by one query
+STATS_DEFINITIONS = {
+    'users': (User, {
+        'total': Count('id'),
+        'staff': _count(is_staff=True),
+        'superusers': _count(is_superuser=True),
+    }),
+    'contacts': (ContactSubmission, {
+        'total': Count('id'),
+        'unread': _count(read=False),
+    }),
+    'subscribers': (Subscriber, {
+        'total': Count('id'),
+        'active': _count(active_status=True),
+        'inactive': _count(active_status=False),
+    }),
+    'newsletters': (Newsletter, {
+        'total': Count('id'),
+        'sent': _count(sent=True),
+        'draft': _count(sent=False),
+    }),
+    'articles': (NewsArticle, {
+        'total': Count('id'),
+        'published': _count(status='PUBLISHED'),
+        'draft': _count(status='DRAFT'),
+    }),
+    'jobs': (JobPosting, {
+        'total': Count('id'),
+        'active': _count(status='ACTIVE'),
+        'inactive': _count(status='INACTIVE'),
+    }),
+    'applications': (JobApplication, {
+        'total': Count('id'),
+        'new': _count(status='SUBMITTED'),
+    }),
+    'achievements': (Achievement, {
+        'total': Count('id'),
+        'featured': _count(featured=True),
+        'awards': _count(achievement_type='AWARD'),
+        'certifications': _count(achievement_type='CERTIFICATION'),
+    }),
+}
+
+# Model label -> stats entries it feeds
+MODEL_STATS = {}
+for _name, (_model, _aggregates) in STATS_DEFINITIONS.items():
+    MODEL_STATS.setdefault(_model._meta.label_lower, []).append(_name)
+
+
+def get_stats_cache_timeout():
+    return getattr(settings, 'STATS_CACHE_TIMEOUT', 60)
+
+
+def _stats_key(name):
+    return f'{STATS_CACHE_PREFIX}:{name}'
+
+
+def get_stats(*names):
+    """
+    Return the counters for the named tables, e.g. ``get_stats('contacts')``
+    returns ``{'contacts': {'total': 10, 'unread': 3}}``.
+    """
+    cached = cache.get_many([_stats_key(name) for name in names])
+    stats = {}
+    for name in names:
+        values = cached.get(_stats_key(name))
+        if values is None:
+            model, aggregates = STATS_DEFINITIONS[name]
+            # Aliased so counter names may shadow model fields (e.g. 'sent')
+            row = model.objects.aggregate(
+                **{f'stat_{key}': aggregate for key, aggregate in aggregates.items()}
+            )
+            values = {key: row[f'stat_{key}'] for key in aggregates}
+            cache.set(_stats_key(name), values, get_stats_cache_timeout())
+        stats[name] = values
+    return stats
+
+
+def invalidate_stats_for_model(model):
+    """Drop cached counters fed by the given model class or instance"""
+    keys = [_stats_key(name) for name in MODEL_STATS.get(model._meta.label_lower, [])]
+    if model._meta.label_lower in IMPACT_MODELS:
+        keys.append(_stats_key('environmental_impact'))
+    if keys:
+        cache.delete_many(keys)
+
+
+# ================================
+# ENVIRONMENTAL IMPACT
+# ================================
+
+# Model label -> (JSON field, metric key, denormalised column)
+IMPACT_COLUMNS = {
+    'axflo_app.achievement': ('impact_metrics', 'co2_reduced', 'co2_reduced'),
+    'axflo_app.projectportfolio': ('environmental_impact', 'co2_prevented', 'co2_prevented'),
+}
+IMPACT_MODELS = set(IMPACT_COLUMNS)
+
+
+def get_environmental_impact():
+    """
+    Tonnes of CO2 reduced by active achievements plus prevented by published
+    portfolio projects: two SUMs over plain numeric columns, cached like the
+    dashboard counters.
+    """
+    key = _stats_key('environmental_impact')
+    total = cache.get(key)
+    if total is None:
+        achievements = Achievement.objects.filter(status='ACTIVE').aggregate(total=Sum('co2_reduced'))
+        projects = ProjectPortfolio.objects.filter(
+            status__in=['FEATURED', 'STANDARD']
+        ).aggregate(total=Sum('co2_prevented'))
+        total = (achievements['total'] or 0) + (projects['total'] or 0)
+        cache.set(key, total, get_stats_cache_timeout())
+    return total
+
+
+def rebuild_impact_columns(model, batch_size=500):
+    """
+    Recompute a model's denormalised co2 column from its JSON metrics, for
+    rows written without save() (e.g. queryset.update()). Works with the
+    historical models of a migration too. Returns the number of rows fixed.
+    """
+    source, metric, column = IMPACT_COLUMNS[model._meta.label_lower]
+    changed = []
+    fixed = 0
+    for pk, metrics, current in model.objects.values_list('pk', source, column).iterator(chunk_size=batch_size):
+        value = metric_total(metrics, metric)
+        if value != current:
+            changed.append(model(pk=pk, **{column: value}))
+        if len(changed) >= batch_size:
+            model.objects.bulk_update(changed, [column])
+            fixed += len(changed)
+            changed = []
+    if changed:
+        model.objects.bulk_update(changed, [column])
+        fixed += len(changed)
+    return fixed
+
+
+def invalidate_environmental_impact():
+    cache.delete(_stats_key('environmental_impact'))
@@ -0,0 +1,184 @@
+"""
+Static files storage for collectstatic.
+
+OptimizedImagesMixin hooks the static image optimiser (static_images.py)
+into collectstatic's post-processing step: every collected JPEG/PNG is
+replaced by its optimised version and its WebP/AVIF siblings and resized
+variants are written next to it. AssetBundlesMixin likewise writes the
+per-page CSS/JS bundles and critical CSS (bundles.py). Manifest hashing and
+compression run after both, so they see the optimised files and bundles.
+
+PrecompressedManifestStaticFilesStorage extends WhiteNoise's storage to
+write Brotli, gzip and (with the zstandard package) zstd variants of every
+hashed file at maximum compression, spread over all CPU cores. The
+matching middleware (middleware.py) serves the smallest encoding the
+client accepts.
+"""
+import filecmp
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from whitenoise.compress import Compressor
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from .bundles import build_bundles
+from .static_images import optimize_static_images
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Suffix of each precompressed variant, by Content-Encoding
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+class AssetBundlesMixin:
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            def read(name):
+                storage, path = paths[name]
+                with storage.open(path) as f:
+                    return f.read().decode('utf-8')
+
+            for name, content in build_bundles(read).items():
+                content = content.encode('utf-8')
+                if self.exists(name):
+                    with self.open(name) as f:
+                        unchanged = f.read() == content
+                    if unchanged:
+                        paths[name] = (self, name)
+                        continue
+                    self.delete(name)
+                self.save(name, ContentFile(content))
+                paths[name] = (self, name)
+
+        parent = getattr(super(), 'post_process', None)
+        if parent is not None:
+            yield from parent(paths, dry_run=dry_run, **options)
+
+
+class PrecompressingCompressor(Compressor):
+    """WhiteNoise's compressor with zstd added and every codec at its highest level"""
+
+    SKIP_COMPRESS_EXTENSIONS = Compressor.SKIP_COMPRESS_EXTENSIONS + ('avif', 'zst', 'pdf')
+
+    def __init__(self, extensions=None, use_zstd=True, **kwargs):
+        super().__init__(extensions=extensions or self.SKIP_COMPRESS_EXTENSIONS, **kwargs)
+        self.use_brotli = self.use_brotli and brotli is not None
+        self.use_zstd = use_zstd and zstandard is not None
+
+    def compress(self, path):
+        with open(path, 'rb') as f:
+            stat_result = os.fstat(f.fileno())
+            data = f.read()
+        codecs = [('gzip', self.use_gzip), ('br', self.use_brotli), ('zstd', self.use_zstd)]
+
+        filenames = []
+        for encoding, enabled in codecs:
+            if not enabled:
+                continue
+            compressed = self.compress_data(encoding, data)
+            if self.is_compressed_effectively(encoding, path, len(data), compressed):
+                filenames.append(self.write_data(path, compressed, ENCODING_SUFFIXES[encoding], stat_result))
+            elif encoding == 'gzip':
+                # Incompressible data: the other codecs won't do better
+                break
+        return filenames
+
+    @staticmethod
+    def compress_data(encoding, data):
+        if encoding == 'br':
+            return brotli.compress(data, quality=11, lgwin=24)
+        if encoding == 'zstd':
+            return zstandard.ZstdCompressor(level=22).compress(data)
+        output = BytesIO()
+        with gzip.GzipFile(filename='', mode='wb', fileobj=output, compresslevel=9, mtime=0) as gz_file:
+            gz_file.write(data)
+        return output.getvalue()
+
+
+def _compress_in_worker(full_path, use_zstd):
+    return PrecompressingCompressor(use_zstd=use_zstd, quiet=True).compress(full_path)
+
+
+class OptimizedImagesMixin:
+    def post_process(self, paths, dry_run=False, **options):
+        self.optimized_images = []
+        if not dry_run and getattr(settings, 'STATIC_IMAGE_OPTIMIZATION', True):
+            self.optimized_images = optimize_static_images(
+                (name, storage, path) for name, (storage, path) in paths.items()
+            )
+            for result in self.optimized_images:
+                for name, cache_path in result['files'].items():
+                    # A file of the same name in the source tree always wins
+                    if name != result['name'] and name in paths:
+                        continue
+                    self._store_optimized(name, cache_path)
+                    paths[name] = (self, name)
+
+        parent = getattr(super(), 'post_process', None)
+        if parent is not None:
+            yield from parent(paths, dry_run=dry_run, **options)
+
+    def _store_optimized(self, name, cache_path):
+        if self.exists(name):
+            if filecmp.cmp(self.path(name), cache_path, shallow=False):
+                return
+            self.delete(name)
+        with open(cache_path, 'rb') as f:
+            self.save(name, File(f))
+
+
+class PrecompressedManifestStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    Hashed file names (served with far-future immutable caching by WhiteNoise)
+    plus .br/.gz/.zst variants, compressed in one process per CPU core
+    """
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            if content is not None:
+                raise
+            # A stylesheet points at a file that doesn't exist; leave the
+            # reference as it is (it 404s either way) instead of failing
+            return name
+
+    def create_compressor(self, **kwargs):
+        return PrecompressingCompressor(use_zstd=self.use_zstd, **kwargs)
+
+    @property
+    def use_zstd(self):
+        return getattr(settings, 'STATIC_ZSTD', True)
+
+    def compress_files(self, paths):
+        self.compressor = self.create_compressor(
+            extensions=getattr(settings, 'WHITENOISE_SKIP_COMPRESS_EXTENSIONS', None), quiet=True
+        )
+        paths = [path for path in paths if self.compressor.should_compress(path)]
+        if not paths:
+            return
+        # Brotli at quality 11 is CPU bound, so use processes rather than threads
+        with ProcessPoolExecutor() as executor:
+            full_paths = [self.path(path) for path in paths]
+            results = executor.map(_compress_in_worker, full_paths, [self.use_zstd] * len(paths))
+            for path, full_path, compressed_paths in zip(paths, full_paths, results):
+                prefix_len = len(full_path) - len(path)
+                for compressed_path in compressed_paths:
+                    yield path, compressed_path[prefix_len:]
+
+
+class OptimizedStaticFilesStorage(AssetBundlesMixin, OptimizedImagesMixin, PrecompressedManifestStaticFilesStorage):
+    pass
@@ -0,0 +1,210 @@
+"""
+Bulk subscriber import.
+
+import_subscribers() reads a CSV of subscribers (an ``email`` column plus
+optional ``first_name``, ``last_name`` and ``interests``) in a single
+streaming pass. Emails are validated and lower-cased as they are read.
+Rows are then written in batches:
+
+- one ``email__in`` query per batch finds the addresses that already exist;
+- bulk_create(ignore_conflicts=True) inserts the new subscribers, so a
+  concurrent signup can never fail the import;
+- the subscriber/interest pairs go into the M2M through table in bulk.
+
+Interests are category names separated by ``;`` or ``|``, matched to
+SubscriptionCategory without regard to case. Unknown names are reported
+and skipped. Imported subscribers get no welcome email. Used by the
+import_subscribers command and the staff upload on the subscribers page.
+The upload is checked with check_import_file() and copied to storage
+(IMPORT_UPLOAD_DIR). The import itself runs in the task worker, because
+large files take longer than a request may.
+"""
+import codecs
+import csv
+import io
+import re
+import uuid
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from .models import Subscriber, SubscriptionCategory
+from .realtime import broadcast
+from .stats import invalidate_stats_for_model
+
+IMPORT_BATCH_SIZE = 5000
+# Storage directory for uploads waiting for the task worker
+IMPORT_UPLOAD_DIR = 'subscriber-imports'
+CHECK_CHUNK_SIZE = 1024 * 1024
+# Reported problems are capped so a bad file cannot flood the response
+MAX_REPORTED_ERRORS = 50
+
+INTEREST_SEPARATOR_RE = re.compile(r'[;|]')
+
+
+class SubscriberImportError(Exception):
+    """The file cannot be imported at all (e.g. it has no email column)"""
+
+
+def _normalize_header(name):
+    return (name or '').strip().lower().replace(' ', '_')
+
+
+def _read_header(reader):
+    reader.fieldnames = [_normalize_header(name) for name in (reader.fieldnames or [])]
+    if 'email' not in reader.fieldnames:
+        raise SubscriberImportError('The file needs a header row with an "email" column.')
+
+
+def check_import_file(file):
+    """
+    Check an upload (a binary file object) before anything is imported: all
+    of it must be UTF-8 and its header needs an email column. Raises
+    SubscriberImportError and leaves the file rewound.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    line_number = 1
+    try:
+        for chunk in iter(lambda: file.read(CHECK_CHUNK_SIZE), b''):
+            try:
+                decoder.decode(chunk)
+            except UnicodeDecodeError as e:
+                line_number += e.object[:e.start].count(b'\n')
+                raise
+            line_number += chunk.count(b'\n')
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        raise SubscriberImportError(f'Line {line_number} is not UTF-8 text; nothing was imported.')
+
+    file.seek(0)
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        _read_header(csv.DictReader(text))
+    finally:
+        text.detach()
+    file.seek(0)
+
+
+def _clean_rows(reader, categories, result):
+    """Yield (email, first_name, last_name, category ids) for each valid, new-to-this-file row"""
+    seen = set()
+    for line_number, row in enumerate(reader, start=2):
+        result['rows'] += 1
+        email = (row.get('email') or '').strip().lower()
+        try:
+            validate_email(email)
+        except ValidationError:
+            result['invalid'] += 1
+            if len(result['errors']) < MAX_REPORTED_ERRORS:
+                result['errors'].append(f'Line {line_number}: invalid email "{email[:100]}"')
+            continue
+        if email in seen:
+            result['duplicates'] += 1
+            continue
+        seen.add(email)
+
+        interest_ids = set()
+        for name in INTEREST_SEPARATOR_RE.split(row.get('interests') or ''):
+            name = name.strip()
+            if not name:
+                continue
+            category_id = categories.get(name.lower())
+            if category_id is None:
+                result['unknown_interests'].add(name)
+            else:
+                interest_ids.add(category_id)
+
+        yield (
+            email,
+            (row.get('first_name') or '').strip()[:100],
+            (row.get('last_name') or '').strip()[:100],
+            interest_ids,
+        )
+
+
+def _import_batch(batch, batch_size, result):
+    emails = [email for email, *_ in batch]
+    existing = set(Subscriber.objects.filter(email__in=emails).values_list('email', flat=True))
+    new_rows = [row for row in batch if row[0] not in existing]
+    result['existing'] += len(batch) - len(new_rows)
+    if not new_rows:
+        return
+
+    with transaction.atomic():
+        Subscriber.objects.bulk_create([
+            Subscriber(
+                email=email,
+                first_name=first_name,
+                last_name=last_name,
+                unsubscribe_token=str(uuid.uuid4()),
+            )
+            for email, first_name, last_name, _ in new_rows
+        ], batch_size=batch_size, ignore_conflicts=True)
+
+        # ignore_conflicts means no primary keys come back, so they are looked
+        # up for the rows that need interests
+        with_interests = {email: interest_ids for email, _, _, interest_ids in new_rows if interest_ids}
+        if with_interests:
+            ids = dict(Subscriber.objects.filter(email__in=list(with_interests)).values_list('email', 'id'))
+            through = Subscriber.interests.through
+            through.objects.bulk_create([
+                through(subscriber_id=ids[email], subscriptioncategory_id=category_id)
+                for email, interest_ids in with_interests.items() if email in ids
+                for category_id in interest_ids
+            ], batch_size=batch_size, ignore_conflicts=True)
+    result['created'] += len(new_rows)
+
+
+def import_subscribers(file, batch_size=IMPORT_BATCH_SIZE, heartbeat=None):
+    """
+    Import subscribers from ``file``, a text-mode file object holding CSV.
+
+    Returns a dict of counts: ``rows`` read, ``created``, ``existing``
+    (already subscribed), ``duplicates`` (repeated in the file) and
+    ``invalid``, plus ``errors`` (the first few problems, by line) and
+    ``unknown_interests``. Raises SubscriberImportError if the file has no
+    email column, or if it turns out not to be UTF-8 part way through; the
+    message then gives the counts of the batches already imported.
+    ``heartbeat`` is called after each batch.
+    """
+    reader = csv.DictReader(file)
+    _read_header(reader)
+
+    categories = {
+        name.lower(): category_id
+        for category_id, name in SubscriptionCategory.objects.values_list('id', 'name')
+    }
+    result = {
+        'rows': 0, 'created': 0, 'existing': 0, 'duplicates': 0, 'invalid': 0,
+        'errors': [], 'unknown_interests': set(),
+    }
+    rows = _clean_rows(reader, categories, result)
+    error = None
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            _import_batch(batch, batch_size, result)
+            if heartbeat is not None:
+                heartbeat()
+    except UnicodeDecodeError:
+        error = SubscriberImportError(
+            f'The file is not UTF-8 text after about {result["rows"]} rows; '
+            f'{result["created"]} subscribers from the rows before were imported.'
+        )
+
+    # bulk_create sends no post_save, so the dashboard counters are dropped
+    # and open dashboards told here
+    if result['created']:
+        invalidate_stats_for_model(Subscriber)
+        broadcast('subscribers', {
+            'subscribers.total': result['created'],
+            'subscribers.active': result['created'],
+        })
+    if error:
+        raise error
+    result['unknown_interests'] = sorted(result['unknown_interests'])
+    return result
@@ -0,0 +1,171 @@
+"""
+Database-backed background tasks.
+
+Functions decorated with @task are queued with enqueue() and run later by
+the run_worker command, which claims rows from the Task table with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of worker threads and
+processes can share the queue without a broker. A failing task is retried
+with exponential backoff until it runs out of attempts, then left in the
+DEAD state (the dead-letter queue) for staff to inspect and requeue.
+Long-running tasks call heartbeat() as they go, so their RUNNING lock is
+never mistaken for one left by a dead worker.
+"""
+import random
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+# Task name -> function, filled in by the @task decorator
+TASK_REGISTRY = {}
+
+# The task each worker thread is running
+_running = threading.local()
+
+
+class TaskLockLost(Exception):
+    """The running task's lock expired and another worker claimed the task"""
+
+
+def task(max_attempts=5):
+    """Register a function as a background task"""
+    def decorator(func):
+        func.task_name = f'{func.__module__}.{func.__name__}'
+        func.max_attempts = max_attempts
+        TASK_REGISTRY[func.task_name] = func
+        return func
+    return decorator
+
+
+def enqueue(func, delay=0, **kwargs):
+    """
+    Queue ``func(**kwargs)`` to run in a worker; kwargs must be JSON-serialisable.
+
+    With TASK_QUEUE_EAGER the task runs inline instead, and is only queued
+    (for a retry) if it fails.
+    """
+    if getattr(settings, 'TASK_QUEUE_EAGER', False) and not delay:
+        try:
+            func(**kwargs)
+            return None
+        except Exception as e:
+            queued = Task(name=func.task_name, kwargs=kwargs, max_attempts=func.max_attempts, attempts=1)
+            _schedule_retry(queued, e)
+            queued.save()
+            return queued
+
+    return Task.objects.create(
+        name=func.task_name,
+        kwargs=kwargs,
+        max_attempts=func.max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def _stale_tasks(now):
+    # RUNNING rows whose lock is older than TASK_LOCK_TIMEOUT belonged to a
+    # worker that died
+    stale = now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+    return Task.objects.filter(status='RUNNING', locked_at__lt=stale)
+
+
+def _claimable_tasks(now):
+    # A stale task counts as queued again while it has attempts left
+    stale = now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+    return Task.objects.filter(
+        Q(status='QUEUED', run_at__lte=now)
+        | Q(status='RUNNING', locked_at__lt=stale, attempts__lt=F('max_attempts'))
+    )
+
+
+def claim_tasks(limit=1):
+    """Mark up to ``limit`` runnable tasks as RUNNING for this worker and return them"""
+    now = timezone.now()
+    claimed = []
+    # A task that keeps killing its worker would otherwise be re-claimed forever
+    _stale_tasks(now).filter(attempts__gte=F('max_attempts')).update(
+        status='DEAD', finished_at=now, locked_at=None,
+        last_error='Worker lost while running the task; no attempts left',
+    )
+    with transaction.atomic():
+        candidates = list(
+            _claimable_tasks(now).order_by('run_at')
+            .select_for_update(skip_locked=True)
+            .values_list('pk', flat=True)[:limit]
+        )
+        # Conditional so a task is claimed once even without row locks (SQLite)
+        for pk in candidates:
+            if _claimable_tasks(now).filter(pk=pk).update(
+                status='RUNNING', locked_at=now, attempts=F('attempts') + 1
+            ):
+                claimed.append(pk)
+    return list(Task.objects.filter(pk__in=claimed).order_by('run_at'))
+
+
+def _schedule_retry(task_obj, error):
+    """Set up a failed task for its next attempt, or move it to the dead-letter state"""
+    now = timezone.now()
+    task_obj.last_error = ''.join(traceback.format_exception(error))
+    task_obj.locked_at = None
+    if task_obj.attempts >= task_obj.max_attempts:
+        task_obj.status = 'DEAD'
+        task_obj.finished_at = now
+    else:
+        delay = settings.TASK_RETRY_BACKOFF * 2 ** (task_obj.attempts - 1)
+        # Jitter keeps tasks that failed together from retrying together
+        delay += random.uniform(0, delay / 2)
+        task_obj.status = 'QUEUED'
+        task_obj.run_at = now + timedelta(seconds=delay)
+
+
+def heartbeat():
+    """
+    Renew the lock of the task running in this thread (a no-op outside the
+    worker). Raises TaskLockLost if another worker has taken the task over.
+    """
+    task_obj = getattr(_running, 'task', None)
+    if task_obj is None:
+        return
+    now = timezone.now()
+    renewed = Task.objects.filter(
+        pk=task_obj.pk, status='RUNNING', locked_at=task_obj.locked_at
+    ).update(locked_at=now)
+    if not renewed:
+        raise TaskLockLost(f'Task {task_obj.pk} was claimed by another worker')
+    task_obj.locked_at = now
+
+
+def run_task(task_obj):
+    """Run a claimed task and record the outcome; returns True on success"""
+    func = TASK_REGISTRY.get(task_obj.name)
+    _running.task = task_obj
+    try:
+        if func is None:
+            raise LookupError(f'Unknown task {task_obj.name}')
+        func(**task_obj.kwargs)
+    except TaskLockLost:
+        # The other worker owns the row now; leave its state alone
+        return False
+    except Exception as e:
+        _schedule_retry(task_obj, e)
+        task_obj.save(update_fields=['status', 'run_at', 'locked_at', 'last_error', 'finished_at'])
+        return False
+    finally:
+        _running.task = None
+
+    Task.objects.filter(pk=task_obj.pk).update(status='DONE', finished_at=timezone.now(), last_error='')
+    return True
+
+
+def requeue_dead_tasks(queryset=None):
+    """Give dead tasks a fresh set of attempts; returns the number requeued"""
+    queryset = Task.objects.all() if queryset is None else queryset
+    return queryset.filter(status='DEAD').update(
+        status='QUEUED', attempts=0, run_at=timezone.now(), finished_at=None, locked_at=None
+    )
@@ -0,0 +1,110 @@
+"""
+Background tasks queued by the public and staff views (see task_queue.py).
+
+Tasks take primary keys rather than objects and look the rows up again, so
+they see the committed state of the database when they run.
+"""
+import io
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.mail import send_mail
+from django.utils.dateparse import parse_datetime
+from django.template.loader import render_to_string
+
+from .models import ContactSubmission, JobApplication, Newsletter
+from .images import generate_renditions
+from .newsletter_delivery import ClaimLost, claim_newsletter, deliver_newsletter, release_claim, renew_claim
+from .page_cache import invalidate_pages_for_model
+from .subscriber_import import SubscriberImportError, import_subscribers
+from .task_queue import heartbeat, task
+
+logger = logging.getLogger(__name__)
+
+
+def _send_templated_mail(subject, template_name, context, recipients):
+    send_mail(
+        subject,
+        render_to_string(template_name, context),
+        settings.DEFAULT_FROM_EMAIL,
+        recipients,
+        fail_silently=False,
+    )
+
+
+@task()
+def notify_staff_of_contact(submission_id):
+    submission = ContactSubmission.objects.select_related('inquiry_type').get(id=submission_id)
+    _send_templated_mail(
+        f'New contact submission: {submission.inquiry_type.name}',
+        'axflo_app/emails/staff_contact_notification.txt',
+        {'submission': submission, 'site_url': settings.SITE_URL},
+        settings.STAFF_NOTIFICATION_EMAILS,
+    )
+
+
+@task()
+def notify_staff_of_application(application_id):
+    application = JobApplication.objects.select_related('job_posting').get(id=application_id)
+    _send_templated_mail(
+        f'New job application: {application.job_posting.title}',
+        'axflo_app/emails/staff_application_notification.txt',
+        {'application': application, 'site_url': settings.SITE_URL},
+        settings.STAFF_NOTIFICATION_EMAILS,
+    )
+
+
+@task(max_attempts=3)
+def send_newsletter(newsletter_id, claimed_at=None):
+    newsletter = Newsletter.objects.get(id=newsletter_id)
+    # The view claimed the newsletter when it queued the send; a retry
+    # claims it again
+    ours = claimed_at is not None and newsletter.delivery_started_at == parse_datetime(claimed_at)
+    if not ours and not claim_newsletter(newsletter):
+        logger.info('Newsletter %s is already sent or being sent; not sending it again', newsletter_id)
+        return
+
+    def keep_alive():
+        # Large rate-limited sends outlast TASK_LOCK_TIMEOUT and the claim
+        # timeout; renew both per batch
+        heartbeat()
+        renew_claim(newsletter)
+
+    try:
+        result = deliver_newsletter(newsletter, heartbeat=keep_alive)
+    except ClaimLost:
+        logger.warning('Newsletter %s was taken over by a scheduler', newsletter_id)
+        return
+    finally:
+        release_claim(newsletter)
+    if result['failed']:
+        # Retried with backoff; recipients already mailed are skipped
+        raise RuntimeError(f'{result["failed"]} messages could not be delivered')
+
+
+@task()
+def generate_image_renditions(model_label, source_names):
+    written = sum(generate_renditions(name) for name in source_names)
+    if written:
+        # Cached pages still point at the full-size originals
+        invalidate_pages_for_model(apps.get_model(model_label))
+
+
+@task(max_attempts=3)
+def import_subscriber_file(file_name):
+    """Import an uploaded subscriber CSV stored by admin_subscribers_import"""
+    try:
+        with default_storage.open(file_name, 'rb') as f:
+            # Re-running after a failure is safe: existing emails are skipped
+            result = import_subscribers(io.TextIOWrapper(f, encoding='utf-8-sig', newline=''), heartbeat=heartbeat)
+    except SubscriberImportError as e:
+        # Retrying would fail the same way
+        logger.warning('Subscriber import %s stopped: %s', file_name, e)
+    else:
+        logger.info(
+            'Subscriber import %s: %s of %s rows imported, %s already subscribed, %s repeated, %s invalid',
+            file_name, result['created'], result['rows'], result['existing'], result['duplicates'], result['invalid']
+        )
+    default_storage.delete(file_name)
@@ -0,0 +1,61 @@
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from axflo_app.bundles import BUNDLES, bundle_path
+
+register = template.Library()
+
+
+def bundles_enabled():
+    return getattr(settings, 'ASSET_BUNDLES_ENABLED', not settings.DEBUG)
+
+
+@lru_cache(maxsize=None)
+def _is_built(path):
+    # Bundles only change with a deploy, which restarts the process
+    return staticfiles_storage.exists(path)
+
+
+@lru_cache(maxsize=None)
+def _critical_css(name):
+    with staticfiles_storage.open(staticfiles_storage.stored_name(bundle_path(name, 'critical'))) as f:
+        return f.read().decode('utf-8')
+
+
+@register.simple_tag
+def bundle_css(name):
+    """
+    Stylesheets of a page bundle (see bundles.py), e.g. ``{% bundle_css 'index' %}``.
+    Pages with critical CSS get it inlined, and the full bundle is loaded
+    without blocking the first render.
+    """
+    spec = BUNDLES[name]
+    path = bundle_path(name, 'css')
+    if not bundles_enabled() or not _is_built(path):
+        return format_html_join('\n', '<link rel="stylesheet" href="{}">', ((static(p),) for p in spec['css']))
+
+    href = static(path)
+    if not spec['critical'] or not _is_built(bundle_path(name, 'critical')):
+        return format_html('<link rel="stylesheet" href="{}">', href)
+    return format_html(
+        '<style>{}</style>\n'
+        '<link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        '<noscript><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(_critical_css(name)), href, href
+    )
+
+
+@register.simple_tag
+def bundle_js(name):
+    """Scripts of a page bundle, e.g. ``{% bundle_js 'index' %}``"""
+    spec = BUNDLES[name]
+    path = bundle_path(name, 'js')
+    if not bundles_enabled() or not _is_built(path):
+        return format_html_join('\n', '<script src="{}"></script>', ((static(p),) for p in spec['js']))
+    return format_html('<script src="{}"></script>', static(path))
@@ -0,0 +1,22 @@
+from django import template
+from django.utils.html import format_html
+
+from axflo_app.images import render_picture
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(field_file, alt='', sizes='100vw', css_class='', loading='lazy', fallback_url=None):
+    """
+    Render an uploaded image as a <picture> with WebP/JPEG srcsets, e.g.
+    ``{% responsive_image article.image alt=article.title sizes="50vw" %}``.
+    ``fallback_url`` is used when the field is empty (e.g. NewsArticle.image_url).
+    """
+    if field_file:
+        return render_picture(field_file, alt=alt, sizes=sizes, css_class=css_class, loading=loading)
+    if fallback_url:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}">', fallback_url, alt, css_class, loading
+        )
+    return ''
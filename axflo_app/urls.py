@@ -1,16 +1,24 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'axflo_app'
 
+
+def public_view(sync_view, async_view):
+    """The read-only public pages are served by their async views in ASGI_MODE"""
+    return async_view if settings.ASGI_MODE else sync_view
+
+
 urlpatterns = [
-    path('', views.index, name='index'),
+    path('', public_view(views.index, views.index_async), name='index'),
     path('about/', views.about, name='about'),
     path('services/', views.services, name='services'),
-    path('media/', views.media, name='media'),
+    path('media/', public_view(views.media, views.media_async), name='media'),
     path('csr/', views.csr, name='csr'),
-    path('careers/', views.careers, name='careers'),
-    path('achievements/', views.achievements, name='achievements'),
+    path('careers/', public_view(views.careers, views.careers_async), name='careers'),
+    path('achievements/', public_view(views.achievements, views.achievements_async), name='achievements'),
+    path('achievements/feed/<str:feed>/', views.achievements_feed, name='achievements_feed'),
     
     # Test Pages
     path('test-cookies/', views.test_cookies, name='test_cookies'),
@@ -45,7 +53,9 @@ urlpatterns = [
     path('admin-register/', views.admin_register, name='admin_register'),
     path('admindashboard/', views.admindashboard, name='admindashboard'),
     path('admin-users/', views.admin_users, name='admin_users'),
+    path('admin-metrics/', views.admin_metrics, name='admin_metrics'),
     path('admin-contacts/', views.admin_contacts, name='admin_contacts'),
+    path('admin-contacts/export/', views.admin_contacts_export, name='admin_contacts_export'),
     path('admin-contact/<int:contact_id>/', views.admin_contact_detail, name='admin_contact_detail'),
     path('admin-contact/<int:contact_id>/toggle-read/', views.admin_contact_toggle_read, name='admin_contact_toggle_read'),
     path('admin-contact/<int:contact_id>/delete/', views.admin_contact_delete, name='admin_contact_delete'),
@@ -58,6 +68,8 @@ urlpatterns = [
     
     # Admin Newsletter Management URLs
     path('admin-subscribers/', views.admin_subscribers, name='admin_subscribers'),
+    path('admin-subscribers/export/', views.admin_subscribers_export, name='admin_subscribers_export'),
+    path('admin-subscribers/import/', views.admin_subscribers_import, name='admin_subscribers_import'),
     path('admin-newsletters/', views.admin_newsletters, name='admin_newsletters'),
     path('admin-newsletter-categories/', views.admin_newsletter_categories, name='admin_newsletter_categories'),
     path('admin-newsletter-create/', views.admin_newsletter_create, name='admin_newsletter_create'),
@@ -74,6 +86,7 @@ urlpatterns = [
     path('admin-career-edit/<int:job_id>/', views.admin_career_edit, name='admin_career_edit'),
     path('admin-career-delete/<int:job_id>/', views.admin_career_delete, name='admin_career_delete'),
     path('admin-applications/', views.admin_applications, name='admin_applications'),
+    path('admin-applications/export/', views.admin_applications_export, name='admin_applications_export'),
     path('admin-application-detail/<int:application_id>/', views.admin_application_detail, name='admin_application_detail'),
     path('admin-application-status/<int:application_id>/', views.admin_application_status, name='admin_application_status'),
     path('admin-application-delete/<int:application_id>/', views.admin_application_delete, name='admin_application_delete'),
@@ -86,7 +99,7 @@ urlpatterns = [
     path('admin-blog-categories/', views.admin_blog_categories, name='admin_blog_categories'),
     
     # Blog Detail Page
-    path('blog/<slug:slug>/', views.blog_detail, name='blog_detail'),
+    path('blog/<slug:slug>/', public_view(views.blog_detail, views.blog_detail_async), name='blog_detail'),
     
     # Achievements & Portfolio Management URLs
     path('admin-achievements/', views.admin_achievements, name='admin_achievements'),
@@ -0,0 +1,137 @@
+"""
+Buffered view counters.
+
+Page views are counted with an atomic cache increment instead of a row
+write, and flush_pending_views() later folds the buffered hits into the
+``view_count`` column with one ``UPDATE ... SET view_count = view_count + CASE``
+statement per batch, so popular rows never serialize on a row lock.
+
+A flush only visits rows viewed since the last one. When a counter goes
+from 0 to 1, record_view() appends the row to a dirty journal of numbered
+slots, and the flush reads and clears the slots it has not seen yet. Only
+one flush runs at a time. It takes the counts out of the buffer before
+the UPDATE, so a flush that dies halfway drops that batch's views instead
+of counting them twice.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+
+from .models import NewsArticle, Achievement, ProjectPortfolio
+
+VIEW_COUNT_PREFIX = 'views'
+# A flush that has not finished in this many seconds is presumed dead
+FLUSH_LOCK_TIMEOUT = 10 * 60
+# Placed in a journal slot the flush found empty, so a late writer moves on
+_SKIPPED_SLOT = 'skipped'
+
+# Models whose view_count column is fed by the buffer
+COUNTED_MODELS = [NewsArticle, Achievement, ProjectPortfolio]
+
+
+def _counter_key(model, pk):
+    return f'{VIEW_COUNT_PREFIX}:{model._meta.label_lower}:{pk}'
+
+
+def _journal_key(model, name):
+    return f'{VIEW_COUNT_PREFIX}:{model._meta.label_lower}:dirty:{name}'
+
+
+def _incr(key, delta=1):
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        if cache.add(key, delta, None):
+            return delta
+        return cache.incr(key, delta)
+
+
+def _mark_dirty(model, pk):
+    """Append a row to the model's dirty journal"""
+    while True:
+        slot = _incr(_journal_key(model, 'last'))
+        # add() fails if a flush has already given up on this slot
+        if cache.add(_journal_key(model, slot), pk, None):
+            return
+
+
+def record_view(model, pk):
+    """Count one view of a row without touching the database"""
+    if _incr(_counter_key(model, pk)) == 1:
+        # First view since the last flush
+        _mark_dirty(model, pk)
+
+
+def _take_dirty_pks(model):
+    """Return the rows marked since the last flush, and the slot to move the flush on to"""
+    flushed = cache.get(_journal_key(model, 'flushed'), 0)
+    last = cache.get(_journal_key(model, 'last'), 0)
+    if last < flushed:
+        # The journal counter was evicted and started again
+        flushed = 0
+    slots = [_journal_key(model, slot) for slot in range(flushed + 1, last + 1)]
+    found = cache.get_many(slots)
+    for slot in slots:
+        # A writer took this number but has not filled the slot yet
+        if slot not in found and not cache.add(slot, _SKIPPED_SLOT, None):
+            found[slot] = cache.get(slot)
+    pks = {pk for pk in found.values() if pk is not None and pk != _SKIPPED_SLOT}
+    return sorted(pks), slots, last
+
+
+def flush_pending_views(model, batch_size=500):
+    """
+    Move buffered views for one model into the database.
+
+    Returns the number of views written, or None if another flush is running.
+    """
+    lock_key = _journal_key(model, 'lock')
+    if not cache.add(lock_key, 1, FLUSH_LOCK_TIMEOUT):
+        return None
+    try:
+        pks, slots, last = _take_dirty_pks(model)
+        flushed = 0
+        for start in range(0, len(pks), batch_size):
+            flushed += _flush_batch(model, pks[start:start + batch_size])
+        cache.delete_many(slots)
+        cache.set(_journal_key(model, 'flushed'), last, None)
+        return flushed
+    finally:
+        cache.delete(lock_key)
+
+
+def _flush_batch(model, pks):
+    keys = {_counter_key(model, pk): pk for pk in pks}
+    pending = {keys[key]: count for key, count in cache.get_many(list(keys)).items() if count}
+    if not pending:
+        return 0
+
+    # Only the flushed amount leaves the buffer, before the database is
+    # written; hits that arrived meanwhile stay buffered for the next flush
+    for pk, count in pending.items():
+        if cache.decr(_counter_key(model, pk), count) > 0:
+            _mark_dirty(model, pk)
+
+    try:
+        with transaction.atomic():
+            model.objects.filter(pk__in=list(pending)).update(
+                view_count=F('view_count') + Case(
+                    *[When(pk=pk, then=Value(count)) for pk, count in pending.items()],
+                    default=Value(0),
+                )
+            )
+    except Exception:
+        # Put the views back for the next flush
+        for pk, count in pending.items():
+            if _incr(_counter_key(model, pk), count) == count:
+                _mark_dirty(model, pk)
+        raise
+    return sum(pending.values())
+
+
+def flush_all_pending_views(batch_size=500):
+    """Flush every counted model; returns {model label: views written}"""
+    return {
+        model._meta.label: flush_pending_views(model, batch_size=batch_size)
+        for model in COUNTED_MODELS
+    }
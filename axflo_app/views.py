@@ -1,4 +1,5 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib.auth import authenticate, login, logout, update_session_auth_hash
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib import messages
@@ -8,6 +9,8 @@ from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from asgiref.sync import sync_to_async
+import asyncio
 import uuid
 from .models import (
     ContactSubmission, InquiryCategory, Subscriber, SubscriptionCategory, Newsletter, 
@@ -17,45 +20,85 @@ from .models import (
 import json
 from django.core.serializers.json import DjangoJSONEncoder
 from django.core.paginator import Paginator
+from django.conf import settings
+from django.db.models import Count, Max, Prefetch, Q
+from django.core.cache import cache
 from django.utils import timezone
 from datetime import datetime
-
-def index(request):
-    # Get the latest 6 active job postings for the homepage
-    job_postings = JobPosting.objects.filter(status='ACTIVE').order_by('-posted_date')[:6]
-    
-    # Process requirements and animation delay for each job posting
+from .page_cache import cache_public_page, get_cached_fragment, invalidate_pages_for_model
+from .stats import get_stats, get_environmental_impact, invalidate_stats_for_model
+from .view_counts import record_view
+from .search import search_articles, highlight_snippet
+from .pagination import CursorPaginator
+from .exports import export_response
+from .subscriber_import import IMPORT_UPLOAD_DIR, SubscriberImportError, check_import_file
+from .newsletter_delivery import claim_newsletter, get_recipients, release_claim
+from .task_queue import enqueue
+from .images import image_sources
+from . import tasks
+
+# The read-only public pages (index, media, blog_detail, careers, achievements)
+# come in two versions sharing their queries and context: a sync view, and an
+# *_async view that urls.py serves instead in ASGI_MODE. Under ASGI the
+# independent queries are issued together with asyncio.gather and the worker
+# thread is free while they wait. Django runs each request's ORM calls on one
+# thread, so the gain is in concurrent requests rather than within one. Under
+# WSGI an async view only adds an event loop per request, so the sync version
+# is served there. Templates can still touch the ORM lazily, so the async
+# views render them in a thread.
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+async def _arender(request, template_name, context=None):
+    return await sync_to_async(render)(request, template_name, context)
+
+def _index_querysets():
+    # Latest 6 active job postings, the featured articles (the first is used)
+    # and the latest other articles (one extra in case there is no featured article)
+    return (
+        JobPosting.objects.filter(status='ACTIVE').order_by('-posted_date')[:6],
+        NewsArticle.objects.filter(status='PUBLISHED', featured=True).order_by('-published_at'),
+        NewsArticle.objects.filter(status='PUBLISHED').exclude(featured=True)
+        .select_related('category').order_by('-published_at')[:4],
+    )
+
+def _index_context(job_postings, featured_article, latest_articles):
+    # Animation delay for each job posting
     for index, job in enumerate(job_postings):
-        requirements_list = []
-        if job.requirements:
-            # Split requirements and clean up for display
-            raw_requirements = job.requirements.replace('\n', '|').replace(',', '|').replace(';', '|')
-            requirements_list = [req.strip() for req in raw_requirements.split('|') if req.strip()]
-            # Limit to first 4 requirements for homepage display
-            requirements_list = requirements_list[:4]
-        job.requirements_list = requirements_list
         job.animation_delay = index * 0.1  # For staggered animation
     
-    # Get the latest published news articles for the homepage
-    featured_article = NewsArticle.objects.filter(status='PUBLISHED', featured=True).order_by('-published_at').first()
-    news_articles = NewsArticle.objects.filter(status='PUBLISHED').exclude(featured=True).order_by('-published_at')[:3]
-    
     # If no featured article, use the latest article as featured
-    if not featured_article and news_articles.exists():
-        featured_article = news_articles.first()
-        news_articles = news_articles[1:4]  # Get next 3 articles
+    news_articles = latest_articles[:3]
+    if not featured_article and latest_articles:
+        featured_article = latest_articles[0]
+        news_articles = latest_articles[1:4]  # Get next 3 articles
     
-    context = {
+    return {
         'job_postings': job_postings,
-        'has_jobs': job_postings.exists(),
+        'has_jobs': bool(job_postings),
         'featured_article': featured_article,
         'news_articles': news_articles,
     }
+
+@cache_public_page('index')
+def index(request):
+    job_postings, featured_articles, latest_articles = _index_querysets()
+    context = _index_context(list(job_postings), featured_articles.first(), list(latest_articles))
     return render(request, 'axflo_app/index.html', context)
 
+@cache_public_page('index')
+async def index_async(request):
+    job_postings, featured_articles, latest_articles = _index_querysets()
+    context = _index_context(*await asyncio.gather(
+        _alist(job_postings), featured_articles.afirst(), _alist(latest_articles),
+    ))
+    return await _arender(request, 'axflo_app/index.html', context)
+
+@cache_public_page('static')
 def about(request):
     return render(request, 'axflo_app/about.html')
 
+@cache_public_page('static')
 def services(request):
     return render(request, 'axflo_app/services.html')
 
@@ -63,163 +106,191 @@ def test_cookies(request):
     """Test page for cookie consent functionality"""
     return render(request, 'axflo_app/test_cookies.html')
 
-def media(request):
-    """Public media/blog page with pagination"""
+# Validators for conditional GETs (see page_cache.get_page_validators); each
+# is one aggregate, computed once per page group version
+def _article_validators():
+    """Published articles feed media and blog_detail (article, related and recent posts)"""
+    return NewsArticle.objects.filter(status='PUBLISHED').aggregate(
+        latest=Max('updated_at'), count=Count('id')
+    )
+
+def _job_validators():
+    # posted_date does not move on edits; those bump the group's modified time instead
+    return JobPosting.objects.filter(status='ACTIVE').aggregate(
+        latest=Max('posted_date'), count=Count('id')
+    )
+
+def _achievement_validators():
+    state = Achievement.objects.filter(status='ACTIVE').aggregate(
+        latest=Max('updated_at'), count=Count('id')
+    )
+    projects = ProjectPortfolio.objects.filter(status__in=['FEATURED', 'STANDARD']).aggregate(
+        latest=Max('updated_at'), count=Count('id')
+    )
+    if projects['latest'] and (state['latest'] is None or projects['latest'] > state['latest']):
+        state['latest'] = projects['latest']
+    state['projects'] = projects['count']
+    state['milestones'] = CompanyMilestone.objects.count()
+    return state
+
+def _article_page(paginator, number):
+    page_obj = paginator.get_page(number)
+    page_obj.object_list = list(page_obj.object_list)
+    return page_obj
+
+def _media_querysets(request):
+    """Paginator over the published articles matching the request, and the sidebar querysets"""
     from django.core.paginator import Paginator
-    from django.db.models import Q
     
     # Get published articles only
-    articles = NewsArticle.objects.filter(status='PUBLISHED').order_by('-published_at')
+    articles = NewsArticle.objects.filter(status='PUBLISHED').select_related('category', 'author').order_by('-published_at')
     
-    # Search functionality
-    search_query = request.GET.get('search', '')
+    # Search functionality (full-text, ranked by relevance)
+    search_query = request.GET.get('search', '').strip()
     if search_query:
-        articles = articles.filter(
-            Q(title__icontains=search_query) |
-            Q(excerpt__icontains=search_query) |
-            Q(tags__icontains=search_query)
-        )
+        articles = search_articles(articles, search_query)
     
     # Category filter
     category_filter = request.GET.get('category', '')
     if category_filter:
         articles = articles.filter(category__slug=category_filter)
     
-    # Pagination - 5 posts per page as requested
-    paginator = Paginator(articles, 5)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    # Get categories for filter
-    categories = BlogCategory.objects.all()
+    # Pagination - 5 posts per page as requested; the page, the categories and
+    # the featured articles for the sidebar are independent queries
+    return (
+        Paginator(articles, 5),
+        BlogCategory.objects.annotate(article_count=Count('newsarticle')),
+        NewsArticle.objects.filter(status='PUBLISHED', featured=True).order_by('-published_at')[:3],
+    )
+
+def _media_context(request, paginator, page_obj, categories, featured_articles):
+    search_query = request.GET.get('search', '').strip()
     
-    # Get featured articles for sidebar
-    featured_articles = NewsArticle.objects.filter(
-        status='PUBLISHED', 
-        featured=True
-    ).order_by('-published_at')[:3]
+    # Highlight matched terms in the result snippets
+    if search_query:
+        for article in page_obj:
+            article.search_highlight = highlight_snippet(getattr(article, 'search_snippet', ''))
     
-    context = {
+    return {
         'articles': page_obj,
         'categories': categories,
         'featured_articles': featured_articles,
         'search_query': search_query,
-        'category_filter': category_filter,
-        'has_articles': articles.exists(),
+        'category_filter': request.GET.get('category', ''),
+        'has_articles': paginator.count > 0,
     }
-    
+
+@cache_public_page('media', validators=_article_validators)
+def media(request):
+    paginator, categories, featured_articles = _media_querysets(request)
+    page_obj = _article_page(paginator, request.GET.get('page'))
+    context = _media_context(request, paginator, page_obj, list(categories), list(featured_articles))
     return render(request, 'axflo_app/media.html', context)
 
+@cache_public_page('media', validators=_article_validators)
+async def media_async(request):
+    paginator, categories, featured_articles = _media_querysets(request)
+    context = _media_context(request, paginator, *await asyncio.gather(
+        sync_to_async(_article_page)(paginator, request.GET.get('page')),
+        _alist(categories),
+        _alist(featured_articles),
+    ))
+    return await _arender(request, 'axflo_app/media.html', context)
+
+def _count_cached_article_view(request, slug):
+    """Keep view counts moving when blog_detail is served from the page cache"""
+    article_id = cache.get(f'article_id:{slug}')
+    if article_id is None:
+        article_id = NewsArticle.objects.filter(slug=slug).values_list('id', flat=True).first()
+    if article_id is not None:
+        record_view(NewsArticle, article_id)
+
+def _count_article_view(slug, article_id):
+    # Count the view in the buffer; flush_view_counts writes it out
+    record_view(NewsArticle, article_id)
+    cache.set(f'article_id:{slug}', article_id, None)
+
+def _blog_article(slug):
+    return NewsArticle.objects.select_related('category', 'author').filter(slug=slug, status='PUBLISHED')
+
+def _blog_sidebar_querysets(article):
+    published = NewsArticle.objects.filter(status='PUBLISHED').exclude(id=article.id)
+    return (
+        # Related articles (same category, excluding current)
+        published.filter(category=article.category_id).select_related('category')[:3],
+        # Recent articles for sidebar
+        published.order_by('-published_at')[:5],
+        # All categories for sidebar
+        BlogCategory.objects.annotate(article_count=Count('newsarticle')),
+    )
+
+def _blog_context(article, related_articles, recent_articles, categories):
+    return {
+        'article': article,
+        'related_articles': related_articles,
+        'recent_articles': recent_articles,
+        'categories': categories,
+    }
+
+@cache_public_page('blog_detail', on_hit=_count_cached_article_view, validators=_article_validators)
 def blog_detail(request, slug):
     """Blog detail page view"""
-    try:
-        article = NewsArticle.objects.get(slug=slug, status='PUBLISHED')
-        
-        # Increment view count
-        article.view_count += 1
-        article.save(update_fields=['view_count'])
-        
-        # Get related articles (same category, excluding current)
-        related_articles = NewsArticle.objects.filter(
-            category=article.category,
-            status='PUBLISHED'
-        ).exclude(id=article.id)[:3]
-        
-        # Get recent articles for sidebar
-        recent_articles = NewsArticle.objects.filter(
-            status='PUBLISHED'
-        ).exclude(id=article.id).order_by('-published_at')[:5]
-        
-        # Get all categories for sidebar
-        categories = BlogCategory.objects.all()
-        
-        context = {
-            'article': article,
-            'related_articles': related_articles,
-            'recent_articles': recent_articles,
-            'categories': categories,
-        }
-        
-        return render(request, 'axflo_app/blog_detail.html', context)
-        
-    except NewsArticle.DoesNotExist:
-        from django.http import Http404
+    from django.http import Http404
+    
+    article = _blog_article(slug).first()
+    if article is None:
         raise Http404("Blog post not found")
+    
+    _count_article_view(slug, article.id)
+    context = _blog_context(article, *(list(queryset) for queryset in _blog_sidebar_querysets(article)))
+    return render(request, 'axflo_app/blog_detail.html', context)
 
+@cache_public_page('blog_detail', on_hit=_count_cached_article_view, validators=_article_validators)
+async def blog_detail_async(request, slug):
+    """Blog detail page view"""
+    from django.http import Http404
+    
+    article = await _blog_article(slug).afirst()
+    if article is None:
+        raise Http404("Blog post not found")
+    
+    _, *sidebar = await asyncio.gather(
+        sync_to_async(_count_article_view)(slug, article.id),
+        *(_alist(queryset) for queryset in _blog_sidebar_querysets(article)),
+    )
+    return await _arender(request, 'axflo_app/blog_detail.html', _blog_context(article, *sidebar))
+
+@cache_public_page('static')
 def csr(request):
     return render(request, 'axflo_app/csr.html')
 
-def careers(request):
-    # Get active job postings
+def _render_job_listing():
     job_postings = JobPosting.objects.filter(status='ACTIVE').order_by('-posted_date')
-    
-    # Process requirements for each job posting
-    for job in job_postings:
-        # Split requirements into a list for template display
-        requirements_list = []
-        if job.requirements:
-            # Split by common separators and clean up
-            raw_requirements = job.requirements.replace('\n', '|').replace(',', '|').replace(';', '|')
-            requirements_list = [req.strip() for req in raw_requirements.split('|') if req.strip()]
-            # Limit to first 4 requirements for display
-            requirements_list = requirements_list[:4]
-        job.requirements_list = requirements_list
-    
+    return render_to_string('axflo_app/includes/job_listing.html', {'job_postings': job_postings})
+
+# The listing is rendered once per change to the job postings and shared
+# by every visitor, including the ones the page cache skips
+@cache_public_page('careers', validators=_job_validators)
+def careers(request):
     context = {
-        'job_postings': job_postings,
-        'has_jobs': job_postings.exists()
+        'job_listing': get_cached_fragment('careers', 'job_listing', _render_job_listing),
     }
     return render(request, 'axflo_app/careers.html', context)
 
-def achievements(request):
-    """Achievements and Portfolio page with dynamic content"""
-    from django.db.models import Count, Q
-    
-    # Get featured achievements
-    featured_achievements = Achievement.objects.filter(
-        status='ACTIVE', 
-        featured=True
-    ).select_related('category').order_by('display_order', '-achievement_date')[:3]
-    
-    # Get all active achievements
-    achievements = Achievement.objects.filter(
-        status='ACTIVE'
-    ).select_related('category').order_by('-achievement_date', 'display_order')
-    
-    # Get portfolio projects
-    portfolio_projects = ProjectPortfolio.objects.filter(
-        status__in=['FEATURED', 'STANDARD']
-    ).order_by('-completion_date', 'display_order')
-    
-    # Get milestones
-    milestones = CompanyMilestone.objects.all().order_by('-milestone_date', 'display_order')
-    featured_milestones = milestones.filter(featured=True)[:5]
-    
-    # Calculate statistics
-    total_achievements = achievements.count()
-    completed_projects = portfolio_projects.filter(status='STANDARD').count() + portfolio_projects.filter(status='FEATURED').count()
-    
-    # Calculate environmental impact (sum from achievements and projects)
-    environmental_impact = 0
-    for achievement in achievements:
-        if achievement.impact_metrics and 'co2_reduced' in achievement.impact_metrics:
-            try:
-                environmental_impact += int(achievement.impact_metrics['co2_reduced'])
-            except (ValueError, TypeError):
-                pass
-    
-    for project in portfolio_projects:
-        if project.environmental_impact and 'co2_prevented' in project.environmental_impact:
-            try:
-                environmental_impact += int(project.environmental_impact['co2_prevented'])
-            except (ValueError, TypeError):
-                pass
-    
-    # Countries served (can be dynamic or from settings)
-    countries_served = 15  # This could be calculated from project locations
-    
-    # Convert data to JSON for JavaScript
-    achievements_json = json.dumps([{
+@cache_public_page('careers', validators=_job_validators)
+async def careers_async(request):
+    context = {
+        'job_listing': await sync_to_async(get_cached_fragment)('careers', 'job_listing', _render_job_listing),
+    }
+    return await _arender(request, 'axflo_app/careers.html', context)
+
+# Achievements page: the first page of each feed is rendered inline and the
+# rest comes from achievements_feed as the visitor loads more
+ACHIEVEMENTS_PAGE_SIZE = 12
+ACHIEVEMENTS_MAX_PAGE_SIZE = 48
+
+def _achievement_data(achievement):
+    return {
         'id': achievement.id,
         'title': achievement.title,
         'description': achievement.description,
@@ -232,12 +303,14 @@ def achievements(request):
         },
         'achievement_date': achievement.achievement_date.isoformat(),
         'featured_image': achievement.featured_image.url if achievement.featured_image else None,
+        'featured_image_sources': image_sources(achievement.featured_image),
         'impact_metrics': achievement.impact_metrics,
         'external_link': achievement.external_link,
         'featured': achievement.featured
-    } for achievement in achievements], cls=DjangoJSONEncoder)
-    
-    portfolio_json = json.dumps([{
+    }
+
+def _project_data(project):
+    return {
         'id': project.id,
         'title': project.title,
         'client': project.client,
@@ -246,12 +319,14 @@ def achievements(request):
         'brief_description': project.brief_description,
         'completion_date': project.completion_date.isoformat() if project.completion_date else None,
         'featured_image': project.featured_image.url if project.featured_image else None,
+        'featured_image_sources': image_sources(project.featured_image),
         'key_statistics': project.key_statistics,
         'status': project.status,
         'duration_months': project.duration_months
-    } for project in portfolio_projects], cls=DjangoJSONEncoder)
-    
-    milestones_json = json.dumps([{
+    }
+
+def _milestone_data(milestone):
+    return {
         'id': milestone.id,
         'title': milestone.title,
         'description': milestone.description,
@@ -259,89 +334,238 @@ def achievements(request):
         'milestone_year': milestone.milestone_year,
         'icon': milestone.icon,
         'featured': milestone.featured
-    } for milestone in milestones], cls=DjangoJSONEncoder)
+    }
+
+# Feed -> (serializer, card template, template variable)
+ACHIEVEMENT_FEEDS = {
+    'achievements': (_achievement_data, 'axflo_app/includes/achievement_card.html', 'achievement'),
+    'portfolio': (_project_data, 'axflo_app/includes/portfolio_card.html', 'project'),
+    'milestones': (_milestone_data, 'axflo_app/includes/milestone_card.html', 'milestone'),
+}
+
+def _feed_paginator(feed, params, per_page=ACHIEVEMENTS_PAGE_SIZE):
+    """
+    Cursor paginator over one achievements page feed, filtered by the
+    ``type``, ``category`` and ``year`` query parameters. Raises ValueError
+    for malformed filter values.
+    """
+    from django.db.models.functions import Coalesce
+
+    item_type = params.get('type', '').strip().upper()
+    category = params.get('category', '').strip()
+    year = params.get('year', '').strip()
+
+    if feed == 'achievements':
+        queryset = Achievement.objects.filter(status='ACTIVE').select_related('category')
+        if item_type:
+            queryset = queryset.filter(achievement_type=item_type)
+        if category:
+            queryset = queryset.filter(category_id=int(category))
+        if year:
+            queryset = queryset.filter(achievement_date__year=int(year))
+        ordering = ['-achievement_date', 'display_order']
+    elif feed == 'portfolio':
+        # Ongoing projects have no completion date; keyset pagination needs
+        # a non-null sort key, so they sort by their start date
+        queryset = ProjectPortfolio.objects.filter(
+            status__in=['FEATURED', 'STANDARD']
+        ).annotate(sort_date=Coalesce('completion_date', 'start_date'))
+        if item_type:
+            queryset = queryset.filter(project_type=item_type)
+        if year:
+            queryset = queryset.filter(sort_date__year=int(year))
+        ordering = ['-sort_date', 'display_order']
+    else:
+        queryset = CompanyMilestone.objects.all()
+        if year:
+            queryset = queryset.filter(milestone_year=int(year))
+        ordering = ['-milestone_date', 'display_order']
+    return CursorPaginator(queryset, per_page, ordering=ordering)
+
+def _feed_next(page):
+    return page.next_page_number() if page.has_next() else None
+
+@cache_public_page('achievements', validators=_achievement_validators)
+def achievements_feed(request, feed):
+    """
+    JSON page of an achievements page feed (achievements, portfolio or
+    milestones): ``?type=&category=&year=&cursor=&limit=``. Returns the items,
+    their rendered cards and the cursor of the next page.
+    """
+    if feed not in ACHIEVEMENT_FEEDS:
+        from django.http import Http404
+        raise Http404('Unknown feed')
+    serializer, card_template, name = ACHIEVEMENT_FEEDS[feed]
+
+    try:
+        limit = min(max(int(request.GET.get('limit', ACHIEVEMENTS_PAGE_SIZE)), 1), ACHIEVEMENTS_MAX_PAGE_SIZE)
+        paginator = _feed_paginator(feed, request.GET, limit)
+        page = paginator.get_page(request.GET.get('cursor'))
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Invalid filter'}, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'results': [serializer(item) for item in page],
+        'html': ''.join(render_to_string(card_template, {name: item}) for item in page),
+        'next': _feed_next(page),
+    })
+
+def _first_feed_page(feed):
+    """First page of an achievements page feed and the data for its modals"""
+    page = _feed_paginator(feed, {}).get_page(None)
+    return page, [ACHIEVEMENT_FEEDS[feed][0](item) for item in page]
+
+def _achievements_querysets():
+    return (
+        # Featured achievements
+        Achievement.objects.filter(status='ACTIVE', featured=True)
+        .select_related('category').order_by('display_order', '-achievement_date')[:3],
+        # Featured milestones
+        CompanyMilestone.objects.filter(featured=True).order_by('-milestone_date', 'display_order')[:5],
+        # Statistics
+        Achievement.objects.filter(status='ACTIVE'),
+        ProjectPortfolio.objects.filter(status__in=['FEATURED', 'STANDARD']),
+    )
+
+def _achievements_context(
+    featured_achievements, featured_milestones, total_achievements, completed_projects,
+    environmental_impact, *feed_pages
+):
+    pages = dict(zip(ACHIEVEMENT_FEEDS, feed_pages))
     
-    context = {
+    # Countries served (can be dynamic or from settings)
+    countries_served = 15  # This could be calculated from project locations
+    
+    # Data for the modals of the inline cards, plus where to continue
+    achievements_data = {feed: data for feed, (page, data) in pages.items()}
+    achievements_data['next'] = {feed: _feed_next(page) for feed, (page, data) in pages.items()}
+    
+    return {
         'featured_achievements': featured_achievements,
-        'achievements': achievements,
-        'portfolio_projects': portfolio_projects,
-        'milestones': milestones,
+        'achievements': pages['achievements'][0],
+        'portfolio_projects': pages['portfolio'][0],
+        'milestones': pages['milestones'][0],
         'featured_milestones': featured_milestones,
         'total_achievements': total_achievements,
         'completed_projects': completed_projects,
         'environmental_impact': environmental_impact,
         'countries_served': countries_served,
-        'achievements_json': achievements_json,
-        'portfolio_json': portfolio_json,
-        'milestones_json': milestones_json,
+        'achievements_data': achievements_data,
     }
-    
+
+@cache_public_page('achievements', validators=_achievement_validators)
+def achievements(request):
+    """Achievements and Portfolio page with dynamic content"""
+    featured_achievements, featured_milestones, active_achievements, completed = _achievements_querysets()
+    context = _achievements_context(
+        list(featured_achievements), list(featured_milestones),
+        active_achievements.count(), completed.count(),
+        # Environmental impact, precomputed from the achievements' and projects' metrics
+        get_environmental_impact(),
+        # First page of each feed; the rest is loaded from achievements_feed
+        *(_first_feed_page(feed) for feed in ACHIEVEMENT_FEEDS),
+    )
     return render(request, 'axflo_app/achievements.html', context)
 
+@cache_public_page('achievements', validators=_achievement_validators)
+async def achievements_async(request):
+    """Achievements and Portfolio page with dynamic content"""
+    featured_achievements, featured_milestones, active_achievements, completed = _achievements_querysets()
+    context = _achievements_context(*await asyncio.gather(
+        _alist(featured_achievements), _alist(featured_milestones),
+        active_achievements.acount(), completed.acount(),
+        sync_to_async(get_environmental_impact)(),
+        *(sync_to_async(_first_feed_page)(feed) for feed in ACHIEVEMENT_FEEDS),
+    ))
+    return await _arender(request, 'axflo_app/achievements.html', context)
+
 # Service Pages
+@cache_public_page('static')
 def construction_services(request):
     return render(request, 'axflo_app/construction-services.html')
 
+@cache_public_page('static')
 def engineering_consultancy(request):
     return render(request, 'axflo_app/engineering-consultancy.html')
 
+@cache_public_page('static')
 def environmental_services(request):
     return render(request, 'axflo_app/environmental-services.html')
 
+@cache_public_page('static')
 def environmental_technologies(request):
     return render(request, 'axflo_app/environmental-technologies.html')
 
+@cache_public_page('static')
 def equipment_hire_services(request):
     return render(request, 'axflo_app/equipment-hire-services.html')
 
+@cache_public_page('static')
 def incident_management(request):
     return render(request, 'axflo_app/incident-management.html')
 
+@cache_public_page('static')
 def installation_services(request):
     return render(request, 'axflo_app/installation-services.html')
 
+@cache_public_page('static')
 def marine_support_services(request):
     return render(request, 'axflo_app/marine-support-services.html')
 
+@cache_public_page('static')
 def offshore_accommodation_services(request):
     return render(request, 'axflo_app/offshore-accommodation-services.html')
 
+@cache_public_page('static')
 def offshore_marine_services(request):
     return render(request, 'axflo_app/offshore-marine-services.html')
 
+@cache_public_page('static')
 def oil_spill_response(request):
     return render(request, 'axflo_app/oil-spill-response.html')
 
+@cache_public_page('static')
 def plant_operation_facility_management(request):
     return render(request, 'axflo_app/plant-operation-facility-management.html')
 
+@cache_public_page('static')
 def preparedness_planning(request):
     return render(request, 'axflo_app/preparedness-planning.html')
 
+@cache_public_page('static')
 def procurement_logistics(request):
     return render(request, 'axflo_app/procurement-logistics.html')
 
+@cache_public_page('static')
 def project_management(request):
     return render(request, 'axflo_app/project-management.html')
 
+@cache_public_page('static')
 def renewable_energy(request):
     return render(request, 'axflo_app/renewable-energy.html')
 
+@cache_public_page('static')
 def testing_commissioning(request):
     return render(request, 'axflo_app/testing-commissioning.html')
 
+@cache_public_page('static')
 def testing(request):
     return render(request, 'axflo_app/testing.html')
 
+@cache_public_page('static')
 def training_programs(request):
     return render(request, 'axflo_app/training-programs.html')
 
+@cache_public_page('static')
 def waste_recycling(request):
     return render(request, 'axflo_app/waste-recycling.html')
 
+@cache_public_page('static')
 def water_wastewater_treatment(request):
     return render(request, 'axflo_app/water-wastewater-treatment.html')
 
+@cache_public_page('static')
 def qshe(request):
     return render(request, 'axflo_app/qshe.html')
 
@@ -444,22 +668,23 @@ def admindashboard(request):
     if not (request.user.is_staff or request.user.is_superuser):
         return HttpResponseRedirect('/admin-login/')
     
-    # Get some basic stats for the dashboard
+    # Get some basic stats for the dashboard (one query per table, cached)
+    stats = get_stats('users', 'contacts', 'subscribers', 'newsletters', 'articles', 'jobs')
     context = {
-        'total_users': User.objects.count(),
-        'staff_users': User.objects.filter(is_staff=True).count(),
-        'superusers': User.objects.filter(is_superuser=True).count(),
-        'total_contacts': ContactSubmission.objects.count(),
-        'unread_contacts': ContactSubmission.objects.filter(read=False).count(),
-        'recent_contacts': ContactSubmission.objects.order_by('-date')[:5],
-        'total_subscribers': Subscriber.objects.count(),
-        'active_subscribers': Subscriber.objects.filter(active_status=True).count(),
-        'total_newsletters': Newsletter.objects.count(),
+        'total_users': stats['users']['total'],
+        'staff_users': stats['users']['staff'],
+        'superusers': stats['users']['superusers'],
+        'total_contacts': stats['contacts']['total'],
+        'unread_contacts': stats['contacts']['unread'],
+        'recent_contacts': ContactSubmission.objects.select_related('inquiry_type').order_by('-date')[:5],
+        'total_subscribers': stats['subscribers']['total'],
+        'active_subscribers': stats['subscribers']['active'],
+        'total_newsletters': stats['newsletters']['total'],
         'recent_subscribers': Subscriber.objects.order_by('-subscription_date')[:5],
-        'total_articles': NewsArticle.objects.count(),
-        'published_articles': NewsArticle.objects.filter(status='PUBLISHED').count(),
-        'recent_articles': NewsArticle.objects.order_by('-created_at')[:5],
-        'total_jobs': Job.objects.count() if 'Job' in globals() else 0,
+        'total_articles': stats['articles']['total'],
+        'published_articles': stats['articles']['published'],
+        'recent_articles': NewsArticle.objects.select_related('category').order_by('-created_at')[:5],
+        'total_jobs': stats['jobs']['total'],
     }
     return render(request, 'axflo_app/admin/dashboard.html', context)
 
@@ -476,6 +701,30 @@ def admin_users(request):
     users = User.objects.all().order_by('-date_joined')
     return render(request, 'axflo_app/admin/users.html', {'users': users})
 
+def admin_metrics(request):
+    """Request metrics for Prometheus (see metrics.py)"""
+    from django.http import HttpResponseRedirect, HttpResponse
+    from django.utils.crypto import constant_time_compare
+    from . import metrics
+    
+    # Scrapers authenticate with METRICS_TOKEN instead of a session
+    authorization = request.headers.get('Authorization', '')
+    token_ok = bool(settings.METRICS_TOKEN) and constant_time_compare(
+        authorization, f'Bearer {settings.METRICS_TOKEN}'
+    )
+    
+    # Manual authentication check
+    if not token_ok:
+        if not request.user.is_authenticated:
+            return HttpResponseRedirect('/admin-login/')
+        
+        if not (request.user.is_staff or request.user.is_superuser):
+            return HttpResponseRedirect('/admin-login/')
+    
+    response = HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    response['Cache-Control'] = 'no-store'
+    return response
+
 def admin_logout(request):
     from django.http import HttpResponseRedirect
     
@@ -527,6 +776,10 @@ def contact(request):
                 message=message
             )
             
+            # Staff are notified from the task worker, not the request
+            if settings.STAFF_NOTIFICATION_EMAILS:
+                enqueue(tasks.notify_staff_of_contact, submission_id=contact_submission.id)
+            
             return JsonResponse({
                 'success': True, 
                 'message': 'Thank you for your message! We will get back to you soon.'
@@ -545,27 +798,16 @@ def contact(request):
     }
     return render(request, 'axflo_app/contact.html', context)
 
-def admin_contacts(request):
-    from django.http import HttpResponseRedirect
-    from django.core.paginator import Paginator
+def _filter_contacts(params):
+    """Contact submissions matching the admin_contacts filters, newest first"""
     from django.db.models import Q
     
-    # Manual authentication check
-    if not request.user.is_authenticated:
-        return HttpResponseRedirect('/admin-login/')
-    
-    if not (request.user.is_staff or request.user.is_superuser):
-        return HttpResponseRedirect('/admin-login/')
-    
-    # Get filter parameters
-    status_filter = request.GET.get('status', 'all')
-    inquiry_type_filter = request.GET.get('inquiry_type', 'all')
-    search_query = request.GET.get('search', '')
+    status_filter = params.get('status', 'all')
+    inquiry_type_filter = params.get('inquiry_type', 'all')
+    search_query = params.get('search', '')
     
-    # Base queryset
     contacts = ContactSubmission.objects.all()
     
-    # Apply filters
     if status_filter == 'read':
         contacts = contacts.filter(read=True)
     elif status_filter == 'unread':
@@ -582,29 +824,98 @@ def admin_contacts(request):
             Q(message__icontains=search_query)
         )
     
-    # Order by date (newest first)
-    contacts = contacts.order_by('-date')
+    return contacts.order_by('-date')
+
+def admin_contacts(request):
+    from django.http import HttpResponseRedirect
+    
+    # Manual authentication check
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect('/admin-login/')
+    
+    if not (request.user.is_staff or request.user.is_superuser):
+        return HttpResponseRedirect('/admin-login/')
+    
+    # Get filter parameters
+    status_filter = request.GET.get('status', 'all')
+    inquiry_type_filter = request.GET.get('inquiry_type', 'all')
+    search_query = request.GET.get('search', '')
+    
+    contacts = _filter_contacts(request.GET).select_related('inquiry_type')
     
     # Pagination
-    paginator = Paginator(contacts, 20)
+    paginator = CursorPaginator(contacts, 20, ordering=['-date'], estimate_count=True)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     # Get inquiry categories for filter dropdown
     inquiry_categories = InquiryCategory.objects.all()
     
+    contact_stats = get_stats('contacts')['contacts']
+    
     context = {
         'contacts': page_obj,
         'inquiry_categories': inquiry_categories,
         'status_filter': status_filter,
         'inquiry_type_filter': inquiry_type_filter,
         'search_query': search_query,
-        'total_contacts': ContactSubmission.objects.count(),
-        'unread_contacts': ContactSubmission.objects.filter(read=False).count(),
+        'export_query': _export_query(request),
+        'total_contacts': contact_stats['total'],
+        'unread_contacts': contact_stats['unread'],
     }
     
     return render(request, 'axflo_app/admin/contacts.html', context)
 
+# Staff exports stream every matching row (see exports.py); ?format=ndjson
+# switches from CSV
+def _export_query(request):
+    """The list view's filters as a query string for its export links"""
+    params = request.GET.copy()
+    params.pop('page', None)
+    params.pop('format', None)
+    return params.urlencode()
+
+def _export_response(request, queryset, columns, name):
+    from django.core.handlers.asgi import ASGIRequest
+    from django.http import HttpResponseBadRequest
+    
+    try:
+        return export_response(
+            queryset, columns, name, request.GET.get('format', 'csv'),
+            asynchronous=isinstance(request, ASGIRequest),
+        )
+    except ValueError:
+        return HttpResponseBadRequest('Unknown export format')
+
+CONTACT_EXPORT_COLUMNS = [
+    ('id', 'pk'),
+    ('date', 'date'),
+    ('name', 'name'),
+    ('email', 'email'),
+    ('company', 'company'),
+    ('phone', 'phone'),
+    ('inquiry_type', 'inquiry_type__name'),
+    ('message', 'message'),
+    ('read', 'read'),
+]
+
+def admin_contacts_export(request):
+    """Stream the contact submissions matching the admin_contacts filters"""
+    from django.http import HttpResponseRedirect, HttpResponseBadRequest
+    
+    # Manual authentication check
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect('/admin-login/')
+    
+    if not (request.user.is_staff or request.user.is_superuser):
+        return HttpResponseRedirect('/admin-login/')
+    
+    try:
+        contacts = _filter_contacts(request.GET)
+    except ValueError:
+        return HttpResponseBadRequest('Invalid filter')
+    return _export_response(request, contacts, CONTACT_EXPORT_COLUMNS, 'contacts')
+
 def admin_contact_detail(request, contact_id):
     from django.http import HttpResponseRedirect, Http404
     from django.shortcuts import get_object_or_404
@@ -823,27 +1134,15 @@ def newsletter_unsubscribe(request, token):
         }
         return render(request, 'axflo_app/newsletter_unsubscribe.html', context)
 
-def admin_subscribers(request):
-    """Custom admin view for managing newsletter subscribers"""
-    from django.http import HttpResponseRedirect
-    from django.core.paginator import Paginator
+def _filter_subscribers(params):
+    """Subscribers matching the admin_subscribers filters, newest first"""
     from django.db.models import Q
     
-    # Manual authentication check
-    if not request.user.is_authenticated:
-        return HttpResponseRedirect('/admin-login/')
+    status_filter = params.get('status', 'all')
+    search_query = params.get('search', '')
     
-    if not (request.user.is_staff or request.user.is_superuser):
-        return HttpResponseRedirect('/admin-login/')
-    
-    # Get filter parameters
-    status_filter = request.GET.get('status', 'all')
-    search_query = request.GET.get('search', '')
-    
-    # Base queryset
     subscribers = Subscriber.objects.all()
     
-    # Apply filters
     if status_filter == 'active':
         subscribers = subscribers.filter(active_status=True)
     elif status_filter == 'inactive':
@@ -856,29 +1155,115 @@ def admin_subscribers(request):
             Q(last_name__icontains=search_query)
         )
     
-    # Order by subscription date (newest first)
-    subscribers = subscribers.order_by('-subscription_date')
+    return subscribers.order_by('-subscription_date')
+
+def admin_subscribers(request):
+    """Custom admin view for managing newsletter subscribers"""
+    from django.http import HttpResponseRedirect
+    
+    # Manual authentication check
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect('/admin-login/')
+    
+    if not (request.user.is_staff or request.user.is_superuser):
+        return HttpResponseRedirect('/admin-login/')
+    
+    # Get filter parameters
+    status_filter = request.GET.get('status', 'all')
+    search_query = request.GET.get('search', '')
+    
+    subscribers = _filter_subscribers(request.GET)
     
     # Pagination
-    paginator = Paginator(subscribers, 20)
+    paginator = CursorPaginator(subscribers, 20, ordering=['-subscription_date'], estimate_count=True)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     # Get subscription categories for context
     subscription_categories = SubscriptionCategory.objects.all()
     
+    subscriber_stats = get_stats('subscribers')['subscribers']
+    
     context = {
         'subscribers': page_obj,
         'subscription_categories': subscription_categories,
         'status_filter': status_filter,
         'search_query': search_query,
-        'total_subscribers': Subscriber.objects.count(),
-        'active_subscribers': Subscriber.objects.filter(active_status=True).count(),
-        'inactive_subscribers': Subscriber.objects.filter(active_status=False).count(),
+        'export_query': _export_query(request),
+        'total_subscribers': subscriber_stats['total'],
+        'active_subscribers': subscriber_stats['active'],
+        'inactive_subscribers': subscriber_stats['inactive'],
     }
     
     return render(request, 'axflo_app/admin/subscribers.html', context)
 
+SUBSCRIBER_EXPORT_COLUMNS = [
+    ('id', 'pk'),
+    ('email', 'email'),
+    ('first_name', 'first_name'),
+    ('last_name', 'last_name'),
+    ('subscription_date', 'subscription_date'),
+    ('active', 'active_status'),
+    ('interests', 'interests__name'),
+]
+
+def admin_subscribers_export(request):
+    """Stream the subscribers matching the admin_subscribers filters"""
+    from django.http import HttpResponseRedirect
+    
+    # Manual authentication check
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect('/admin-login/')
+    
+    if not (request.user.is_staff or request.user.is_superuser):
+        return HttpResponseRedirect('/admin-login/')
+    
+    subscribers = _filter_subscribers(request.GET)
+    return _export_response(request, subscribers, SUBSCRIBER_EXPORT_COLUMNS, 'subscribers')
+
+def admin_subscribers_import(request):
+    """Queue an uploaded subscriber CSV for import (see subscriber_import.py)"""
+    from django.core.files.storage import default_storage
+    from django.http import HttpResponseRedirect, JsonResponse
+    
+    # Manual authentication check
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect('/admin-login/')
+    
+    if not (request.user.is_staff or request.user.is_superuser):
+        return HttpResponseRedirect('/admin-login/')
+    
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    if request.method != 'POST':
+        if is_ajax:
+            return JsonResponse({'error': 'Invalid request method'}, status=405)
+        return HttpResponseRedirect('/admin-subscribers/')
+    
+    upload = request.FILES.get('csv_file')
+    error = None
+    if upload is None:
+        error = 'Please choose a CSV file to import.'
+    else:
+        try:
+            check_import_file(upload.file)
+        except SubscriberImportError as e:
+            error = str(e)
+    
+    if error:
+        if is_ajax:
+            return JsonResponse({'success': False, 'error': error}, status=400)
+        messages.error(request, error)
+        return HttpResponseRedirect('/admin-subscribers/')
+    
+    # Large files take longer than a request may, so the worker imports a stored copy
+    file_name = default_storage.save(f'{IMPORT_UPLOAD_DIR}/{uuid.uuid4().hex}.csv', upload)
+    enqueue(tasks.import_subscriber_file, file_name=file_name)
+    summary = f'{upload.name} is being imported; new subscribers appear on this page as they are added.'
+    if is_ajax:
+        return JsonResponse({'success': True, 'message': summary})
+    messages.success(request, summary)
+    return HttpResponseRedirect('/admin-subscribers/')
+
 def admin_newsletters(request):
     """Custom admin view for managing newsletters"""
     from django.http import HttpResponseRedirect
@@ -919,13 +1304,15 @@ def admin_newsletters(request):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
+    newsletter_stats = get_stats('newsletters')['newsletters']
+    
     context = {
         'newsletters': page_obj,
         'status_filter': status_filter,
         'search_query': search_query,
-        'total_newsletters': Newsletter.objects.count(),
-        'sent_newsletters': Newsletter.objects.filter(sent=True).count(),
-        'draft_newsletters': Newsletter.objects.filter(sent=False).count(),
+        'total_newsletters': newsletter_stats['total'],
+        'sent_newsletters': newsletter_stats['sent'],
+        'draft_newsletters': newsletter_stats['draft'],
     }
     
     return render(request, 'axflo_app/admin/newsletters.html', context)
@@ -973,15 +1360,26 @@ def admin_newsletter_categories(request):
                 return HttpResponseRedirect('/admin-newsletter-categories/')
         
         # Handle GET request - display categories
-        categories = SubscriptionCategory.objects.all().order_by('name')
+        categories = list(SubscriptionCategory.objects.all().order_by('name'))
         
-        # Calculate statistics for each category
+        # Calculate statistics for each category (one grouped query per
+        # relation rather than two counts per category)
+        subscriber_counts = dict(
+            Subscriber.interests.through.objects.filter(subscriber__active_status=True)
+            .values('subscriptioncategory_id').annotate(count=Count('id'))
+            .values_list('subscriptioncategory_id', 'count')
+        )
+        newsletter_counts = dict(
+            Newsletter.categories.through.objects
+            .values('subscriptioncategory_id').annotate(count=Count('id'))
+            .values_list('subscriptioncategory_id', 'count')
+        )
         for category in categories:
-            category.subscriber_count = category.subscriber_set.filter(active_status=True).count()
-            category.newsletter_count = Newsletter.objects.filter(categories=category).count()
+            category.subscriber_count = subscriber_counts.get(category.id, 0)
+            category.newsletter_count = newsletter_counts.get(category.id, 0)
         
         # Calculate overall statistics
-        total_categories = categories.count()
+        total_categories = len(categories)
         active_subscribers = Subscriber.objects.filter(active_status=True).count()
         newsletters_sent = Newsletter.objects.filter(sent=True).count()
         
@@ -1040,15 +1438,19 @@ def admin_newsletter_create(request):
                     scheduled_datetime = None
                     
                     if send_option == 'scheduled' and send_date and send_time:
-                        scheduled_datetime = datetime.combine(send_date, send_time)
+                        # Aware, so the scheduler compares it against timezone.now()
+                        scheduled_datetime = timezone.make_aware(datetime.combine(send_date, send_time))
                     
-                    # Create newsletter
+                    # Create newsletter; deliver_newsletter marks it sent once
+                    # every recipient has it. A send-now newsletter is created
+                    # claimed, so the scheduler leaves it to the queued send
+                    now = timezone.now()
                     newsletter = Newsletter.objects.create(
                         title=title,
                         content=content,
-                        sent=send_immediately,
-                        send_date=timezone.now() if send_immediately else scheduled_datetime,
-                        created_date=timezone.now()
+                        send_date=now if send_immediately else scheduled_datetime,
+                        delivery_started_at=now if send_immediately else None,
+                        created_date=now
                     )
                     
                     # Add categories if selected
@@ -1056,20 +1458,16 @@ def admin_newsletter_create(request):
                         newsletter.categories.set(categories)
                     
                     # Calculate recipient count
-                    if categories:
-                        recipients = Subscriber.objects.filter(
-                            interests__in=[cat.id for cat in categories],
-                            active_status=True
-                        ).distinct()
-                    else:
-                        recipients = Subscriber.objects.filter(active_status=True)
-                    
-                    newsletter.recipient_count = recipients.count()
+                    newsletter.recipient_count = get_recipients(newsletter).count()
                     newsletter.save()
                     
                     # Success message based on send option
                     if send_immediately:
-                        messages.success(request, f'Newsletter "{title}" created and sent to {newsletter.recipient_count} subscribers!')
+                        enqueue(
+                            tasks.send_newsletter, newsletter_id=newsletter.id,
+                            claimed_at=newsletter.delivery_started_at.isoformat(),
+                        )
+                        messages.success(request, f'Newsletter "{title}" created and is being sent to {newsletter.recipient_count} subscribers!')
                     elif send_option == 'scheduled':
                         messages.success(request, f'Newsletter "{title}" scheduled for {scheduled_datetime.strftime("%B %d, %Y at %I:%M %p")}. Will be sent to {newsletter.recipient_count} subscribers.')
                     else:
@@ -1283,14 +1681,19 @@ def admin_newsletter_edit(request, newsletter_id):
                     'current_page': 'newsletter_edit'
                 })
             
+            # A scheduler may be sending it already (sent stays False until it finishes)
+            if send_immediately and not claim_newsletter(newsletter):
+                messages.error(request, f'Newsletter "{newsletter.title}" is being sent right now. Try again once it has finished.')
+                return HttpResponseRedirect('/admin-newsletters/')
+            
             try:
                 # Update newsletter
                 newsletter.title = title
                 newsletter.content = content
-                newsletter.sent = send_immediately
                 if send_immediately:
                     newsletter.send_date = timezone.now()
-                newsletter.save()
+                # Only the edited fields, so a send's sent flag and claim are not overwritten
+                newsletter.save(update_fields=['title', 'content', 'send_date'])
                 
                 # Update categories
                 if category_ids:
@@ -1300,25 +1703,23 @@ def admin_newsletter_edit(request, newsletter_id):
                     newsletter.categories.clear()
                 
                 # Update recipient count
-                if category_ids:
-                    recipients = Subscriber.objects.filter(
-                        interests__in=category_ids,
-                        active_status=True
-                    ).distinct()
-                else:
-                    recipients = Subscriber.objects.filter(active_status=True)
-                
-                newsletter.recipient_count = recipients.count()
-                newsletter.save()
+                newsletter.recipient_count = get_recipients(newsletter).count()
+                newsletter.save(update_fields=['recipient_count'])
                 
                 if send_immediately:
-                    messages.success(request, f'Newsletter "{title}" updated and sent to {newsletter.recipient_count} subscribers!')
+                    enqueue(
+                        tasks.send_newsletter, newsletter_id=newsletter.id,
+                        claimed_at=newsletter.delivery_started_at.isoformat(),
+                    )
+                    messages.success(request, f'Newsletter "{title}" updated and is being sent to {newsletter.recipient_count} subscribers!')
                 else:
                     messages.success(request, f'Newsletter "{title}" updated successfully. Ready to send to {newsletter.recipient_count} subscribers.')
                 
                 return HttpResponseRedirect('/admin-newsletters/')
                 
             except Exception as e:
+                if send_immediately:
+                    release_claim(newsletter)
                 messages.error(request, f'Error updating newsletter: {str(e)}')
         
         # Handle GET request - show edit form
@@ -1455,6 +1856,9 @@ def submit_job_application(request):
                 status='SUBMITTED'
             )
             
+            if settings.STAFF_NOTIFICATION_EMAILS:
+                enqueue(tasks.notify_staff_of_application, application_id=application.id)
+            
             if job_id:
                 message = f'Thank you for applying to {job_posting.title}! We will review your application and get back to you soon.'
             else:
@@ -1480,7 +1884,6 @@ def submit_job_application(request):
 def admin_careers(request):
     """Custom admin view for managing job postings"""
     from django.http import HttpResponseRedirect
-    from django.core.paginator import Paginator
     from django.db.models import Q
     
     # Manual authentication check
@@ -1517,18 +1920,20 @@ def admin_careers(request):
     jobs = jobs.order_by('-posted_date')
     
     # Pagination
-    paginator = Paginator(jobs, 15)
+    paginator = CursorPaginator(jobs, 15, ordering=['-posted_date'], estimate_count=True)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
+    job_stats = get_stats('jobs')['jobs']
+    
     context = {
         'jobs': page_obj,
         'status_filter': status_filter,
         'department_filter': department_filter,
         'search_query': search_query,
-        'total_jobs': JobPosting.objects.count(),
-        'active_jobs': JobPosting.objects.filter(status='ACTIVE').count(),
-        'inactive_jobs': JobPosting.objects.filter(status='INACTIVE').count(),
+        'total_jobs': job_stats['total'],
+        'active_jobs': job_stats['active'],
+        'inactive_jobs': job_stats['inactive'],
     }
     
     return render(request, 'axflo_app/admin/careers.html', context)
@@ -1705,28 +2110,16 @@ def admin_career_delete(request, job_id):
     
     return HttpResponseRedirect('/admin-careers/')
 
-def admin_applications(request):
-    """Custom admin view for managing job applications"""
-    from django.http import HttpResponseRedirect
-    from django.core.paginator import Paginator
+def _filter_applications(params):
+    """Job applications matching the admin_applications filters, newest first"""
     from django.db.models import Q
     
-    # Manual authentication check
-    if not request.user.is_authenticated:
-        return HttpResponseRedirect('/admin-login/')
+    status_filter = params.get('status', 'all')
+    job_filter = params.get('job', 'all')
+    search_query = params.get('search', '')
     
-    if not (request.user.is_staff or request.user.is_superuser):
-        return HttpResponseRedirect('/admin-login/')
-    
-    # Get filter parameters
-    status_filter = request.GET.get('status', 'all')
-    job_filter = request.GET.get('job', 'all')
-    search_query = request.GET.get('search', '')
-    
-    # Base queryset
     applications = JobApplication.objects.all()
     
-    # Apply filters
     if status_filter != 'all':
         applications = applications.filter(status=status_filter)
     
@@ -1741,30 +2134,84 @@ def admin_applications(request):
             Q(job_posting__title__icontains=search_query)
         )
     
-    # Order by application date (newest first)
-    applications = applications.order_by('-application_date')
+    return applications.order_by('-application_date')
+
+def admin_applications(request):
+    """Custom admin view for managing job applications"""
+    from django.http import HttpResponseRedirect
+    
+    # Manual authentication check
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect('/admin-login/')
+    
+    if not (request.user.is_staff or request.user.is_superuser):
+        return HttpResponseRedirect('/admin-login/')
+    
+    # Get filter parameters
+    status_filter = request.GET.get('status', 'all')
+    job_filter = request.GET.get('job', 'all')
+    search_query = request.GET.get('search', '')
+    
+    applications = _filter_applications(request.GET).select_related('job_posting')
     
     # Pagination
-    paginator = Paginator(applications, 20)
+    paginator = CursorPaginator(applications, 20, ordering=['-application_date'], estimate_count=True)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     # Get jobs for filter dropdown
     jobs = JobPosting.objects.all().order_by('title')
     
+    application_stats = get_stats('applications')['applications']
+    
     context = {
         'applications': page_obj,
         'jobs': jobs,
         'status_filter': status_filter,
         'job_filter': job_filter,
         'search_query': search_query,
-        'total_applications': JobApplication.objects.count(),
-        'new_applications': JobApplication.objects.filter(status='SUBMITTED').count(),
+        'export_query': _export_query(request),
+        'total_applications': application_stats['total'],
+        'new_applications': application_stats['new'],
         'status_choices': JobApplication.APPLICATION_STATUS_CHOICES,
     }
     
     return render(request, 'axflo_app/admin/applications.html', context)
 
+APPLICATION_EXPORT_COLUMNS = [
+    ('id', 'pk'),
+    ('application_date', 'application_date'),
+    ('job', 'job_posting__title'),
+    ('first_name', 'first_name'),
+    ('last_name', 'last_name'),
+    ('email', 'email'),
+    ('phone', 'phone'),
+    ('address', 'address'),
+    ('experience', 'experience'),
+    ('education', 'education'),
+    ('status', 'status'),
+    ('resume', 'resume'),
+    ('cover_letter', 'cover_letter'),
+    ('notes', 'notes'),
+]
+
+def admin_applications_export(request):
+    """Stream the job applications matching the admin_applications filters"""
+    from django.http import HttpResponseRedirect, HttpResponseBadRequest
+    
+    # Manual authentication check
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect('/admin-login/')
+    
+    if not (request.user.is_staff or request.user.is_superuser):
+        return HttpResponseRedirect('/admin-login/')
+    
+    try:
+        applications = _filter_applications(request.GET)
+    except ValueError:
+        return HttpResponseBadRequest('Invalid filter')
+    return _export_response(request, applications, APPLICATION_EXPORT_COLUMNS, 'applications')
+
 def admin_application_detail(request, application_id):
     """Get application details for modal display"""
     from django.http import HttpResponseRedirect, JsonResponse
@@ -1909,7 +2356,6 @@ def admin_application_delete(request, application_id):
 def admin_blog(request):
     """Custom admin view for managing blog posts"""
     from django.http import HttpResponseRedirect
-    from django.core.paginator import Paginator
     from django.db.models import Q
     
     # Manual authentication check
@@ -1925,7 +2371,7 @@ def admin_blog(request):
     search_query = request.GET.get('search', '')
     
     # Base queryset
-    articles = NewsArticle.objects.all()
+    articles = NewsArticle.objects.select_related('category', 'author')
     
     # Apply filters
     if status_filter != 'all':
@@ -1945,22 +2391,24 @@ def admin_blog(request):
     articles = articles.order_by('-created_at')
     
     # Pagination
-    paginator = Paginator(articles, 20)
+    paginator = CursorPaginator(articles, 20, ordering=['-created_at'], estimate_count=True)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     # Get categories for filter dropdown
     categories = BlogCategory.objects.all()
     
+    article_stats = get_stats('articles')['articles']
+    
     context = {
         'articles': page_obj,
         'categories': categories,
         'status_filter': status_filter,
         'category_filter': category_filter,
         'search_query': search_query,
-        'total_articles': NewsArticle.objects.count(),
-        'published_articles': NewsArticle.objects.filter(status='PUBLISHED').count(),
-        'draft_articles': NewsArticle.objects.filter(status='DRAFT').count(),
+        'total_articles': article_stats['total'],
+        'published_articles': article_stats['published'],
+        'draft_articles': article_stats['draft'],
         'status_choices': NewsArticle.STATUS_CHOICES,
     }
     
@@ -2248,8 +2696,8 @@ def admin_blog_categories(request):
         
         return HttpResponseRedirect('/admin-blog-categories/')
     
-    # Get all categories
-    categories = BlogCategory.objects.all()
+    # Get all categories with their article counts
+    categories = BlogCategory.objects.annotate(article_count=Count('newsarticle')).order_by('name')
     
     # Pagination
     paginator = Paginator(categories, 20)
@@ -2421,15 +2869,23 @@ def admin_achievements(request):
                     
                     if bulk_action == 'feature':
                         achievements.update(featured=True)
+                        invalidate_pages_for_model(Achievement)
+                        invalidate_stats_for_model(Achievement)
                         return JsonResponse({'success': True, 'message': f'{len(achievement_ids)} achievements featured successfully!'})
                     elif bulk_action == 'unfeature':
                         achievements.update(featured=False)
+                        invalidate_pages_for_model(Achievement)
+                        invalidate_stats_for_model(Achievement)
                         return JsonResponse({'success': True, 'message': f'{len(achievement_ids)} achievements unfeatured successfully!'})
                     elif bulk_action == 'archive':
                         achievements.update(status='ARCHIVED')
+                        invalidate_pages_for_model(Achievement)
+                        invalidate_stats_for_model(Achievement)
                         return JsonResponse({'success': True, 'message': f'{len(achievement_ids)} achievements archived successfully!'})
                     elif bulk_action == 'activate':
                         achievements.update(status='ACTIVE')
+                        invalidate_pages_for_model(Achievement)
+                        invalidate_stats_for_model(Achievement)
                         return JsonResponse({'success': True, 'message': f'{len(achievement_ids)} achievements activated successfully!'})
                     elif bulk_action == 'delete':
                         achievements.delete()
@@ -2469,15 +2925,16 @@ def admin_achievements(request):
         achievements = achievements.filter(category_id=category_filter)
     
     # Pagination
-    paginator = Paginator(achievements, 20)
+    paginator = CursorPaginator(achievements, 20, ordering=['-achievement_date', 'display_order'], estimate_count=True)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     # Stats
-    total_achievements = Achievement.objects.count()
-    featured_achievements = Achievement.objects.filter(featured=True).count()
-    awards_count = Achievement.objects.filter(achievement_type='AWARD').count()
-    certifications_count = Achievement.objects.filter(achievement_type='CERTIFICATION').count()
+    achievement_stats = get_stats('achievements')['achievements']
+    total_achievements = achievement_stats['total']
+    featured_achievements = achievement_stats['featured']
+    awards_count = achievement_stats['awards']
+    certifications_count = achievement_stats['certifications']
     
     # Categories
     categories = AchievementCategory.objects.all()
@@ -2713,15 +3170,23 @@ def admin_portfolio(request):
                     
                     if bulk_action == 'feature':
                         projects.update(featured_on_homepage=True)
+                        invalidate_pages_for_model(ProjectPortfolio)
+                        invalidate_stats_for_model(ProjectPortfolio)
                         return JsonResponse({'success': True, 'message': f'{len(project_ids)} projects featured successfully!'})
                     elif bulk_action == 'unfeature':
                         projects.update(featured_on_homepage=False)
+                        invalidate_pages_for_model(ProjectPortfolio)
+                        invalidate_stats_for_model(ProjectPortfolio)
                         return JsonResponse({'success': True, 'message': f'{len(project_ids)} projects unfeatured successfully!'})
                     elif bulk_action == 'archive':
                         projects.update(status='ARCHIVED')
+                        invalidate_pages_for_model(ProjectPortfolio)
+                        invalidate_stats_for_model(ProjectPortfolio)
                         return JsonResponse({'success': True, 'message': f'{len(project_ids)} projects archived successfully!'})
                     elif bulk_action == 'activate':
                         projects.update(status='ACTIVE')
+                        invalidate_pages_for_model(ProjectPortfolio)
+                        invalidate_stats_for_model(ProjectPortfolio)
                         return JsonResponse({'success': True, 'message': f'{len(project_ids)} projects activated successfully!'})
                     elif bulk_action == 'delete':
                         projects.delete()
@@ -2908,13 +3373,21 @@ def admin_achievement_categories(request):
             
             return JsonResponse({'success': False, 'error': 'Invalid action'})
     
-    # Get categories with achievement counts
-    categories = AchievementCategory.objects.prefetch_related('achievements').order_by('name')
+    # Get categories with achievement counts and the first three achievements
+    # for the preview (not every achievement of every category)
+    categories = list(
+        AchievementCategory.objects.annotate(
+            achievement_count=Count('achievements'),
+            active_achievement_count=Count('achievements', filter=Q(achievements__status='ACTIVE')),
+        ).prefetch_related(
+            Prefetch('achievements', queryset=Achievement.objects.all()[:3], to_attr='preview_achievements')
+        ).order_by('name')
+    )
     
     # Stats
-    total_categories = categories.count()
+    total_categories = len(categories)
     total_achievements = Achievement.objects.count()
-    categories_with_custom_colors = categories.exclude(color='#d6a019').count()
+    categories_with_custom_colors = sum(1 for cat in categories if cat.color != '#d6a019')
     
     # Categories JSON for JavaScript
     categories_json = json.dumps([{
@@ -2923,7 +3396,7 @@ def admin_achievement_categories(request):
         'description': cat.description,
         'icon': cat.icon,
         'color': cat.color,
-        'achievement_count': cat.achievements.count()
+        'achievement_count': cat.achievement_count
     } for cat in categories], cls=DjangoJSONEncoder)
     
     context = {
@@ -3055,9 +3528,11 @@ def admin_milestones(request):
                     
                     if bulk_action == 'feature':
                         milestones.update(featured=True)
+                        invalidate_pages_for_model(CompanyMilestone)
                         return JsonResponse({'success': True, 'message': f'{len(milestone_ids)} milestones featured successfully!'})
                     elif bulk_action == 'unfeature':
                         milestones.update(featured=False)
+                        invalidate_pages_for_model(CompanyMilestone)
                         return JsonResponse({'success': True, 'message': f'{len(milestone_ids)} milestones unfeatured successfully!'})
                     elif bulk_action == 'delete':
                         milestones.delete()
@@ -3098,11 +3573,16 @@ def admin_milestones(request):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Stats
-    total_milestones = CompanyMilestone.objects.count()
-    featured_milestones = CompanyMilestone.objects.filter(featured=True).count()
+    # Stats (one query)
     current_year = datetime.now().year
-    this_year_milestones = CompanyMilestone.objects.filter(milestone_year=current_year).count()
+    milestone_counts = CompanyMilestone.objects.aggregate(
+        total=Count('id'),
+        featured=Count('id', filter=Q(featured=True)),
+        this_year=Count('id', filter=Q(milestone_year=current_year)),
+    )
+    total_milestones = milestone_counts['total']
+    featured_milestones = milestone_counts['featured']
+    this_year_milestones = milestone_counts['this_year']
     
     # Calculate years span
     earliest = CompanyMilestone.objects.order_by('milestone_date').first()
@@ -2,6 +2,11 @@
 ASGI config for axflo_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with ``daphne axflo_project.asgi:application`` (see the Procfile);
+loading it turns on ASGI_MODE, so the public pages are served by their async
+views, and benchmark_asgi compares this mode with the gunicorn/WSGI one.
+Websocket connections (the live staff dashboard) are routed by
+axflo_app/routing.py.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -12,5 +17,20 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'axflo_project.settings')
+os.environ.setdefault('ASGI_MODE', 'True')
 
-application = get_asgi_application()
+# Set up Django before importing anything that touches models
+django_asgi_app = get_asgi_application()
+
+from channels.auth import AuthMiddlewareStack  # noqa: E402
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+
+from axflo_app.routing import websocket_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': AllowedHostsOriginValidator(
+        AuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+    ),
+})
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -32,6 +34,8 @@ ALLOWED_HOSTS = ['axflo-django.onrender.com', '127.0.0.1', 'localhost']
 # Application definition
 
 INSTALLED_APPS = [
+    # Makes runserver serve the ASGI application, websockets included
+    'daphne',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -43,7 +47,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'axflo_app.middleware.PrecompressedStaticMiddleware',
+    'axflo_app.middleware.RequestTimingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -64,6 +69,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'axflo_app.context_processors.live_updates',
             ],
         },
     },
@@ -75,7 +81,39 @@ if DEBUG:
         template['OPTIONS']['debug'] = True
 
 # Cache configuration
-if DEBUG:
+# Every process must share one cache: the web workers for page-cache
+# invalidation, and the Procfile's worker, viewcounts and scheduler
+# processes for buffered view counts and task coordination. Redis is used
+# when REDIS_URL is set. Otherwise, when debugging, a file-based cache
+# under CACHE_DIR stands in; it is only shared by processes on the same
+# machine, so production without REDIS_URL refuses to start unless
+# CACHE_BACKEND=file is set to confirm that every process runs on one host.
+# Set CACHE_BACKEND=dummy to turn caching off entirely.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'redis' if REDIS_URL else ('file' if DEBUG else ''))
+if not CACHE_BACKEND:
+    raise ImproperlyConfigured(
+        'Set REDIS_URL so that the web, worker, viewcounts and scheduler processes share a cache, '
+        'or CACHE_BACKEND=file if they all run on one host.'
+    )
+CACHE_DIR = os.environ.get('CACHE_DIR', str(BASE_DIR / '.cache'))
+
+# Bump CACHE_VERSION to retire every cached key at once (e.g. on deploys
+# that change cached data shapes)
+CACHE_KEY_PREFIX = 'axflo'
+CACHE_VERSION = int(os.environ.get('CACHE_VERSION', '1'))
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': CACHE_KEY_PREFIX,
+            'VERSION': CACHE_VERSION,
+            'TIMEOUT': 300,
+        }
+    }
+elif CACHE_BACKEND == 'dummy':
     CACHES = {
         'default': {
             'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
@@ -84,10 +122,116 @@ if DEBUG:
 else:
     CACHES = {
         'default': {
-            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+            'KEY_PREFIX': CACHE_KEY_PREFIX,
+            'VERSION': CACHE_VERSION,
+            'TIMEOUT': 300,
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+            },
         }
     }
 
+# Full-page cache for anonymous public traffic (see axflo_app/page_cache.py)
+PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'True').lower() in ['true', '1', 'yes']
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Staff dashboard counters (see axflo_app/stats.py)
+STATS_CACHE_TIMEOUT = 60
+
+# Per-request timing (see RequestTimingMiddleware in axflo_app/middleware.py):
+# a Server-Timing header for staff, and a warning in the
+# axflo_app.performance log for requests over either threshold
+REQUEST_TIMING_ENABLED = os.environ.get('REQUEST_TIMING_ENABLED', 'False').lower() in ['true', '1', 'yes']
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', '1000'))
+SLOW_REQUEST_QUERIES = int(os.environ.get('SLOW_REQUEST_QUERIES', '50'))
+
+# N+1 detector: log SQL that runs this many times in one request, with the
+# code or template line it comes from. Walks the stack, so development only
+N_PLUS_ONE_DETECTION = os.environ.get('N_PLUS_ONE_DETECTION', str(DEBUG)).lower() in ['true', '1', 'yes']
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', '5'))
+
+# Per-route latency, status, query and cache totals, shared between worker
+# processes through files in METRICS_DIR and served in the Prometheus text
+# format at /admin-metrics/ (see axflo_app/metrics.py). Scrapers without a
+# staff session send "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() in ['true', '1', 'yes']
+METRICS_DIR = os.environ.get('METRICS_DIR', str(BASE_DIR / '.metrics'))
+METRICS_FLUSH_INTERVAL = int(os.environ.get('METRICS_FLUSH_INTERVAL', '10'))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# On when the site is served through axflo_project/asgi.py (daphne, see the
+# Procfile): the read-only public pages are then served by their async views
+# (see axflo_app/urls.py) and staff pages open the live-update websocket,
+# which gunicorn has no route for. runserver serves ASGI too, since daphne
+# is installed, so DEBUG turns it on.
+ASGI_MODE = os.environ.get('ASGI_MODE', str(DEBUG)).lower() in ['true', '1', 'yes']
+
+# Live staff dashboard updates over websockets (see axflo_app/realtime.py).
+# Events are published by whichever process saves the row, so production
+# needs Redis to carry them to the daphne process holding the sockets; the
+# in-memory layer only reaches sockets in the same process (runserver).
+ASGI_APPLICATION = 'axflo_project.asgi.application'
+if REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': [REDIS_URL],
+                'prefix': f'{CACHE_KEY_PREFIX}:channels',
+            },
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        }
+    }
+
+
+# Email
+# Newsletters go out over EMAIL_BACKEND (SMTP in production, console when
+# debugging); see axflo_app/newsletter_delivery.py
+EMAIL_BACKEND = os.environ.get(
+    'EMAIL_BACKEND',
+    'django.core.mail.backends.console.EmailBackend' if DEBUG else 'django.core.mail.backends.smtp.EmailBackend'
+)
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False').lower() in ['true', '1', 'yes']
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'AXFLO <info@axflo.com>')
+
+# Absolute links in outgoing email (unsubscribe URLs)
+SITE_URL = os.environ.get('SITE_URL', 'https://axflo-django.onrender.com')
+
+# Newsletter delivery: messages per SMTP batch, parallel SMTP connections and
+# an overall send rate cap in messages per second (0 = unlimited)
+NEWSLETTER_BATCH_SIZE = int(os.environ.get('NEWSLETTER_BATCH_SIZE', '100'))
+NEWSLETTER_CONCURRENCY = int(os.environ.get('NEWSLETTER_CONCURRENCY', '2'))
+NEWSLETTER_RATE_LIMIT = float(os.environ.get('NEWSLETTER_RATE_LIMIT', '0'))
+# Failed recipients are retried by later runs until they have had this many
+# attempts; a newsletter only counts as sent once none is left to retry
+NEWSLETTER_MAX_ATTEMPTS = int(os.environ.get('NEWSLETTER_MAX_ATTEMPTS', '3'))
+
+# A scheduler claim not renewed for this long is considered abandoned (the
+# process died mid-delivery; live ones renew it after every batch) and the
+# newsletter is picked up again
+NEWSLETTER_CLAIM_TIMEOUT = 30 * 60
+
+# Background tasks (see axflo_app/task_queue.py). TASK_QUEUE_EAGER runs
+# tasks inline instead of queueing them, e.g. when no worker is running.
+TASK_QUEUE_EAGER = os.environ.get('TASK_QUEUE_EAGER', 'False').lower() in ['true', '1', 'yes']
+TASK_RETRY_BACKOFF = 30
+TASK_LOCK_TIMEOUT = 30 * 60
+
+# Staff addresses notified of new contact submissions and job applications
+STAFF_NOTIFICATION_EMAILS = [
+    address.strip() for address in os.environ.get('STAFF_NOTIFICATION_EMAILS', '').split(',') if address.strip()
+]
 
 WSGI_APPLICATION = 'axflo_project.wsgi.application'
 
@@ -155,12 +299,41 @@ STATICFILES_DIRS = [
     BASE_DIR / 'axflo_app' / 'static',
 ]
 
-# WhiteNoise configuration
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# collectstatic optimises the JPEG/PNG images and adds WebP/AVIF siblings and
+# resized variants (see axflo_app/static_images.py), hashes file names and
+# writes Brotli/gzip/zstd variants (see axflo_app/storage.py). Hashed files
+# are served with far-future immutable caching. STATICFILES_STORAGE is no
+# longer read by Django 5.1+, so the storage is configured through STORAGES.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'axflo_app.storage.OptimizedStaticFilesStorage',
+    },
+}
+STATIC_IMAGE_OPTIMIZATION = os.environ.get('STATIC_IMAGE_OPTIMIZATION', 'True').lower() in ['true', '1', 'yes']
+STATIC_IMAGE_QUALITY = 85
+STATIC_IMAGE_MAX_WIDTH = 2560
+STATIC_IMAGE_WIDTHS = [640, 1280]
+STATIC_IMAGE_FORMATS = ['webp', 'avif']
+STATIC_IMAGE_CACHE_DIR = os.environ.get('STATIC_IMAGE_CACHE_DIR', str(BASE_DIR / '.cache' / 'static-images'))
+# zstd variants are written when the zstandard package is installed
+STATIC_ZSTD = True
+# Pages load one minified CSS and JS bundle each, with critical CSS inlined
+# (see axflo_app/bundles.py); debugging uses the individual source files
+ASSET_BUNDLES_ENABLED = os.environ.get('ASSET_BUNDLES_ENABLED', str(not DEBUG)).lower() in ['true', '1', 'yes']
+# Some templates reference images that are not in the static tree; render
+# those with their plain URL instead of raising on the missing manifest entry
+WHITENOISE_MANIFEST_STRICT = False
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Widths (px) of the WebP/JPEG renditions made for uploaded images
+# (see axflo_app/images.py)
+IMAGE_RENDITION_WIDTHS = [320, 640, 1024, 1600]
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 